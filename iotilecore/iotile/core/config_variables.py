@@ -8,5 +8,7 @@ def get_variables():
 
     conf_vars = []
     conf_vars.append(["default-port", "string", "The default port to use for HardwareManager sessions if none is given"])
+    conf_vars.append(["queue-size", "int", "The maximum number of reports, traces or broadcasts that a HardwareManager "
+                                           "queues before dropping the oldest, 0 for unbounded", "0"])
 
     return prefix, conf_vars
@@ -3,6 +3,8 @@
 
 import os.path
 import sys
+import glob
+import hashlib
 import logging
 import importlib.util
 import inspect
@@ -35,6 +37,10 @@ class ComponentRegistry:
     _registered_extensions = {}
     _component_overlays = {}
     _frozen_extensions = None
+    _extension_index = None
+
+    ExtensionIndexFileName = 'extension_index.json'
+    ExtensionIndexPrefix = 'iotile.'
 
     def __init__(self):
         self._kvstore = None
@@ -237,6 +243,8 @@ class ComponentRegistry:
         with open(output_path, "w") as outfile:
             json.dump(self._dump_extensions(), outfile)
 
+        ComponentRegistry._frozen_extensions = None
+
     def unfreeze_extensions(self):
         """Remove a previously frozen list of extensions."""
 
@@ -247,6 +255,25 @@ class ComponentRegistry:
         os.remove(output_path)
         ComponentRegistry._frozen_extensions = None
 
+    def invalidate_extension_index(self):
+        """Discard the cached index of installed entry_points.
+
+        Unlike frozen extensions, the extension index is maintained
+        automatically.  It is saved into the current virtual environment
+        along with a fingerprint of the metadata files of all installed
+        distributions and is rebuilt whenever that fingerprint changes, so
+        this method only needs to be called if packages are installed or
+        removed while the current process is running.
+        """
+
+        ComponentRegistry._extension_index = None
+
+        index_path = os.path.join(_registry_folder(), self.ExtensionIndexFileName)
+        try:
+            os.remove(index_path)
+        except FileNotFoundError:
+            pass
+
     def load_extension(self, path, name_filter=None, class_filter=None, unique=False, component=None):
         """Load a single python module extension.
 
@@ -302,9 +329,52 @@ class ComponentRegistry:
         with open(frozen_path, "r") as infile:
             extensions = json.load(infile)
 
-        ComponentRegistry._frozen_extensions = {}
+        ComponentRegistry._frozen_extensions = self._parse_extensions(extensions)
+
+    def _load_extension_index(self):
+        """Load the index of installed entry_points, rebuilding it if needed.
+
+        The index is stored on disk together with a fingerprint of every
+        entry_points.txt file that would be parsed to build it.  If the
+        fingerprint still matches, the index is loaded from that single file
+        rather than parsing the metadata of every installed distribution.
+        """
+
+        fingerprint = _entrypoint_fingerprint()
+        index_path = os.path.join(_registry_folder(), self.ExtensionIndexFileName)
+
+        extensions = None
+        try:
+            with open(index_path, "r") as infile:
+                index = json.load(infile)
+
+            if index.get('fingerprint') == fingerprint:
+                extensions = index['extensions']
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+        if extensions is None:
+            self._logger.debug("Rebuilding extension index at %s", index_path)
+            extensions = self._dump_extensions(prefix=self.ExtensionIndexPrefix)
+
+            try:
+                tmp_path = index_path + '.tmp.%d' % os.getpid()
+                with open(tmp_path, "w") as outfile:
+                    json.dump(dict(fingerprint=fingerprint, extensions=extensions), outfile)
+
+                os.replace(tmp_path, index_path)
+            except OSError:
+                self._logger.debug("Could not save extension index to %s", index_path, exc_info=True)
+
+        ComponentRegistry._extension_index = self._parse_extensions(extensions)
+
+    @classmethod
+    def _parse_extensions(cls, extensions):
+        """Convert a dictionary created by _dump_extensions into EntryPoints."""
+
+        parsed = {}
         for group in extensions:
-            ComponentRegistry._frozen_extensions[group] = []
+            parsed[group] = []
 
             for ext_info in extensions.get(group, []):
                 name = ext_info['name']
@@ -316,16 +386,24 @@ class ComponentRegistry:
                     distro = entrypoints.Distribution(*distro_info)
 
                 entry = entrypoints.EntryPoint.from_string(obj_path, name, distro=distro)
-                ComponentRegistry._frozen_extensions[group].append(entry)
+                parsed[group].append(entry)
+
+        return parsed
 
     def _iter_entrypoint_group(self, group):
-        if not self.frozen:
+        if self.frozen:
+            if self._frozen_extensions is None:
+                self._load_frozen_extensions()
+
+            return self._frozen_extensions.get(group, [])
+
+        if not group.startswith(self.ExtensionIndexPrefix):
             return entrypoints.get_group_all(group)
 
-        if self._frozen_extensions is None:
-            self._load_frozen_extensions()
+        if self._extension_index is None:
+            self._load_extension_index()
 
-        return self._frozen_extensions.get(group, [])
+        return self._extension_index.get(group, [])
 
     @classmethod
     def _filter_nonextensions(cls, obj):
@@ -579,6 +657,56 @@ def _registry_folder(folder=None):
     return folder
 
 
+def _entrypoint_fingerprint(path=None):
+    """Fingerprint all of the files that entrypoints would parse.
+
+    This mirrors the search performed by entrypoints.iter_files_distros but
+    only stats each entry_points.txt file rather than parsing it, so it is
+    much cheaper than enumerating the entry_points themselves.
+
+    Only the files that exist are hashed, not the search path itself, so
+    processes whose paths differ only by folders without distributions,
+    like a pytest rootdir, share the same fingerprint.  A file that is found
+    through more than one folder is only hashed once.
+
+    Args:
+        path (list of str): The list of folders to search.  Defaults to
+            sys.path.
+
+    Returns:
+        str: A hex digest that changes whenever a distribution with
+        entry_points is installed, removed or updated.
+    """
+
+    if path is None:
+        path = sys.path
+
+    hasher = hashlib.sha1()
+    seen = set()
+    for folder in path:
+        files = [folder]
+        if os.path.isdir(folder):
+            escaped = glob.escape(folder)
+            files = [os.path.join(folder, 'EGG-INFO', 'entry_points.txt')]
+            files.extend(sorted(glob.glob(os.path.join(escaped, '*.dist-info', 'entry_points.txt'))))
+            files.extend(sorted(glob.glob(os.path.join(escaped, '*.egg-info', 'entry_points.txt'))))
+
+        for filename in files:
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+
+            filename = os.path.realpath(filename)
+            if filename in seen:
+                continue
+
+            seen.add(filename)
+            hasher.update(("%s:%d:%d;" % (filename, stat.st_mtime_ns, stat.st_size)).encode('utf-8'))
+
+    return hasher.hexdigest()
+
+
 def _check_registry_type(folder=None):
     """Check if the user has placed a registry_type.txt file to choose the registry type
 
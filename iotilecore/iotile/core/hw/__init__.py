@@ -2,5 +2,6 @@ from .app import IOTileApp
 from .proxy import TileBusProxyObject
 from .hwmanager import HardwareManager
 from .update import UpdateScript
+from .fleet import FleetManager, FleetRPCRunner
 
-__all__ = ['IOTileApp', 'TileBusProxyObject', 'HardwareManager']
+__all__ = ['IOTileApp', 'TileBusProxyObject', 'HardwareManager', 'FleetManager', 'FleetRPCRunner']
@@ -1,4 +1,5 @@
 """An ordered list of authentication providers that are checked in turn to attempt to provide a key"""
+import threading
 from iotile.core.exceptions import NotFoundError, ExternalError
 from iotile.core.dev import ComponentRegistry
 from .auth_provider import AuthProvider
@@ -16,8 +17,46 @@ class ChainedAuthProvider(AuthProvider):
     be tuples of (priority, auth_provider_class, arg_dict) where priority is an integer,
     auth_provider_class is an AuthProvider subclass and arg_dict is a dictionary of
     arguments passed to the constructor of auth_provider.
+
+    Building the chain requires scanning all installed extensions, so code that
+    needs the default chain repeatedly, like report decoding, should use the
+    process wide instance returned by Shared() rather than creating a new one.
     """
 
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def Shared(cls):
+        """Get a process wide ChainedAuthProvider with the default providers.
+
+        The instance is created the first time this method is called and then
+        reused until InvalidateShared() is called.
+
+        Returns:
+            ChainedAuthProvider: The shared auth provider.
+        """
+
+        shared = cls._shared
+        if shared is not None:
+            return shared
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+
+            return cls._shared
+
+    @classmethod
+    def InvalidateShared(cls):
+        """Discard the shared instance so that it is rebuilt on next use.
+
+        This should be called if the installed auth providers change.
+        """
+
+        with cls._shared_lock:
+            cls._shared = None
+
     def __init__(self, args=None):
         super(ChainedAuthProvider, self).__init__(args)
 
@@ -0,0 +1,71 @@
+"""A small thread-safe LRU cache for derived keys."""
+
+import threading
+from collections import OrderedDict
+
+
+class KeyCache:
+    """A least recently used cache of derived keys.
+
+    Deriving a key normally means running one or more HMAC or AES
+    operations on a root key.  Many keys, like the reboot key of a device
+    broadcasting encrypted readings, are derived over and over from the
+    same inputs so caching them means each verification only needs to
+    perform the final HMAC.
+
+    Cache keys must include everything the derived key depends on,
+    including a digest of the root key it was derived from, so that a
+    changed root key never returns a stale derived key.  The root key
+    itself should not be used so that it is not kept alive by the cache.
+
+    Keys are stored and returned as immutable ``bytes`` since the same key
+    is shared by every caller.
+
+    Args:
+        max_size (int): The maximum number of keys to keep.  If this is 0,
+            nothing is cached.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_derive(self, cache_key, derive):
+        """Get a cached key or derive and cache it.
+
+        Args:
+            cache_key (tuple): A hashable tuple of all inputs to the key
+                derivation.
+            derive (callable): A function with no arguments that derives
+                the key if it is not cached.
+
+        Returns:
+            bytes: The derived key.
+        """
+
+        with self._lock:
+            key = self._keys.get(cache_key)
+            if key is not None:
+                self._keys.move_to_end(cache_key)
+                return key
+
+        key = bytes(derive())
+        if self.max_size <= 0:
+            return key
+
+        with self._lock:
+            self._keys[cache_key] = key
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+
+        return key
+
+    def clear(self):
+        """Remove all cached keys."""
+
+        with self._lock:
+            self._keys.clear()
+
+    def __len__(self):
+        return len(self._keys)
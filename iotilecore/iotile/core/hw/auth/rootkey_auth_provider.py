@@ -5,13 +5,29 @@ import struct
 import hmac
 from iotile.core.exceptions import NotFoundError
 from .auth_provider import AuthProvider
+from .key_cache import KeyCache
 
 class RootKeyAuthProvider(AuthProvider):
     """Base class for Providers that derive temporary keys from root
 
         Derived classes should implement get_root_key function
+
+    Reboot and rotated keys are cached in an LRU cache whose size can be set
+    with the "key_cache_size" arg (default 256, 0 disables caching).  Report
+    keys are only used once so they are always derived directly.  Since a
+    digest of the root key is part of every cache entry, changing a root key
+    never returns a stale derived key.
     """
 
+    def __init__(self, args=None):
+        super().__init__(args)
+        self._key_cache = KeyCache(self.args.get('key_cache_size', 256))
+
+    def clear_key_cache(self):
+        """Forget all cached derived keys."""
+
+        self._key_cache.clear()
+
     def get_root_key(self, key_type, device_id):
         """Get the actual root key of a given type for a device.
 
@@ -36,7 +52,7 @@ class RootKeyAuthProvider(AuthProvider):
                 device, the current uptime and the rotation interval of the key.
 
         Returns:
-            bytearray: the rotated key
+            bytes: the rotated key
         """
         counter = rotation_info.get("reboot_counter", None)
         interval_power = rotation_info.get("rotation_interval_power", None)
@@ -54,10 +70,14 @@ class RootKeyAuthProvider(AuthProvider):
         self.verify_key(key_type)
 
         root_key = self.get_root_key(key_type, device_id)
-        reboot_key = self.DeriveRebootKey(root_key, 0, counter)
+        root_digest = hashlib.sha256(root_key).digest()
+        reboot_key = self._key_cache.get_or_derive(('reboot', key_type, device_id, root_digest, counter),
+                                                   lambda: self.DeriveRebootKey(root_key, 0, counter))
 
-        temp_key = self.DeriveRotatedKey(reboot_key, timestamp, interval_power)
-        return temp_key
+        masked_timestamp = timestamp & (~(2 ** interval_power - 1))
+        cache_key = ('rotated', key_type, device_id, root_digest, counter, masked_timestamp, interval_power)
+        return self._key_cache.get_or_derive(cache_key, lambda: self.DeriveRotatedKey(reboot_key, timestamp,
+                                                                                      interval_power))
 
 
     def get_serialized_key(self, key_type, device_id, **key_info):
@@ -84,6 +104,4 @@ class RootKeyAuthProvider(AuthProvider):
         self.verify_key(key_type)
 
         root_key = self.get_root_key(key_type, device_id)
-        report_key = self.DeriveReportKey(root_key, report_id, sent_timestamp)
-
-        return report_key
+        return self.DeriveReportKey(root_key, report_id, sent_timestamp)
@@ -0,0 +1,365 @@
+"""Send RPCs to many devices in parallel.
+
+HardwareManager is designed around a single connected device, so talking to
+a fleet of devices with it means connecting to each one in turn.
+:class:`FleetRPCRunner` instead uses an :class:`AbstractDeviceAdapter`
+directly to connect to many devices at once, sends a list of RPCs to each
+one and yields the results as each device finishes.
+
+:class:`FleetManager` wraps FleetRPCRunner in a synchronous interface that
+is available from the command line as ``iotile fleet``.
+"""
+
+import asyncio
+import binascii
+import logging
+from typedargs.annotate import param, docannotate, context, finalizer
+from iotile.core.exceptions import ArgumentError, HardwareError
+from iotile.core.utilities import SharedLoop
+from .exceptions import VALID_RPC_EXCEPTIONS
+from .hwmanager import HardwareManager
+
+
+class FleetResult:
+    """The results of sending RPCs to a single device.
+
+    Args:
+        device (object): The device that the RPCs were sent to, as it was
+            passed to :meth:`FleetRPCRunner.run`.
+        connection_string (str): The connection string used to connect to the
+            device.
+        results (list): For each RPC, either its response payload as bytes or
+            the exception instance that it raised, such as an
+            :class:`RPCNotFoundError`.  This is None if the device could not
+            be connected to or timed out.
+        error (Exception): The exception that stopped the last attempt to
+            talk to the device, or None if all of the RPCs were sent.
+        attempts (int): The number of times we tried to talk to the device.
+    """
+
+    def __init__(self, device, connection_string, results, error, attempts):
+        self.device = device
+        self.connection_string = connection_string
+        self.results = results
+        self.error = error
+        self.attempts = attempts
+
+    @property
+    def success(self):
+        """Whether every RPC was sent to the device."""
+
+        return self.error is None
+
+    def __repr__(self):
+        if self.error is not None:
+            return "FleetResult(%r, error=%r, attempts=%d)" % (self.device, self.error, self.attempts)
+
+        return "FleetResult(%r, results=%r, attempts=%d)" % (self.device, self.results, self.attempts)
+
+
+class FleetRPCRunner:
+    """Send the same RPCs to many devices using a device adapter.
+
+    Up to ``max_concurrent`` devices are talked to at once.  A new
+    connection is only started when the adapter's ``can_connect()`` says it
+    has room for one, so adapters with a limited number of connection slots,
+    like bluetooth dongles, are not overloaded.  Adapters may not count a
+    connection until it has finished, so the runner reserves a slot for each
+    connection it starts.  If the adapter's ``max_connections`` config is
+    set, connections are started in parallel until that many slots are
+    reserved.  Otherwise they are started one at a time.  Once connected,
+    RPCs are sent to all connected devices in parallel.
+
+    Connecting to a device and then sending all of its RPCs are each limited
+    to ``device_timeout`` seconds.  If connecting times out or is cancelled,
+    the runner disconnects in case the adapter was part way through
+    connecting.  If connecting fails or the device times out, it is retried
+    up to ``retries`` more times.  Errors returned by individual RPCs, such
+    as an RPC not being found, are returned in the results and do not cause
+    a retry.
+
+    Connection ids are allocated with the adapter's ``unique_conn_id()`` so
+    the adapter must not be used at the same time by anyone choosing their
+    own connection ids.
+
+    Args:
+        adapter (AbstractDeviceAdapter): A started device adapter to use.
+        max_concurrent (int): The maximum number of devices to talk to at once.
+        device_timeout (float): The maximum number of seconds to spend
+            connecting to each device and then sending it RPCs.
+        retries (int): The number of times to retry a device after a failure.
+    """
+
+    def __init__(self, adapter, max_concurrent=8, device_timeout=30.0, retries=1):
+        if max_concurrent < 1:
+            raise ArgumentError("max_concurrent must be at least 1", max_concurrent=max_concurrent)
+
+        self.adapter = adapter
+        self.max_concurrent = max_concurrent
+        self.device_timeout = device_timeout
+        self.retries = retries
+
+        self._connected = 0
+        self._connecting = 0
+        self._max_connections = None
+        self._running = None
+        self._slots = None
+        self._logger = logging.getLogger(__name__)
+
+    async def run(self, devices, rpcs):
+        """Send RPCs to every device, yielding results as each device finishes.
+
+        This is an asynchronous generator.  If iteration stops early, any
+        devices that have not finished are cancelled and disconnected.
+
+        Args:
+            devices (dict or list): Either a dictionary mapping some identifier
+                for each device, like its uuid, to its connection string or a
+                list of connection strings.
+            rpcs (list): A list of (address, rpc_id, payload, timeout) tuples
+                to send to each device in order.
+
+        Yields:
+            FleetResult: The results for each device in the order that they
+            finish.
+        """
+
+        if not isinstance(devices, dict):
+            devices = {conn_string: conn_string for conn_string in devices}
+
+        self._connected = 0
+        self._connecting = 0
+        self._max_connections = self.adapter.get_config('max_connections', None)
+        self._running = asyncio.Semaphore(self.max_concurrent)
+        self._slots = asyncio.Condition()
+
+        tasks = [asyncio.ensure_future(self._run_device(device, conn_string, rpcs))
+                 for device, conn_string in devices.items()]
+
+        try:
+            for result in asyncio.as_completed(tasks):
+                yield await result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run_all(self, devices, rpcs):
+        """Send RPCs to every device and return all of the results.
+
+        See :meth:`run`.
+
+        Returns:
+            list(FleetResult): The results for each device in the order that
+            they finished.
+        """
+
+        return [result async for result in self.run(devices, rpcs)]
+
+    async def _run_device(self, device, conn_string, rpcs):
+        error = None
+
+        for attempt in range(1, self.retries + 2):
+            try:
+                async with self._running:
+                    results = await self._try_device(conn_string, rpcs)
+
+                return FleetResult(device, conn_string, results, None, attempt)
+            except asyncio.TimeoutError:
+                error = HardwareError("Timeout talking to device", connection_string=conn_string,
+                                      timeout=self.device_timeout)
+            except HardwareError as err:
+                error = err
+
+            self._logger.debug("Attempt %d to talk to device %s failed: %s", attempt, conn_string, error)
+
+        return FleetResult(device, conn_string, None, error, self.retries + 1)
+
+    async def _try_device(self, conn_string, rpcs):
+        conn_id = self.adapter.unique_conn_id()
+
+        async with self._slots:
+            await self._slots.wait_for(self._adapter_has_room)
+            self._connecting += 1
+
+        try:
+            await self._connect(conn_id, conn_string)
+        finally:
+            async with self._slots:
+                self._connecting -= 1
+                self._slots.notify_all()
+
+        self._connected += 1
+
+        try:
+            return await asyncio.wait_for(self._send_rpcs(conn_id, rpcs), self.device_timeout)
+        finally:
+            try:
+                await self.adapter.disconnect(conn_id)
+            except HardwareError:
+                self._logger.warning("Error disconnecting from device %s", conn_string, exc_info=True)
+
+            async with self._slots:
+                self._connected -= 1
+                self._slots.notify_all()
+
+    async def _connect(self, conn_id, conn_string):
+        try:
+            await asyncio.wait_for(self.adapter.connect(conn_id, conn_string), self.device_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # The adapter may have a half open connection that would hold a slot
+            try:
+                await self.adapter.disconnect(conn_id)
+            except HardwareError:
+                self._logger.debug("No connection to clean up after aborted connect to %s", conn_string)
+
+            raise
+
+    async def _send_rpcs(self, conn_id, rpcs):
+        await self.adapter.open_interface(conn_id, 'rpc')
+
+        results = []
+        for address, rpc_id, payload, timeout in rpcs:
+            try:
+                response = await self.adapter.send_rpc(conn_id, address, rpc_id, payload, timeout)
+                results.append(response)
+            except VALID_RPC_EXCEPTIONS as err:
+                results.append(err)
+
+        return results
+
+    def _adapter_has_room(self):
+        reserved = self._connecting + self._connected
+
+        # If nothing is connected, try anyway and let connect() report the problem
+        if reserved == 0:
+            return True
+
+        # Without a known limit, can_connect() is only trusted once no connect is in progress
+        if self._max_connections is None:
+            if self._connecting > 0:
+                return False
+        elif reserved >= self._max_connections:
+            return False
+
+        return self.adapter.can_connect()
+
+
+@context("FleetManager")
+class FleetManager:
+    """Send RPCs to many IOTile devices at once.
+
+    This context connects to devices using the same port strings as
+    HardwareManager and talks to many of them in parallel.
+
+    Args:
+        port (str): The transport method to use in the format
+            transport[:port].  Defaults to the core:default-port config
+            variable.
+    """
+
+    @param("port", "string", desc="transport method to use in the format transport[:port]")
+    def __init__(self, port=None):
+        self.hw = HardwareManager(port=port)
+
+    @finalizer
+    def close(self):
+        """Stop and close this FleetManager."""
+
+        self.hw.close()
+
+    def find_devices(self, uuids, wait=None):
+        """Find the connection string for each device by scanning.
+
+        Args:
+            uuids (list(int)): The device ids to look for.
+            wait (float): An optional override time to wait for devices to be
+                seen.
+
+        Returns:
+            dict: A map of each uuid to its connection string.
+        """
+
+        seen = {device['uuid']: device['connection_string'] for device in self.hw.stream.scan(wait=wait)}
+
+        missing = [uuid for uuid in uuids if uuid not in seen]
+        if missing:
+            raise HardwareError("Could not find devices", missing_devices=missing)
+
+        return {uuid: seen[uuid] for uuid in uuids}
+
+    def send_rpcs(self, devices, rpcs, max_concurrent=8, device_timeout=30.0, retries=1, callback=None):
+        """Send RPCs to many devices and return the results.
+
+        Args:
+            devices (dict or list): See :meth:`FleetRPCRunner.run`.
+            rpcs (list): A list of (address, rpc_id, payload, timeout) tuples
+                to send to each device.
+            max_concurrent (int): The maximum number of devices to talk to at once.
+            device_timeout (float): The maximum number of seconds to spend on each
+                attempt to talk to a device.
+            retries (int): The number of times to retry a device after a failure.
+            callback (callable): An optional function called from the event loop
+                with each FleetResult as soon as it is available.
+
+        Returns:
+            list(FleetResult): The results in the order that each device finished.
+        """
+
+        runner = FleetRPCRunner(self.hw.stream.adapter, max_concurrent, device_timeout, retries)
+
+        async def _collect():
+            results = []
+            async for result in runner.run(devices, rpcs):
+                results.append(result)
+                if callback is not None:
+                    callback(result)
+
+            return results
+
+        return SharedLoop.run_coroutine(_collect())
+
+    @docannotate
+    def rpc(self, devices, address, rpc_id, payload="", timeout=3.0, max_concurrent=8, device_timeout=30.0,
+            retries=1, wait=None):
+        """Send an RPC to many devices, printing each result as it arrives.
+
+        Args:
+            devices (list(integer)): The uuids of the devices to send the RPC to.
+            address (integer): The address of the tile to send the RPC to.
+            rpc_id (integer): The id of the RPC to send.
+            payload (string): The RPC payload as a hex string.
+            timeout (float): The maximum number of seconds to wait for each RPC.
+            max_concurrent (integer): The maximum number of devices to talk to at once.
+            device_timeout (float): The maximum number of seconds to spend on each
+                attempt to talk to a device.
+            retries (integer): The number of times to retry a device after a failure.
+            wait (float): An optional override time to wait for devices to be seen.
+
+        Returns:
+            integer: The number of devices that could not be talked to.
+        """
+
+        try:
+            payload = binascii.unhexlify(payload)
+        except (binascii.Error, TypeError) as err:
+            raise ArgumentError("Invalid hex payload", payload=payload) from err
+
+        targets = self.find_devices(devices, wait=wait)
+
+        def _print_result(result):
+            if not result.success:
+                print("0x%X: error after %d attempts: %s" % (result.device, result.attempts, result.error))
+                return
+
+            response = result.results[0]
+            if isinstance(response, Exception):
+                print("0x%X: %s" % (result.device, response))
+            else:
+                print("0x%X: %s" % (result.device, binascii.hexlify(response).decode('utf-8')))
+
+        results = self.send_rpcs(targets, [(address, rpc_id, payload, timeout)], max_concurrent,
+                                 device_timeout, retries, callback=_print_result)
+
+        return len([x for x in results if not x.success])
@@ -15,7 +15,7 @@ from typedargs.annotate import annotated, param, return_type, finalizer, docanno
 
 from iotile.core.dev.semver import SemanticVersion, SemanticVersionRange
 from iotile.core.hw.exceptions import UnknownModuleTypeError
-from iotile.core.exceptions import ArgumentError, HardwareError, ValidationError, TimeoutExpiredError, ExternalError
+from iotile.core.exceptions import ArgumentError, HardwareError, ValidationError, TimeoutExpiredError, ExternalError, DataError
 from iotile.core.dev.registry import ComponentRegistry
 from iotile.core.hw.transport.adapterstream import AdapterStream
 from iotile.core.dev.config import ConfigManager
@@ -76,7 +76,9 @@ class HardwareManager:
         self._stream_queue = None
         self._trace_queue = None
         self._broadcast_queue = None
-        self._trace_data = bytearray()
+        self._trace_chunks = []
+        self._trace_size = 0
+        self._trace_dropped = 0
 
         self._proxies = {'TileBusProxyObject': TileBusProxyObject}
         self._name_map = {TileBusProxyObject.ModuleName(): [TileBusProxyObject]}
@@ -360,6 +362,7 @@ class HardwareManager:
         """Enable tracing of realtime debug information over this interface."""
 
         self._trace_queue = self.stream.enable_tracing()
+        self._trace_dropped = self._trace_queue.dropped
 
     @return_type("integer")
     def count_reports(self):
@@ -556,6 +559,11 @@ class HardwareManager:
         The data is encoded per the encoding parmeter which must be either
         the string 'hex' or 'raw'.  If hex is passed, the data is printed as hex digits,
         if raw is passed, the data is printed as received from the device.
+
+        If trace data was dropped because more than ``core:queue-size``
+        chunks were waiting, a DataError is raised instead.  The data received
+        before the gap is discarded and later calls return the data received
+        after it.
         """
 
         if encoding not in ['raw', 'hex']:
@@ -566,11 +574,12 @@ class HardwareManager:
             return ""
 
         self._accumulate_trace()
+        data = self._peek_trace()
 
         if encoding == 'raw':
-            return bytes(self._trace_data)
+            return bytes(data)
 
-        return binascii.hexlify(self._trace_data).decode('utf-8')
+        return binascii.hexlify(data).decode('utf-8')
 
     def wait_trace(self, size, timeout=None, drop_before=False, progress_callback=None):
         """Wait for a specific amount of tracing data to be received.
@@ -593,27 +602,30 @@ class HardwareManager:
 
         Returns:
             bytearray: The raw trace data obtained.
+
+        Raises:
+            DataError: Trace data was dropped because more than
+                ``core:queue-size`` chunks were waiting.  The data received
+                before the gap is discarded and later calls return the data
+                received after it.
         """
 
         if drop_before:
-            self._trace_data = bytearray()
+            self._trace_chunks = []
+            self._trace_size = 0
 
         if progress_callback is None:
             progress_callback = lambda x, y: None
 
-        if len(self._trace_data) >= size:
+        if self._trace_size >= size:
             progress_callback(size, size)
+            return self._take_trace(size)
 
-            data = self._trace_data[:size]
-            self._trace_data = self._trace_data[size:]
-
-            return data
-
-        progress_callback(len(self._trace_data), size)
+        progress_callback(self._trace_size, size)
 
         start = time.time()
-        while len(self._trace_data) < size:
-            progress_callback(len(self._trace_data), size)
+        while self._trace_size < size:
+            progress_callback(self._trace_size, size)
             self._accumulate_trace()
 
             time.sleep(0.1)
@@ -621,29 +633,72 @@ class HardwareManager:
 
             if timeout is not None and ((now - start) > timeout):
                 raise TimeoutExpiredError("Timeout waiting for tracing data", expected_size=size,
-                                          received_size=len(self._trace_data), timeout=timeout)
+                                          received_size=self._trace_size, timeout=timeout)
 
         progress_callback(size, size)
 
-        data = self._trace_data[:size]
-        self._trace_data = self._trace_data[size:]
-
-        return data
+        return self._take_trace(size)
 
     def _accumulate_trace(self):
-        """Copy tracing data from trace queue into _trace_data"""
+        """Move tracing data from the trace queue into our list of trace chunks.
+
+        The chunks are only joined together when trace data is requested by
+        dump_trace or wait_trace.
+
+        Raises:
+            DataError: The trace queue dropped chunks since the last call, so
+                there is a gap in the trace data.
+        """
 
         if self._trace_queue is None:
             return
 
-        try:
-            while True:
-                blob = self._trace_queue.get(block=False)
-                self._trace_data += bytearray(blob)
-        except Empty:
-            pass
+        blobs, dropped = self._trace_queue.get_many(with_dropped=True)
+        if dropped != self._trace_dropped:
+            lost = dropped - self._trace_dropped
+            self._trace_dropped = dropped
+            self._trace_chunks = blobs
+            self._trace_size = sum(len(x) for x in blobs)
+
+            raise DataError("Trace data was dropped because the trace queue was full", dropped_chunks=lost,
+                            queue_size=self._trace_queue.maxsize)
 
-    def iter_broadcast_reports(self, blocking=False):
+        for blob in blobs:
+            self._trace_chunks.append(blob)
+            self._trace_size += len(blob)
+
+    def _peek_trace(self):
+        """Join all accumulated trace chunks into a single chunk and return it."""
+
+        if len(self._trace_chunks) != 1:
+            self._trace_chunks = [bytearray().join(self._trace_chunks)]
+
+        return self._trace_chunks[0]
+
+    def _take_trace(self, size):
+        """Remove and return the first size bytes of accumulated trace data."""
+
+        data = bytearray()
+        taken = 0
+        for taken, chunk in enumerate(self._trace_chunks):
+            needed = size - len(data)
+            if needed <= 0:
+                break
+
+            if len(chunk) > needed:
+                data += chunk[:needed]
+                self._trace_chunks[taken] = chunk[needed:]
+                break
+
+            data += chunk
+        else:
+            taken = len(self._trace_chunks)
+
+        del self._trace_chunks[:taken]
+        self._trace_size -= len(data)
+        return data
+
+    def iter_broadcast_reports(self, blocking=False, batch=None):
         """Iterate over broadcast reports that have been received.
 
         This function is designed to allow the creation of dispatch or
@@ -652,16 +707,14 @@ class HardwareManager:
         Args:
             blocking (bool): Whether to stop when there are no more readings or
                 block and wait for more.
+            batch (int): If given, yield lists of up to this many reports
+                rather than one report at a time.
         """
 
         if self._broadcast_queue is None:
             return
 
-        try:
-            while True:
-                yield self._broadcast_queue.get(block=blocking)
-        except Empty:
-            pass
+        yield from _iter_queue(self._broadcast_queue, blocking, batch)
 
     def wait_broadcast_reports(self, num_reports, timeout=2.0):
         """Wait until a specific number of broadcast reports have been received.
@@ -687,25 +740,44 @@ class HardwareManager:
 
         return reports
 
-    def iter_reports(self, blocking=False):
+    def iter_reports(self, blocking=False, batch=None):
         """Iterate over reports that have been received.
 
         If blocking is True, this iterator will never stop.  Otherwise
         it will iterate over all reports currently in the queue (and those
         added during iteration)
 
+        If batch is given, lists of up to batch reports are yielded instead
+        of individual reports, which is much faster when there are many
+        reports queued since each list is removed from the queue at once.
+
         Args:
             blocking (bool): Whether to stop when there are no more readings or
                 block and wait for more.
+            batch (int): If given, yield lists of up to this many reports
+                rather than one report at a time.
         """
         if self._stream_queue is None:
             return
 
-        try:
-            while True:
-                yield self._stream_queue.get(block=blocking)
-        except Empty:
-            pass
+        yield from _iter_queue(self._stream_queue, blocking, batch)
+
+    def drain_reports(self, max_reports=None):
+        """Remove and return all of the reports that have been received.
+
+        Args:
+            max_reports (int): The maximum number of reports to return.
+                Defaults to returning every queued report.
+
+        Returns:
+            list(IOTileReport): The received reports in the order they were
+            received.
+        """
+
+        if self._stream_queue is None:
+            return []
+
+        return self._stream_queue.get_many(max_reports)
 
     def wait_reports(self, num_reports, timeout=2.0):
         """Wait for a fixed number of reports to be received
@@ -859,15 +931,38 @@ class HardwareManager:
         if port is not None:
             port = port.strip()
 
+        conf = ConfigManager()
+        queue_size = conf.get('core:queue-size')
+
         # Check if we're supposed to use a specific device adapter
         if force_adapter is not None:
-            return AdapterStream(force_adapter, record=record)
+            return AdapterStream(force_adapter, record=record, queue_size=queue_size)
 
         # Attempt to find a DeviceAdapter that can handle this transport type
         reg = ComponentRegistry()
 
         for _, adapter_factory in reg.load_extensions('iotile.device_adapter', name_filter=self.transport):
-            return AdapterStream(adapter_factory(port), record=record)
+            return AdapterStream(adapter_factory(port), record=record, queue_size=queue_size)
 
         raise HardwareError("Could not find transport object registered to handle passed transport type",
                             transport=self.transport)
+
+
+def _iter_queue(to_iter, blocking, batch):
+    """Yield items or lists of items from a BoundedQueue."""
+
+    if batch is None:
+        try:
+            while True:
+                yield to_iter.get(block=blocking)
+        except Empty:
+            pass
+
+        return
+
+    while True:
+        items = to_iter.get_many(batch, block=blocking)
+        if not items:
+            return
+
+        yield items
@@ -1,5 +1,6 @@
 from .individual_format import IndividualReadingReport
 from .report import IOTileReading, IOTileReport
+from .reading_batch import ReadingBatch
 from .signed_list_format import SignedListReport
 from .broadcast import BroadcastReport
 from .parser import IOTileReportParser
@@ -8,4 +9,4 @@ from .utc_assigner import UTCAssigner
 
 __all__ = ['IndividualReadingReport', 'IOTileReport', 'IOTileReading',
            'BroadcastReport', 'SignedListReport', 'FlexibleDictionaryReport',
-           'IOTileReportParser', 'UTCAssigner']
+           'IOTileReportParser', 'UTCAssigner', 'ReadingBatch']
@@ -17,7 +17,8 @@ import struct
 from collections import namedtuple
 import datetime
 from iotile.core.exceptions import DataError
-from .report import IOTileReading, IOTileReport
+from .report import IOTileReport
+from .reading_batch import ReadingBatch
 
 BroadcastHeader = namedtuple('BroadcastHeader', ['auth_type', 'reading_length', 'uuid', 'sent_timestamp', 'reserved'])
 
@@ -96,7 +97,11 @@ class BroadcastReport(IOTileReport):
         return BroadcastReport(bytearray(header) + packed_readings)
 
     def decode(self):
-        """Decode this report into a list of visible readings."""
+        """Decode this report into a list of visible readings.
+
+        The readings are returned as a ReadingBatch so that IOTileReading
+        objects are only created for readings that are actually accessed.
+        """
 
         parsed_header = self._parse_header(self.raw_report[:self._HEADER_LENGTH])
 
@@ -106,15 +111,8 @@ class BroadcastReport(IOTileReport):
 
         time_base = self.received_time - datetime.timedelta(seconds=parsed_header.sent_timestamp)
 
-        readings = self.raw_report[self._HEADER_LENGTH:self._HEADER_LENGTH + parsed_header.reading_length]
-        parsed_readings = []
-
-        for i in range(0, len(readings), 16):
-            reading = readings[i:i+16]
-            stream, _, reading_id, timestamp, value = struct.unpack("<HHLLL", reading)
-
-            parsed = IOTileReading(timestamp, stream, value, time_base=time_base, reading_id=reading_id)
-            parsed_readings.append(parsed)
+        readings = memoryview(self.raw_report)[self._HEADER_LENGTH:self._HEADER_LENGTH + parsed_header.reading_length]
+        parsed_readings = ReadingBatch.FromPacked(readings, time_base=time_base)
 
         self.sent_timestamp = parsed_header.sent_timestamp
         self.origin = parsed_header.uuid
@@ -11,6 +11,12 @@ class IOTileReportParser:
     Every time a complete report has been received, the optional callback passed in will
     be called with an IOTileReport subclass.
 
+    Received data is appended to a single buffer that is consumed by advancing
+    a read cursor, so parsing many back to back reports does not copy the rest
+    of the buffer after each one.  Consumed data is only discarded once it makes
+    up at least half of the buffer.  If many chunks are available at once,
+    feed_many can be used to add them all before parsing.
+
     Args:
         report_callback (callable): A function to be called every time a new report is received
             The signature should be bool report_callback(report, context).  The return value is True to
@@ -36,7 +42,8 @@ class IOTileReportParser:
         self.report_callback = report_callback
         self.error_callback = error_callback
 
-        self.raw_data = bytearray()
+        self._buffer = bytearray()
+        self._cursor = 0
         self.state = IOTileReportParser.WaitingForReportType
 
         self.current_type = 0
@@ -48,6 +55,12 @@ class IOTileReportParser:
         self.known_formats = self._build_type_map()
         self.reports = []
 
+    @property
+    def raw_data(self):
+        """A copy of the data that has been received but not yet parsed."""
+
+        return self._buffer[self._cursor:]
+
     def add_data(self, data):
         """Add data to our stream, emitting reports as each new one is seen
 
@@ -55,15 +68,42 @@ class IOTileReportParser:
             data (bytearray): A chunk of new data to add
         """
 
+        self.feed_many((data,))
+
+    def feed_many(self, chunks):
+        """Add multiple chunks of data to our stream and then parse them.
+
+        This is equivalent to calling add_data for each chunk but only
+        runs the parser once all of the chunks have been added.
+
+        Args:
+            chunks (iterable of bytes-like): The chunks of new data to add.
+        """
+
         if self.state == self.ErrorState:
             return
 
-        self.raw_data += bytearray(data)
+        self._compact()
+        for chunk in chunks:
+            self._buffer += chunk
 
         still_processing = True
         while still_processing:
             still_processing = self.process_data()
 
+    def _compact(self):
+        """Discard consumed data once it makes up at least half of our buffer."""
+
+        if self._cursor == 0:
+            return
+
+        if self._cursor == len(self._buffer):
+            self._buffer.clear()
+            self._cursor = 0
+        elif self._cursor >= len(self._buffer) // 2:
+            del self._buffer[:self._cursor]
+            self._cursor = 0
+
     def process_data(self):
         """Attempt to extract a report from the current data stream contents
 
@@ -73,9 +113,10 @@ class IOTileReportParser:
         """
 
         further_processing = False
+        available = len(self._buffer) - self._cursor
 
-        if self.state == self.WaitingForReportType and len(self.raw_data) > 0:
-            self.current_type = self.raw_data[0]
+        if self.state == self.WaitingForReportType and available > 0:
+            self.current_type = self._buffer[self._cursor]
 
             try:
                 self.current_header_size = self.calculate_header_size(self.current_type)
@@ -89,10 +130,11 @@ class IOTileReportParser:
                 else:
                     raise
 
-        if self.state == self.WaitingForReportHeader and len(self.raw_data) >= self.current_header_size:
+        if self.state == self.WaitingForReportHeader and available >= self.current_header_size:
+            header = memoryview(self._buffer)[self._cursor:self._cursor + self.current_header_size]
+
             try:
-                self.current_report_size = self.calculate_report_size(self.current_type,
-                                                                      self.raw_data[:self.current_header_size])
+                self.current_report_size = self.calculate_report_size(self.current_type, header)
                 self.state = self.WaitingForCompleteReport
                 further_processing = True
             except Exception as exc:
@@ -102,11 +144,14 @@ class IOTileReportParser:
                     self.error_callback(self.ErrorParsingReportHeader, str(exc), self.context)
                 else:
                     raise
+            finally:
+                header.release()
 
-        if self.state == self.WaitingForCompleteReport and len(self.raw_data) >= self.current_report_size:
+        if self.state == self.WaitingForCompleteReport and available >= self.current_report_size:
             try:
-                report_data = self.raw_data[:self.current_report_size]
-                self.raw_data = self.raw_data[self.current_report_size:]
+                # Reports keep their raw data so they need their own copy rather than a view into our buffer
+                report_data = self._buffer[self._cursor:self._cursor + self.current_report_size]
+                self._cursor += self.current_report_size
 
                 report = self.parse_report(self.current_type, report_data)
                 self._handle_report(report)
@@ -0,0 +1,150 @@
+"""A compact, column oriented list of readings decoded from a report."""
+
+import sys
+import array
+from collections.abc import Sequence
+from .report import IOTileReading
+
+
+def _word_array():
+    """Create an empty array of unsigned 32-bit integers."""
+
+    for typecode in ('I', 'L'):
+        words = array.array(typecode)
+        if words.itemsize == 4:
+            return words
+
+    raise RuntimeError("No 32-bit array typecode available on this platform")
+
+
+class ReadingBatch(Sequence):
+    """A read-only list of readings stored as columns.
+
+    Reports like SignedListReport and BroadcastReport contain many readings
+    packed as 16 byte records.  Rather than building an IOTileReading for
+    each record when the report is decoded, this class splits the records
+    into arrays of streams, reading ids, raw times and values in a single
+    pass and only creates IOTileReading objects when they are accessed.
+
+    The UTC time of each reading is likewise only computed when the
+    reading_times column or an individual reading is accessed.
+
+    ReadingBatch can be used anywhere a list of IOTileReading objects can be
+    read from: it supports len(), indexing, slicing, iteration and equality
+    comparison with any other sequence of readings.
+
+    Args:
+        streams (array.array): The encoded stream of each reading.
+        reading_ids (array.array): The reading id of each reading.
+        raw_times (array.array): The raw timestamp of each reading.
+        values (array.array): The value of each reading.
+        time_base (datetime): An optional estimate of when the device was
+            last turned on, used to calculate the UTC time of readings.
+    """
+
+    RECORD_SIZE = 16
+
+    def __init__(self, streams, reading_ids, raw_times, values, time_base=None):
+        self.streams = streams
+        self.reading_ids = reading_ids
+        self.raw_times = raw_times
+        self.values = values
+        self.time_base = time_base
+
+        self._readings = [None] * len(streams)
+        self._reading_times = None
+
+    @classmethod
+    def FromPacked(cls, data, time_base=None):
+        """Decode a buffer of packed 16 byte readings.
+
+        Each reading must be packed as "<HHLLL" containing its stream, 2
+        reserved bytes, reading id, raw time and value.
+
+        Args:
+            data (bytes-like): The packed readings.  Any object supporting
+                the buffer protocol, such as a memoryview, may be passed.
+            time_base (datetime): An optional estimate of when the device was
+                last turned on.
+
+        Returns:
+            ReadingBatch: The decoded readings.
+        """
+
+        if len(data) % cls.RECORD_SIZE != 0:
+            raise ValueError("Packed readings must be a multiple of %d bytes long, length was %d"
+                             % (cls.RECORD_SIZE, len(data)))
+
+        halfwords = array.array('H')
+        halfwords.frombytes(data)
+
+        words = _word_array()
+        words.frombytes(data)
+
+        if sys.byteorder == 'big':
+            halfwords.byteswap()
+            words.byteswap()
+
+        return ReadingBatch(halfwords[0::8], words[1::4], words[2::4], words[3::4], time_base=time_base)
+
+    @property
+    def reading_times(self):
+        """The UTC time of each reading or None if it cannot be determined."""
+
+        if self._reading_times is None:
+            time_base = self.time_base
+            self._reading_times = [IOTileReading._utc_time(raw_time, time_base) for raw_time in self.raw_times]
+
+        return self._reading_times
+
+    def _reading(self, index):
+        reading = self._readings[index]
+        if reading is None:
+            reading_time = None
+            if self._reading_times is not None:
+                reading_time = self._reading_times[index]
+
+            reading = IOTileReading(self.raw_times[index], self.streams[index], self.values[index],
+                                    time_base=self.time_base, reading_id=self.reading_ids[index],
+                                    reading_time=reading_time)
+            self._readings[index] = reading
+
+        return reading
+
+    def __len__(self):
+        return len(self.streams)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._reading(i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        if index < 0 or index >= len(self):
+            raise IndexError("ReadingBatch index out of range")
+
+        return self._reading(index)
+
+    def __iter__(self):
+        for i in range(0, len(self)):
+            yield self._reading(i)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+
+        if len(self) != len(other):
+            return False
+
+        return all(x == y for x, y in zip(self, other))
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+
+        return not result
+
+    def __str__(self):
+        return "ReadingBatch of %d readings" % len(self)
@@ -3,6 +3,16 @@
 import datetime
 from iotile.core.exceptions import NotFoundError
 
+class _Uncalculated:
+    """Marker for a reading time that has not been calculated yet."""
+
+    def __reduce__(self):
+        # Make copies and pickles of readings keep referring to the same marker
+        return '_UNCALCULATED'
+
+
+_UNCALCULATED = _Uncalculated()
+
 
 class IOTileReading:
     """Base class for readings streamed from IOTile device.
@@ -31,6 +41,8 @@ class IOTileReading:
         value (int): The raw reading value
     """
 
+    __slots__ = ('raw_time', 'stream', 'value', 'reading_id', '_reading_time', '_time_base')
+
     _Y2KReference = datetime.datetime(2000, 1, 1)
     InvalidReadingID = 0
 
@@ -44,18 +56,57 @@ class IOTileReading:
 
         self.reading_id = reading_id
 
-        self.reading_time = reading_time
+        # The UTC time of the reading is only calculated the first time
+        # someone asks for it since most readings never need it.
+        if reading_time is None:
+            reading_time = _UNCALCULATED
+
+        self._reading_time = reading_time
+        self._time_base = time_base
+
+    @property
+    def reading_time(self):
+        """The UTC time of this reading or None if it cannot be determined."""
+
+        if self._reading_time is _UNCALCULATED:
+            self._reading_time = self._utc_time(self.raw_time, self._time_base)
+            self._time_base = None
 
-        if self.reading_time is None:
-            self.reading_time = self._try_assign_utc_time(self.raw_time, time_base)
+        return self._reading_time
 
-    def _try_assign_utc_time(self, raw_time, time_base):
-        """Try to assign a UTC time to this reading."""
+    @reading_time.setter
+    def reading_time(self, value):
+        self._reading_time = value
+        self._time_base = None
+
+    def clone(self, stream=None):
+        """Create a copy of this reading, optionally in a different stream.
+
+        Args:
+            stream (int): The encoded stream that the copy should be part
+                of.  If not passed, the copy keeps this reading's stream.
+
+        Returns:
+            IOTileReading: The copied reading.
+        """
+
+        clone = IOTileReading.__new__(IOTileReading)
+        clone.raw_time = self.raw_time
+        clone.stream = self.stream if stream is None else stream
+        clone.value = self.value
+        clone.reading_id = self.reading_id
+        clone._reading_time = self._reading_time
+        clone._time_base = self._time_base
+        return clone
+
+    @classmethod
+    def _utc_time(cls, raw_time, time_base):
+        """Calculate the UTC time of a reading from its raw time, if possible."""
 
         # Check if the raw time is encoded UTC since y2k or just uptime
         if raw_time != IOTileEvent.InvalidRawTime and (raw_time & (1 << 31)):
-            y2k_offset = self.raw_time ^ (1 << 31)
-            return self._Y2KReference + datetime.timedelta(seconds=y2k_offset)
+            y2k_offset = raw_time ^ (1 << 31)
+            return cls._Y2KReference + datetime.timedelta(seconds=y2k_offset)
 
         if time_base is not None:
             return time_base + datetime.timedelta(seconds=raw_time)
@@ -6,6 +6,7 @@ import hashlib
 import hmac
 from enum import IntEnum
 from .report import IOTileReport, IOTileReading
+from .reading_batch import ReadingBatch
 from struct import unpack
 from iotile.core.exceptions import NotFoundError, ExternalError
 from iotile.core.hw.auth.auth_provider import AuthProvider
@@ -311,7 +312,7 @@ class SignedListReport(IOTileReport):
         footer_stats = struct.pack("<LL", lowest_id, highest_id)
 
         if signer is None:
-            signer = ChainedAuthProvider()
+            signer = ChainedAuthProvider.Shared()
 
         # If we are supposed to encrypt this report, do the encryption
         if root_key != signer.NoKey:
@@ -344,6 +345,9 @@ class SignedListReport(IOTileReport):
 
     def decode(self):
         """Decode this report into a list of readings
+
+        The readings are returned as a ReadingBatch so that IOTileReading
+        objects are only created for readings that are actually accessed.
         """
 
         fmt, len_low, len_high, device_id, report_id, sent_timestamp, signature_flags, \
@@ -374,7 +378,7 @@ class SignedListReport(IOTileReport):
         self.signature = signature
 
         signed_data = self.raw_report[:-16]
-        signer = ChainedAuthProvider()
+        signer = ChainedAuthProvider.Shared()
 
         key_type = self.StreamTypeToKeyType(signature_flags)
         self.encrypted = (key_type != AuthProvider.NoKey)
@@ -405,13 +409,6 @@ class SignedListReport(IOTileReport):
         assert (len(readings) % 16) == 0
 
         time_base = self.received_time - datetime.timedelta(seconds=sent_timestamp)
-        parsed_readings = []
-
-        for i in range(0, len(readings), 16):
-            reading = readings[i:i+16]
-            stream, _, reading_id, timestamp, value = unpack("<HHLLL", reading)
-
-            parsed = IOTileReading(timestamp, stream, value, time_base=time_base, reading_id=reading_id)
-            parsed_readings.append(parsed)
+        parsed_readings = ReadingBatch.FromPacked(readings, time_base=time_base)
 
         return parsed_readings, []
@@ -6,10 +6,10 @@
 # Modifications to this file from the original created at WellDone International
 # are copyright Arch Systems Inc.
 
-from .adapterstream import AdapterStream
+from .adapterstream import AdapterStream, BoundedQueue
 from .adapter import AbstractDeviceAdapter, StandardDeviceAdapter
 from .server import AbstractDeviceServer, StandardDeviceServer
 from .virtualadapter import VirtualDeviceAdapter
 
-__all__ = ['AbstractDeviceAdapter', 'AbstractDeviceServer', 'AdapterStream',
+__all__ = ['AbstractDeviceAdapter', 'AbstractDeviceServer', 'AdapterStream', 'BoundedQueue',
            'StandardDeviceAdapter', 'StandardDeviceServer', 'VirtualDeviceAdapter']
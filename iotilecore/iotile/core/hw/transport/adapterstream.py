@@ -56,6 +56,96 @@ class _RecordedRPC:
                    self.status, self.runtime * 1000, self.call, self.response, self.error)
 
 
+class BoundedQueue(queue.Queue):
+    """A thread-safe queue of reports, traces or broadcasts with an optional size limit.
+
+    This is a drop-in replacement for :class:`queue.Queue` except that put()
+    never waits.  Items are put into the queue from the event loop, so
+    waiting for space would stall all other device adapter activity until
+    the consumer caught up.  Instead, putting a new item into a full queue
+    discards the oldest queued item so that a consumer that falls behind only
+    ever sees the most recent items.  The number of discarded items is kept
+    in ``dropped``.
+
+    Many items can be removed at once with a single lock acquisition using
+    get_many().
+
+    Args:
+        maxsize (int): The maximum number of items to queue.  If this is
+            0, the default, the queue is unbounded.
+    """
+
+    def __init__(self, maxsize=0):
+        super(BoundedQueue, self).__init__(maxsize)
+        self.dropped = 0
+
+    def put(self, item, block=True, timeout=None):
+        """Put an item into the queue, dropping the oldest item if it is full.
+
+        See :meth:`queue.Queue.put`.  This method never blocks, so ``block``
+        and ``timeout`` are ignored.
+        """
+
+        with self.not_full:
+            if 0 < self.maxsize <= self._qsize():
+                # The dropped item is replaced so unfinished_tasks does not change
+                self._get()
+                self.dropped += 1
+            else:
+                self.unfinished_tasks += 1
+
+            self._put(item)
+            self.not_empty.notify()
+
+    def get_many(self, max_items=None, block=False, timeout=None, with_dropped=False):
+        """Remove and return many items from the queue at once.
+
+        Args:
+            max_items (int): The maximum number of items to return.  Defaults
+                to returning every item in the queue.
+            block (bool): Whether to wait for at least one item if the queue
+                is empty.
+            timeout (float): The maximum number of seconds to wait when block
+                is True.  Defaults to waiting forever.
+            with_dropped (bool): Also return the number of items dropped so
+                far.  It is read under the same lock as the items, so any
+                items dropped since the last call were queued before the
+                returned items.
+
+        Returns:
+            list: The removed items, in the order they were queued.  This is
+            empty if no items arrived in time.  If with_dropped is True, a
+            tuple of the items and the number of dropped items is returned.
+        """
+
+        with self.not_empty:
+            if block and not self._qsize():
+                if timeout is None:
+                    while not self._qsize():
+                        self.not_empty.wait()
+                else:
+                    end = monotonic() + timeout
+                    while not self._qsize():
+                        remaining = end - monotonic()
+                        if remaining <= 0.0:
+                            break
+
+                        self.not_empty.wait(remaining)
+
+            count = self._qsize()
+            if max_items is not None:
+                count = min(count, max_items)
+
+            items = [self._get() for _i in range(0, count)]
+            if items:
+                self.not_full.notify(len(items))
+
+            if with_dropped:
+                return items, self.dropped
+
+            return items
+
+
 class AdapterStream:
     """A wrapper that provides a synchronous interface on top of AbstractDeviceAdapter.
 
@@ -72,18 +162,26 @@ class AdapterStream:
     in order to make it more convenient to process them.  It also contains a generic
     RPC logging mechanism to produce a record of what RPCs were sent to a device.
 
+    Each queue is a :class:`BoundedQueue`.  By default the queues are
+    unbounded, but a streaming device that is not read from quickly enough
+    will eventually exhaust memory, so a maximum size can be passed to limit
+    them.  Once a queue is full, its oldest items are dropped.
+
     Args:
         adapter (AbstractDeviceAdapter): the DeviceAdapter that we should use
         record (string): The path to a file that we should use to record any RPCs
             sent for tracing purposes.
+        queue_size (int): The maximum number of reports, traces or broadcasts
+            to queue.  Defaults to 0, which means the queues are unbounded.
     """
 
-    def __init__(self, adapter, record=None, loop=SharedLoop):
+    def __init__(self, adapter, record=None, loop=SharedLoop, queue_size=0):
         self._scanned_devices = {}
         self._scan_lock = threading.Lock()
         self._reports = None
         self._broadcast_reports = None
         self._traces = None
+        self._queue_size = queue_size
 
         self._loop = loop
         self._record = record
@@ -365,7 +463,7 @@ class AdapterStream:
         all.
 
         Returns:
-            queue.Queue: A queue that will be filled with reports from the device.
+            BoundedQueue: A queue that will be filled with reports from the device.
         """
 
         if not self.connected:
@@ -375,7 +473,7 @@ class AdapterStream:
             _clear_queue(self._reports)
             return self._reports
 
-        self._reports = queue.Queue()
+        self._reports = BoundedQueue(self._queue_size)
         self._loop.run_coroutine(self.adapter.open_interface(0, 'streaming'))
 
         return self._reports
@@ -395,7 +493,7 @@ class AdapterStream:
         all.
 
         Returns:
-            queue.Queue: A queue that will be filled with trace data from the device.
+            BoundedQueue: A queue that will be filled with trace data from the device.
 
             The trace data will be in disjoint bytes objects in the queue
         """
@@ -407,7 +505,7 @@ class AdapterStream:
             _clear_queue(self._traces)
             return self._traces
 
-        self._traces = queue.Queue()
+        self._traces = BoundedQueue(self._queue_size)
         self._loop.run_coroutine(self.adapter.open_interface(0, 'tracing'))
 
         return self._traces
@@ -419,14 +517,14 @@ class AdapterStream:
         will be filled asynchronously as broadcast reports are received.
 
         Returns:
-            queue.Queue: A queue that will be filled with braodcast reports.
+            BoundedQueue: A queue that will be filled with braodcast reports.
         """
 
         if self._broadcast_reports is not None:
             _clear_queue(self._broadcast_reports)
             return self._broadcast_reports
 
-        self._broadcast_reports = queue.Queue()
+        self._broadcast_reports = BoundedQueue(self._queue_size)
         return self._broadcast_reports
 
     def enable_debug(self):
@@ -564,9 +662,5 @@ class AdapterStream:
 def _clear_queue(to_clear):
     """Clear all items from a queue safely."""
 
-    while not to_clear.empty():
-        try:
-            to_clear.get(False)
-            to_clear.task_done()
-        except queue.Empty:
-            continue
+    for _item in to_clear.get_many():
+        to_clear.task_done()
@@ -12,6 +12,8 @@ from .records import UnknownRecord, SendRPCRecord, SendErrorCheckingRPCRecord
 
 ScriptHeader = namedtuple('ScriptHeader', ['header_length', 'authenticated', 'integrity_checked', 'encrypted'])
 
+_RECORD_HEADER = struct.Struct("<LB")
+
 
 class UpdateScript:
     """An update script that consists of a list of UpdateRecord objects.
@@ -59,10 +61,9 @@ class UpdateScript:
             raise ArgumentError("Script length does not match embedded length",
                                 embedded_length=total_length, length=len(script_data))
 
-        hashed_data = script_data[16:]
-
         sha = hashlib.sha256()
-        sha.update(hashed_data)
+        with memoryview(script_data) as view:
+            sha.update(view[16:])
         hash_value = sha.digest()[:16]
 
         if not compare_digest(embedded_hash, hash_value):
@@ -90,46 +91,78 @@ class UpdateScript:
             UpdateScript: The parsed update script.
         """
 
-        curr = 0
-        records = []
+        return UpdateScript(list(cls.iter_records(script_data, allow_unknown, show_rpcs)))
+
+    @classmethod
+    def iter_records(cls, script_data, allow_unknown=True, show_rpcs=False):
+        """Parse the records in a binary update script one at a time.
+
+        This generator yields each record as soon as it has been parsed so
+        large scripts can be inspected or forwarded without building a list
+        of every record.  The script is read through a memoryview so only
+        the data for the record being parsed is ever copied.  The script
+        header, including its hash, is checked before any records are
+        yielded.
+
+        Args:
+            script_data (bytes or bytearray): The binary data containing the script.
+            allow_unknown (bool): Allow the script to contain unknown records
+                so long as they have correct headers to allow us to skip them.
+            show_rpcs (bool): Show SendRPCRecord matches for each record rather than
+                the more specific operation
+
+        Raises:
+            ArgumentError: If the script contains malformed data that cannot
+                be parsed.
+            DataError: If the script contains unknown records and allow_unknown=False
+
+        Yields:
+            UpdateRecord: Each record in the script, in order.
+        """
 
         header = cls.ParseHeader(script_data)
         curr = header.header_length
 
         cls.logger.debug("Parsed script header: %s, skipping %d bytes", header, curr)
 
+        view = memoryview(script_data)
+        script_length = len(view)
+        debug = cls.logger.isEnabledFor(logging.DEBUG)
+
+        # Records that defer matching are accumulated until a match is found,
+        # they are always contiguous so we just track where the first one started
+        record_start = curr
         record_count = 0
-        record_data = bytearray()
         partial_match = None
         match_offset = 0
 
-        while curr < len(script_data):
-            if len(script_data) - curr < UpdateRecord.HEADER_LENGTH:
-                raise ArgumentError("Script ended with a partial record", remaining_length=len(script_data) - curr)
-
-            # Add another record to our current list of records that we're parsing
+        while curr < script_length:
+            if script_length - curr < UpdateRecord.HEADER_LENGTH:
+                raise ArgumentError("Script ended with a partial record", remaining_length=script_length - curr)
 
-            total_length, record_type = struct.unpack_from("<LB", script_data[curr:])
-            cls.logger.debug("Found record of type %d, length %d", record_type, total_length)
+            total_length, record_type = _RECORD_HEADER.unpack_from(view, curr)
+            if debug:
+                cls.logger.debug("Found record of type %d, length %d", record_type, total_length)
 
-            record_data += script_data[curr:curr+total_length]
             record_count += 1
-
             curr += total_length
+            record_data = bytearray(view[record_start:curr])
 
             try:
                 if show_rpcs and record_type == SendRPCRecord.MatchType():
-                    cls.logger.debug("   {0}".format(hexlify(record_data)))
+                    if debug:
+                        cls.logger.debug("   %s", hexlify(record_data))
                     record = SendRPCRecord.FromBinary(record_data[UpdateRecord.HEADER_LENGTH:], record_count)
                 elif show_rpcs and record_type == SendErrorCheckingRPCRecord.MatchType():
-                    cls.logger.debug("   {0}".format(hexlify(record_data)))
+                    if debug:
+                        cls.logger.debug("   %s", hexlify(record_data))
                     record = SendErrorCheckingRPCRecord.FromBinary(record_data[UpdateRecord.HEADER_LENGTH:],
                                                                    record_count)
                 else:
                     record = UpdateRecord.FromBinary(record_data, record_count)
 
             except DeferMatching as defer:
-                # If we're told to defer matching, continue accumulating record_data
+                # If we're told to defer matching, continue accumulating records
                 # until we get a complete match.  If a partial match is available, keep track of
                 # that partial match so that we can use it once the record no longer matches.
                 if defer.partial_match is not None:
@@ -151,14 +184,12 @@ class UpdateScript:
                     record = UnknownRecord(record_type, record_data[UpdateRecord.HEADER_LENGTH:])
 
             # Reset our record accumulator since we successfully matched one or more records
+            record_start = curr
             record_count = 0
-            record_data = bytearray()
             partial_match = None
             match_offset = 0
 
-            records.append(record)
-
-        return UpdateScript(records)
+            yield record
 
     def encode(self):
         """Encode this record into a binary blob.
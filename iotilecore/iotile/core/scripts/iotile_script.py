@@ -193,6 +193,7 @@ def main(argv=None):
     shell.root_add("registry", "iotile.core.dev.annotated_registry,registry")
     shell.root_add("config", "iotile.core.dev.config,ConfigManager")
     shell.root_add('hw', "iotile.core.hw.hwmanager,HardwareManager")
+    shell.root_add('fleet', "iotile.core.hw.fleet,FleetManager")
 
     reg = ComponentRegistry()
     plugins = reg.list_plugins()
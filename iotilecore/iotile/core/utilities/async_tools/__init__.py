@@ -7,6 +7,7 @@ complex asynchronous operations on top of the asyncio package.
 from .event_loop import BackgroundEventLoop, SharedLoop, BackgroundTask
 from .operation_manager import OperationManager
 from .awaitable_dict import AwaitableDict
+from .latency_histogram import LatencyHistogram
 
 __all__ = ['BackgroundEventLoop', 'SharedLoop', 'OperationManager',
-           'AwaitableDict', 'BackgroundTask']
+           'AwaitableDict', 'BackgroundTask', 'LatencyHistogram']
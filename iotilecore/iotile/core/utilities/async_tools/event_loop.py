@@ -25,8 +25,10 @@ import logging
 import threading
 import atexit
 import functools
+import collections
 import concurrent.futures
 from iotile.core.exceptions import TimeoutExpiredError, ArgumentError, InternalError, LoopStoppingError
+from .latency_histogram import LatencyHistogram
 
 
 class BackgroundTask:
@@ -271,6 +273,14 @@ class BackgroundEventLoop:
 
     This prevents people from accidentally adding more tasks while the loop is
     shutting down.
+
+    Coroutines launched from other threads are appended to a queue and the
+    loop is only woken up once to start every coroutine queued since it last
+    woke up, so many threads calling run_coroutine() at once do not each pay
+    for a separate wakeup of the loop.  If latency histograms are enabled
+    with enable_latency_histograms(), the time each of these coroutines
+    spends waiting to be started and then running is recorded in
+    ``queue_latency`` and ``execution_latency``.
     """
 
     def __init__(self):
@@ -279,10 +289,16 @@ class BackgroundEventLoop:
         self.stopping = False
         self.tasks = set()
 
+        self.queue_latency = None
+        self.execution_latency = None
+
         self._logger = logging.getLogger(__name__)
         self._loop_check = threading.local()
         self._pool = None
 
+        self._submissions = collections.deque()
+        self._drain_scheduled = False
+
         _check_patch_python_3_8_0()
 
     def start(self, aug='EventLoopThread'):
@@ -443,6 +459,7 @@ class BackgroundEventLoop:
             self._logger.exception("Exception raised from event loop thread")
         finally:
             self.loop.close()
+            self._cancel_submissions()
 
     # pylint:disable=too-many-arguments;These all have sane defaults that should not be changed often.
     def add_task(self, cor, name=None, finalizer=None, stop_timeout=1.0, parent=None):
@@ -571,7 +588,123 @@ class BackgroundEventLoop:
         if self.inside_loop():
             return asyncio.ensure_future(cor, loop=self.loop)
 
-        return asyncio.run_coroutine_threadsafe(cor, loop=self.loop)
+        return self._submit_threadsafe(cor)
+
+    def enable_latency_histograms(self, enabled=True):
+        """Start or stop recording latency histograms for launched coroutines.
+
+        When enabled, every coroutine launched from outside the event loop by
+        run_coroutine() or launch_coroutine() records how long it waited
+        before it was started in ``queue_latency`` and how long it ran for
+        in ``execution_latency``.  Enabling the histograms again clears them.
+
+        Args:
+            enabled (bool): Whether to record latencies.  Disabling recording
+                discards the histograms.
+        """
+
+        if enabled:
+            self.queue_latency = LatencyHistogram()
+            self.execution_latency = LatencyHistogram()
+        else:
+            self.queue_latency = None
+            self.execution_latency = None
+
+    def _submit_threadsafe(self, cor):
+        """Queue a coroutine to be started by the loop and return a concurrent Future.
+
+        Appending to a deque is atomic, so no lock is needed.  The loop is
+        only woken up if a drain of the queue is not already scheduled.
+        _drain_submissions clears the flag before it empties the queue, so a
+        coroutine appended while it is running either gets started by it or
+        schedules another drain.
+
+        Raises:
+            TypeError: ``cor`` is not a coroutine object.
+        """
+
+        if not asyncio.iscoroutine(cor):
+            raise TypeError("A coroutine object is required: %r" % (cor,))
+
+        future = concurrent.futures.Future()
+        submitted = time.perf_counter() if self.queue_latency is not None else None
+        self._submissions.append((cor, future, submitted))
+
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            self.loop.call_soon_threadsafe(self._drain_submissions)
+
+        return future
+
+    def _drain_submissions(self):
+        """Start every coroutine that has been queued from other threads."""
+
+        self._drain_scheduled = False
+
+        while True:
+            try:
+                cor, future, submitted = self._submissions.popleft()
+            except IndexError:
+                break
+
+            if future.cancelled():
+                cor.close()
+                continue
+
+            started = None
+            queue_latency = self.queue_latency
+            if submitted is not None and queue_latency is not None:
+                started = time.perf_counter()
+                queue_latency.record(started - submitted)
+
+            try:
+                task = self.loop.create_task(cor)
+            except Exception as err:  #pylint:disable=broad-except;The error is passed to the waiting thread
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(err)
+                continue
+
+            task.add_done_callback(functools.partial(self._finish_submission, future, started))
+            future.add_done_callback(functools.partial(self._cancel_submission, task))
+
+    def _finish_submission(self, future, started, task):
+        """Copy the result of a finished task to the concurrent future waiting on it."""
+
+        execution_latency = self.execution_latency
+        if started is not None and execution_latency is not None:
+            execution_latency.record(time.perf_counter() - started)
+
+        # Always retrieve the exception so asyncio does not log it as unhandled
+        if task.cancelled():
+            exc = concurrent.futures.CancelledError()
+        else:
+            exc = task.exception()
+
+        if not future.set_running_or_notify_cancel():
+            return
+
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(task.result())
+
+    def _cancel_submission(self, task, future):
+        """Cancel a task if the concurrent future waiting on it was cancelled."""
+
+        if future.cancelled() and self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(task.cancel)
+
+    def _cancel_submissions(self):
+        """Fail any queued coroutines that will never be started because the loop stopped."""
+
+        self._drain_scheduled = False
+
+        while self._submissions:
+            cor, future, _submitted = self._submissions.popleft()
+            cor.close()
+
+            if future.set_running_or_notify_cancel():
+                future.set_exception(LoopStoppingError("Event loop stopped before coroutine could start"))
 
     def run_in_executor(self, func, *args, **kwargs):
         """Execute a function on a background executor.
@@ -0,0 +1,93 @@
+"""A compact histogram of latencies with power of two buckets."""
+
+
+class LatencyHistogram:
+    """Record latencies into logarithmically sized buckets.
+
+    Bucket ``i`` counts latencies less than ``2**i`` microseconds that did not
+    fit into a smaller bucket, so recording a value is cheap and the
+    histogram has a fixed size no matter how many values are recorded.
+    Latencies longer than the largest bucket, about 16 seconds, are counted
+    in the last bucket.
+
+    This class is not thread-safe, values should only be recorded from a
+    single thread such as the event loop.
+    """
+
+    BUCKETS = 25
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, latency):
+        """Record a single latency.
+
+        Args:
+            latency (float): The latency in seconds.
+        """
+
+        bucket = min(int(latency * 1e6).bit_length(), self.BUCKETS - 1)
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += latency
+
+        if latency > self.max:
+            self.max = latency
+
+    def reset(self):
+        """Clear all recorded latencies."""
+
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def percentile(self, percent):
+        """Estimate a percentile of the recorded latencies.
+
+        The estimate is the upper bound of the bucket containing the
+        percentile, so it is never more than twice the true value.
+
+        Args:
+            percent (float): The percentile to estimate, from 0 to 100.
+
+        Returns:
+            float: The estimated latency in seconds or 0.0 if nothing has
+            been recorded.
+        """
+
+        if self.count == 0:
+            return 0.0
+
+        target = self.count * percent / 100.0
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count > 0 and seen >= target:
+                return min((1 << bucket) / 1e6, self.max)
+
+        return self.max
+
+    def buckets(self):
+        """Get the nonempty buckets of the histogram.
+
+        Returns:
+            list(tuple): A list of (upper bound in seconds, count) tuples.
+        """
+
+        return [((1 << bucket) / 1e6, count) for bucket, count in enumerate(self.counts) if count > 0]
+
+    def summary(self):
+        """Summarize the recorded latencies.
+
+        Returns:
+            dict: The number of latencies recorded and their mean, 50th, 90th
+            and 99th percentile and maximum in seconds.
+        """
+
+        mean = self.total / self.count if self.count else 0.0
+        return dict(count=self.count, mean=mean, p50=self.percentile(50), p90=self.percentile(90),
+                    p99=self.percentile(99), max=self.max)
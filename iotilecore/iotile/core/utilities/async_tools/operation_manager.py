@@ -32,6 +32,7 @@ messages they are waiting for to continue their operation.
 
 import asyncio
 import inspect
+import functools
 import logging
 from collections import deque
 from iotile.core.exceptions import ArgumentError, InternalError
@@ -39,10 +40,19 @@ from . import event_loop
 
 
 class MessageSpec:
-    __slots__ = ['fields']
+    """A specification of the fields a message must have to match.
+
+    The field names and values are also stored as two parallel tuples sorted
+    by field name, which are used to index waiters so that matching a
+    message is a dictionary lookup for each distinct set of field names.
+    """
+
+    __slots__ = ['fields', 'keys', 'values']
 
     def __init__(self, **kwargs):
         self.fields = kwargs
+        self.keys = tuple(sorted(kwargs))
+        self.values = tuple(kwargs[key] for key in self.keys)
 
 
 class OperationManager:
@@ -66,14 +76,22 @@ class OperationManager:
     callback every time a certain kind of message is received, use
     OperationManager.every_match().
 
+    Waiters are indexed by the set of field names they match on and then by
+    the values of those fields, so processing a message costs one dictionary
+    lookup per distinct set of field names, regardless of how many waiters
+    are registered.  For example, all of the response waiters in a socket
+    client match on ``type`` and ``uuid`` so correlating a response with its
+    command is a single lookup.
+
+    The number of messages processed, matched and ignored is available from
+    the ``counters`` property.
+
     Args:
         loop (BackgroundEventLoop): The background event loop we should
             use to perform all callbacks and blocking waits.  If not specified,
             the global, shared event loop is used.
     """
 
-    _LEAF = object()
-
     def __init__(self, loop=event_loop.SharedLoop):
         if not isinstance(loop, event_loop.BackgroundEventLoop):
             raise ArgumentError("loop must be a BackgroundEventLoop, was {}".format(loop))
@@ -87,29 +105,27 @@ class OperationManager:
         self._dispatch_lock = loop.create_lock()
         self._process_pending = False
 
-    def _add_waiter(self, spec, responder=None, pause=False):
+        self._processed_count = 0
+        self._matched_count = 0
+        self._ignored_count = 0
 
-        if responder is not None and pause is True:
-            raise ArgumentError("You can only pause after waiting for future based waiters")
+    @property
+    def counters(self):
+        """A dict with the number of messages processed, matched and ignored."""
 
-        loc = self._waiters
-        for key, value in sorted(spec.fields.items()):
-            if key not in loc:
-                loc[key] = {}
+        return dict(processed=self._processed_count, matched=self._matched_count,
+                    ignored=self._ignored_count)
 
-            loc = loc[key]
-            if value not in loc:
-                loc[value] = {}
-
-            loc = loc[value]
+    def _add_waiter(self, spec, responder=None, pause=False):
 
-        if OperationManager._LEAF not in loc:
-            loc[OperationManager._LEAF] = set()
+        if responder is not None and pause is True:
+            raise ArgumentError("You can only pause after waiting for future based waiters")
 
         if responder is None:
             responder = self._loop.create_future()
 
-        loc[OperationManager._LEAF].add(responder)
+        index = self._waiters.setdefault(spec.keys, {})
+        index.setdefault(spec.values, set()).add(responder)
 
         if pause:
             self._should_pause.add(responder)
@@ -117,43 +133,25 @@ class OperationManager:
         return responder
 
     def _remove_waiter(self, spec, future):
-        loc = self._waiters
-
-        parents = []
-
-        for key, value in sorted(spec.fields.items()):
-            parents.append((loc, key))
-
-            loc = loc.get(key)
-            if loc is None:
-                return
-
-            parents.append((loc, value))
+        self._should_pause.discard(future)
 
-            loc = loc.get(value)
-            if loc is None:
-                return
-
-        futures = loc.get(OperationManager._LEAF)
-        if futures is None or future not in futures:
+        index = self._waiters.get(spec.keys)
+        if index is None:
             return
 
-        futures.remove(future)
-        if len(futures) > 0:
+        responders = index.get(spec.values)
+        if responders is None or future not in responders:
             return
 
-        del loc[OperationManager._LEAF]
-
-        for parent, key in reversed(parents):
-            if len(parent[key]) > 0:
-                return
-
-            del parent[key]
+        responders.remove(future)
+        if len(responders) > 0:
+            return
 
-        if future in self._should_pause:
-            self._should_pause.remove(future)
+        del index[spec.values]
+        if len(index) == 0:
+            del self._waiters[spec.keys]
 
-    def waiters(self, path=None):
+    def waiters(self):
         """Iterate over all waiters.
 
         This method will return the waiters in unspecified order
@@ -164,23 +162,11 @@ class OperationManager:
             list, future or callable
         """
 
-        context = self._waiters
-
-        if path is None:
-            path = []
-
-        for key in path:
-            context = context[key]
-
-        if self._LEAF in context:
-            for future in context[self._LEAF]:
-                yield (path, future)
-
-        for key in context:
-            if key is self._LEAF:
-                continue
-
-            yield from self.waiters(path=path + [key])
+        for keys, index in self._waiters.items():
+            for values, responders in index.items():
+                path = [item for pair in zip(keys, values) for item in pair]
+                for responder in responders:
+                    yield (path, responder)
 
     def every_match(self, callback, **kwargs):
         """Invoke callback every time a matching message is received.
@@ -415,39 +401,48 @@ class OperationManager:
             bool: True if at least one waiter matched, otherwise False.
         """
 
-        to_check = deque([self._waiters])
-        ignored = True
-
+        if isinstance(message, dict):
+            get = message.get
+        else:
+            get = functools.partial(_get_key, message)
+
+        matched = []
+        for keys, index in self._waiters.items():
+            if len(keys) == 1:
+                values = (get(keys[0], _MISSING),)
+            elif len(keys) == 2:
+                values = (get(keys[0], _MISSING), get(keys[1], _MISSING))
+            else:
+                values = tuple(get(key, _MISSING) for key in keys)
+
+            responders = index.get(values)
+            if responders is not None:
+                matched.extend(responders)
+
+        self._processed_count += 1
+        if len(matched) == 0:
+            self._ignored_count += 1
+            return False
+
+        self._matched_count += 1
+
+        # Waiters are collected before any are called since callbacks may
+        # add or remove waiters.
         processors = list()
-
-        while len(to_check) > 0:
-            context = to_check.popleft()
-
-            waiters = context.get(OperationManager._LEAF, [])
-            for waiter in waiters:
-                if isinstance(waiter, asyncio.Future):
-                    if waiter in self._should_pause:
-                        self.pause()
-
-                    waiter.set_result(message)
-                else:
-                    proc = _launch(waiter, message, wait)
-                    if proc is not None:
-                        processors.append(proc)
-
-                ignored = False
-
-            for key in context:
-                if key is OperationManager._LEAF:
+        for waiter in matched:
+            if isinstance(waiter, asyncio.Future):
+                # A future that timed out may not have been removed yet
+                if waiter.done():
                     continue
 
-                message_val = _get_key(message, key)
-                if message_val is _MISSING:
-                    continue
+                if waiter in self._should_pause:
+                    self.pause()
 
-                next_level = context[key]
-                if message_val in next_level:
-                    to_check.append(next_level[message_val])
+                waiter.set_result(message)
+            else:
+                proc = _launch(waiter, message, wait)
+                if proc is not None:
+                    processors.append(proc)
 
         if len(processors) > 0 and wait:
             results = await asyncio.gather(*processors, return_exceptions=True)
@@ -455,7 +450,7 @@ class OperationManager:
                 if isinstance(result, Exception) and not isinstance(result, asyncio.CancelledError):
                     self._logger.error("Error running processor %s: %s", proc, result)
 
-        return not ignored
+        return True
 
     async def process_all(self):
         """Process all messages that have been queued.
@@ -1,6 +1,8 @@
 import pytest
 import os
-from iotile.core.dev.registry import ComponentRegistry, _check_registry_type
+import json
+from iotile.core.dev import registry as registry_module
+from iotile.core.dev.registry import ComponentRegistry, _check_registry_type, _entrypoint_fingerprint
 from iotile.core.exceptions import ArgumentError
 from iotile.core.utilities.kvstore_json import JSONKVStore
 
@@ -67,3 +69,58 @@ def test_backing_store_type(tmpdir):
     _check_registry_type(str(regdir))
 
     assert ComponentRegistry.BackingType is JSONKVStore
+
+
+def test_extension_index(tmpdir, monkeypatch):
+    """Make sure the extension index is built once and revalidated."""
+
+    monkeypatch.setattr(registry_module, '_registry_folder', lambda folder=None: str(tmpdir))
+    index_path = str(tmpdir.join(ComponentRegistry.ExtensionIndexFileName))
+
+    reg = ComponentRegistry()
+    reg.invalidate_extension_index()
+
+    expected = sorted(x.name for x in registry_module.entrypoints.get_group_all('iotile.auth_provider'))
+    found = sorted(x.name for x in reg._iter_entrypoint_group('iotile.auth_provider'))
+    assert found == expected
+    assert os.path.isfile(index_path)
+
+    # Make sure a valid index on disk is used rather than rescanning entry_points
+    with open(index_path, "r") as infile:
+        index = json.load(infile)
+
+    index['extensions']['iotile.auth_provider'] = [dict(name='FakeProvider', object='fake_module:FakeProvider',
+                                                        distribution=None)]
+    with open(index_path, "w") as outfile:
+        json.dump(index, outfile)
+
+    ComponentRegistry._extension_index = None
+    assert [x.name for x in reg._iter_entrypoint_group('iotile.auth_provider')] == ['FakeProvider']
+    assert reg.load_extensions('iotile.auth_provider', name_filter='EnvAuthProvider') == []
+
+    # Make sure a stale index is rebuilt
+    index['fingerprint'] = 'stale'
+    with open(index_path, "w") as outfile:
+        json.dump(index, outfile)
+
+    ComponentRegistry._extension_index = None
+    found = sorted(x.name for x in reg._iter_entrypoint_group('iotile.auth_provider'))
+    assert found == expected
+
+    reg.invalidate_extension_index()
+    assert not os.path.isfile(index_path)
+
+
+def test_entrypoint_fingerprint(tmpdir):
+    """Make sure only folders containing distributions affect the fingerprint."""
+
+    site = tmpdir.mkdir('site')
+    entry_points = site.mkdir('package-1.0.0.dist-info').join('entry_points.txt')
+    entry_points.write('[iotile.auth_provider]\nEnvAuthProvider = module:EnvAuthProvider\n')
+    empty = str(tmpdir.mkdir('empty'))
+
+    fingerprint = _entrypoint_fingerprint([str(site)])
+    assert _entrypoint_fingerprint([empty, str(site), str(site), str(tmpdir.join('missing'))]) == fingerprint
+
+    entry_points.write('[iotile.auth_provider]\n')
+    assert _entrypoint_fingerprint([str(site)]) != fingerprint
@@ -5,7 +5,7 @@ non-coroutine based interface for use from HardwareManager or a simple script.
 """
 
 import pytest
-from iotile.core.hw.transport import AdapterStream
+from iotile.core.hw.transport import AdapterStream, BoundedQueue
 from iotile.core.utilities import BackgroundEventLoop
 
 
@@ -24,3 +24,31 @@ def stream():
     """A fresh adapter stream."""
 
     pass
+
+
+def test_bounded_queue_drop_oldest():
+    """Make sure full queues drop their oldest item by default."""
+
+    to_test = BoundedQueue(3)
+
+    for i in range(0, 5):
+        to_test.put(i)
+
+    assert to_test.dropped == 2
+    assert to_test.qsize() == 3
+    assert to_test.get_many(2) == [2, 3]
+    assert to_test.get_many() == [4]
+    assert to_test.get_many(block=True, timeout=0.01) == []
+
+
+def test_bounded_queue_never_blocks():
+    """Make sure put() on a full queue returns immediately and drops are reported."""
+
+    to_test = BoundedQueue(2)
+
+    to_test.put(1)
+    to_test.put(2)
+    to_test.put(3, timeout=0.01)
+
+    assert to_test.get_many(with_dropped=True) == ([2, 3], 1)
+    assert to_test.get_many(with_dropped=True) == ([], 1)
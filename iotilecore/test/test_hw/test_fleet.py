@@ -0,0 +1,148 @@
+"""Tests of sending RPCs to many devices in parallel."""
+
+import asyncio
+import pytest
+from iotile.core.exceptions import ArgumentError
+from iotile.core.hw.exceptions import RPCNotFoundError
+from iotile.core.hw.fleet import FleetRPCRunner
+from iotile.core.hw.transport import VirtualDeviceAdapter
+from iotile.core.hw.virtual import SimpleVirtualDevice, rpc
+from iotile.core.utilities import BackgroundEventLoop
+
+
+class SlowDevice(SimpleVirtualDevice):
+    """A device with an RPC that takes a little while to respond."""
+
+    def __init__(self, iotile_id, loop):
+        super(SlowDevice, self).__init__(iotile_id, 'Slow01', loop=loop)
+
+    @rpc(8, 0x8000, "", "L")
+    def get_id(self):
+        return [self.iotile_id]
+
+
+class LimitedAdapter(VirtualDeviceAdapter):
+    """A virtual adapter with a limited number of connection slots."""
+
+    def __init__(self, devices, loop, slots, connect_delay=0.0):
+        super(LimitedAdapter, self).__init__(devices=devices, loop=loop)
+        self.slots = slots
+        self.connect_delay = connect_delay
+        self.hang_on = set()
+        self.connecting = 0
+        self.max_connecting = 0
+        self.max_connected = 0
+
+    def can_connect(self):
+        return len(self._connections) < self.slots
+
+    async def connect(self, conn_id, connection_string):
+        self.connecting += 1
+        self.max_connecting = max(self.max_connecting, self.connecting)
+
+        try:
+            await asyncio.sleep(self.connect_delay)
+            await super(LimitedAdapter, self).connect(conn_id, connection_string)
+            if connection_string in self.hang_on:
+                await asyncio.sleep(10.0)
+        finally:
+            self.connecting -= 1
+
+        self.max_connected = max(self.max_connected, len(self._connections))
+
+    async def send_rpc(self, conn_id, address, rpc_id, payload, timeout):
+        await asyncio.sleep(0.01)
+        return await super(LimitedAdapter, self).send_rpc(conn_id, address, rpc_id, payload, timeout)
+
+
+@pytest.fixture(scope="function")
+def loop():
+    """A clean event loop."""
+
+    loop = BackgroundEventLoop()
+    loop.start()
+    yield loop
+    loop.stop()
+
+
+@pytest.fixture(scope="function")
+def adapter(loop):
+    """A virtual adapter with 10 devices that allows 3 connections."""
+
+    devices = [SlowDevice(i, loop) for i in range(1, 11)]
+    adapter = LimitedAdapter(devices, loop, 3)
+
+    loop.run_coroutine(adapter.start())
+    yield adapter
+    loop.run_coroutine(adapter.stop())
+
+
+def test_fleet_rpcs(loop, adapter):
+    """Make sure RPCs are sent to every device without exceeding the adapter's slots."""
+
+    runner = FleetRPCRunner(adapter, max_concurrent=5, device_timeout=2.0)
+    devices = {i: str(i) for i in range(1, 11)}
+    rpcs = [(8, 0x8000, b'', 1.0), (8, 0x8001, b'', 1.0)]
+
+    results = loop.run_coroutine(runner.run_all(devices, rpcs))
+
+    assert sorted(x.device for x in results) == list(range(1, 11))
+    assert adapter.max_connected == 3
+    assert len(adapter._connections) == 0
+
+    for result in results:
+        assert result.success
+        assert result.attempts == 1
+        assert result.results[0] == result.device.to_bytes(4, 'little')
+        assert isinstance(result.results[1], RPCNotFoundError)
+
+
+def test_fleet_retries(loop, adapter):
+    """Make sure devices that cannot be connected to are retried and reported."""
+
+    runner = FleetRPCRunner(adapter, device_timeout=2.0, retries=2)
+
+    results = loop.run_coroutine(runner.run_all(['1', '100'], [(8, 0x8000, b'', 1.0)]))
+    results = {x.device: x for x in results}
+
+    assert results['1'].success
+    assert not results['100'].success
+    assert results['100'].attempts == 3
+    assert results['100'].results is None
+
+    with pytest.raises(ArgumentError):
+        FleetRPCRunner(adapter, max_concurrent=0)
+
+
+def test_parallel_connects(loop):
+    """Make sure connections are started in parallel up to the adapter's max_connections."""
+
+    devices = [SlowDevice(i, loop) for i in range(1, 7)]
+    adapter = LimitedAdapter(devices, loop, 3, connect_delay=0.05)
+    adapter.set_config('max_connections', 3)
+    loop.run_coroutine(adapter.start())
+
+    try:
+        runner = FleetRPCRunner(adapter, max_concurrent=6, device_timeout=2.0)
+        results = loop.run_coroutine(runner.run_all([str(i) for i in range(1, 7)], [(8, 0x8000, b'', 1.0)]))
+    finally:
+        loop.run_coroutine(adapter.stop())
+
+    assert all(result.success for result in results)
+    assert adapter.max_connecting == 3
+    assert adapter.max_connected == 3
+
+
+def test_connect_timeout_disconnects(loop, adapter):
+    """Make sure a connection that times out part way through does not leak a slot."""
+
+    adapter.hang_on.add('1')
+    runner = FleetRPCRunner(adapter, device_timeout=0.2, retries=1)
+
+    results = loop.run_coroutine(runner.run_all(['1', '2'], [(8, 0x8000, b'', 1.0)]))
+    results = {x.device: x for x in results}
+
+    assert results['2'].success
+    assert not results['1'].success
+    assert results['1'].attempts == 2
+    assert len(adapter._connections) == 0
@@ -64,3 +64,24 @@ def test_set_version():
     assert str(script2.records[0]) == u'Set device app to (tag:12 version:3.4)'
     assert str(script2.records[1]) == u'Set device os to (tag:56, version:7.8)'
     assert str(script2.records[2]) == u'Set device os to (tag:12, version:3.4) and app to (tag:56, version:7.8)'
+
+
+def test_iter_records():
+    """Make sure records can be parsed lazily from bytes or a bytearray."""
+
+    records = [ReflashTileRecord(1, bytearray(100), 0x1000)]
+    records += [SendRPCRecord(10 + i, 0x8000, bytes([i, i + 1])) for i in range(0, 50)]
+    records.append(UnknownRecord(128, bytearray(15)))
+
+    encoded = UpdateScript(records).encode()
+
+    for data in (encoded, bytes(encoded)):
+        script = UpdateScript.FromBinary(data)
+        parsed = UpdateScript.iter_records(data)
+
+        assert next(parsed) == records[0]
+        assert list(parsed) == script.records[1:]
+        assert script == UpdateScript(records)
+
+    with pytest.raises(ArgumentError):
+        list(UpdateScript.iter_records(encoded[:-1]))
@@ -212,6 +212,59 @@ def test_realtime_tracing(tracer_hw):
     assert len(wrong_data) == 0
 
 
+def test_realtime_tracing_chunks(tracer_hw):
+    """Make sure trace data is returned correctly across many trace chunks."""
+
+    tracer_hw.connect_direct('1')
+    tracer_hw.enable_tracing()
+
+    first = tracer_hw.wait_trace(37, timeout=5.0)
+    second = tracer_hw.wait_trace(100, timeout=5.0)
+
+    assert len(first) == 37
+    assert len(second) == 100
+
+    words = (first + second).decode('utf-8').split(' ')
+    assert len([x for x in words[1:-1] if x not in ('hello', 'goodbye')]) == 0
+
+
+def test_realtime_tracing_dropped(tracer_hw):
+    """Make sure a gap in trace data from a full trace queue is reported."""
+
+    tracer_hw.connect_direct('1')
+    tracer_hw.stream._queue_size = 2
+    tracer_hw.enable_tracing()
+
+    time.sleep(0.1)
+
+    with pytest.raises(DataError):
+        tracer_hw.wait_trace(100, timeout=5.0)
+
+    # Only the chunks that were still queued after the gap are kept
+    assert tracer_hw._trace_size <= len('goodbye ') * 2
+
+
+def test_realtime_report_batches(realtime_hw):
+    """Make sure we can drain reports in batches."""
+
+    realtime_hw.connect_direct('1')
+    realtime_hw.enable_streaming()
+
+    time.sleep(0.35)
+
+    batches = []
+    for batch in realtime_hw.iter_reports(batch=2):
+        assert 0 < len(batch) <= 2
+        batches.append(batch)
+
+    assert len(batches) > 0
+
+    time.sleep(0.25)
+    reports = realtime_hw.drain_reports()
+    assert len(reports) > 0
+    assert realtime_hw.count_reports() == 0
+
+
 def test_virtual_scan(realtime_scan_hw):
     """Make sure we can scan for virtual devices and connect directly without connect_direct
     """
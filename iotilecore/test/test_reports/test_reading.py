@@ -1,4 +1,6 @@
-from datetime import datetime
+import copy
+import pickle
+from datetime import datetime, timedelta
 from iotile.core.hw.reports.report import IOTileReading, IOTileEvent
 
 
@@ -47,3 +49,42 @@ def test_event():
     assert event.stream == 1
     assert event.summary_data == {'test': 'a'}
     assert event.raw_data == {'test 2': 1}
+
+
+def test_lazy_reading_time():
+    """Make sure reading times are calculated on demand and survive copies."""
+
+    time_base = datetime(2018, 1, 1)
+    reading = IOTileReading(100, 1, 2, time_base=time_base)
+
+    for copied in (copy.copy(reading), copy.deepcopy(reading), pickle.loads(pickle.dumps(reading))):
+        assert copied.reading_time == time_base + timedelta(seconds=100)
+
+    assert reading.reading_time == time_base + timedelta(seconds=100)
+
+    reading = IOTileReading((1 << 31) | 10, 1, 2)
+    assert reading.reading_time == datetime(2000, 1, 1, 0, 0, 10)
+
+    reading = IOTileReading(10, 1, 2)
+    assert reading.reading_time is None
+
+    reading.reading_time = time_base
+    assert reading.reading_time == time_base
+
+    assert not hasattr(reading, '__dict__')
+
+
+def test_clone():
+    """Make sure readings can be cloned into a new stream."""
+
+    reading = IOTileReading(10, 1, 2, reading_id=5, time_base=datetime(2018, 1, 1))
+
+    clone = reading.clone(0x5001)
+    assert clone.stream == 0x5001
+    assert clone.raw_time == 10
+    assert clone.value == 2
+    assert clone.reading_id == 5
+    assert clone.reading_time == reading.reading_time
+    assert reading.stream == 1
+
+    assert reading.clone() == reading
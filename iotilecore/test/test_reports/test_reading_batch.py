@@ -0,0 +1,60 @@
+"""Tests to ensure that ReadingBatch decodes packed readings correctly."""
+
+import struct
+import datetime
+import pytest
+from iotile.core.hw.reports import ReadingBatch, IOTileReading, SignedListReport, BroadcastReport
+
+
+def _pack(readings):
+    return b''.join(struct.pack("<HHLLL", x.stream, 0, x.reading_id, x.raw_time, x.value) for x in readings)
+
+
+def test_columns():
+    """Make sure packed readings are split into the right columns."""
+
+    readings = [IOTileReading(i * 10, 0x5000 + i, 0xFFFFFFFF - i, reading_id=i + 1) for i in range(0, 100)]
+    batch = ReadingBatch.FromPacked(memoryview(_pack(readings)))
+
+    assert len(batch) == 100
+    assert list(batch.streams) == [x.stream for x in readings]
+    assert list(batch.reading_ids) == [x.reading_id for x in readings]
+    assert list(batch.raw_times) == [x.raw_time for x in readings]
+    assert list(batch.values) == [x.value for x in readings]
+
+    assert batch == readings
+    assert batch[-1] == readings[-1]
+    assert batch[10:12] == readings[10:12]
+    assert batch[5] is batch[5]
+
+    with pytest.raises(IndexError):
+        batch[100]
+
+    with pytest.raises(ValueError):
+        ReadingBatch.FromPacked(b'\x00' * 15)
+
+
+def test_lazy_utc():
+    """Make sure UTC times are calculated the same way as IOTileReading."""
+
+    time_base = datetime.datetime(2018, 1, 1)
+    readings = [IOTileReading(100, 0x5000, 1, time_base=time_base),
+                IOTileReading((1 << 31) | 100, 0x5000, 2, time_base=time_base)]
+
+    batch = ReadingBatch.FromPacked(_pack(readings), time_base=time_base)
+    assert batch.reading_times == [x.reading_time for x in readings]
+    assert [x.reading_time for x in batch] == [x.reading_time for x in readings]
+
+
+def test_report_decoding():
+    """Make sure signed list and broadcast reports decode into batches."""
+
+    readings = [IOTileReading(i, 0x5000, i, reading_id=i + 1) for i in range(0, 50)]
+
+    signed = SignedListReport(SignedListReport.FromReadings(1, readings).encode())
+    assert isinstance(signed.visible_readings, ReadingBatch)
+    assert signed.visible_readings == readings
+
+    broadcast = BroadcastReport(BroadcastReport.FromReadings(1, readings).encode())
+    assert isinstance(broadcast.visible_readings, ReadingBatch)
+    assert broadcast.visible_readings == readings
@@ -7,6 +7,7 @@ from iotile.core.hw.reports.report import IOTileReading
 from iotile.core.hw.reports.individual_format import IndividualReadingReport
 from iotile.core.hw.reports.signed_list_format import SignedListReport
 import struct
+import random
 import datetime
 
 def make_report(uuid, stream, value, timestamp, sent_time):
@@ -138,3 +139,30 @@ class TestReportParser(unittest.TestCase):
             assert reading.raw_time == i
             assert reading.reading_id == i+1
             assert reading.stream == 2
+
+    def test_random_chunks(self):
+        """Make sure back to back reports are parsed from arbitrary chunks."""
+
+        rand = random.Random(1)
+        reports = [make_sequential(1, 0x5000 + i, i + 1, True) for i in range(0, 50)]
+        data = b''.join(reports)
+
+        offset = 0
+        while offset < len(data):
+            size = rand.randint(1, 200)
+            self.parser.add_data(data[offset:offset + size])
+            offset += size
+
+        assert len(self.parser.reports) == len(reports)
+        assert [x.encode() for x in self.parser.reports] == reports
+        assert len(self.parser.raw_data) == 0
+
+        parser = IOTileReportParser()
+        chunks = [data[i:i + 37] for i in range(0, len(data), 37)]
+        parser.feed_many(chunks[:-1])
+        assert len(parser.reports) == len(reports) - 1
+        assert len(parser.raw_data) > 0
+
+        parser.feed_many(chunks[-1:])
+        assert [x.encode() for x in parser.reports] == reports
+        assert parser.state == parser.WaitingForReportType
@@ -6,6 +6,7 @@ from iotile.core.hw.reports.signed_list_format import SignedListReport, ReportSi
 from iotile.core.hw.reports.report import IOTileReading
 from iotile.core.hw.auth.env_auth_provider import EnvAuthProvider
 from iotile.core.hw.auth.auth_provider import AuthProvider
+from iotile.core.hw.auth.auth_chain import ChainedAuthProvider
 
 
 def make_sequential(iotile_id, stream, num_readings, give_ids=False, root_key=AuthProvider.NoKey, signer=None):
@@ -98,3 +99,46 @@ def test_str_conversion():
 
     str_report = str(report)
     assert str_report == 'IOTile Report (length: 204, visible readings: 10, visible events: 0, verified and not encrypted)'
+
+
+def test_shared_auth_provider():
+    """Make sure the shared auth provider is reused until invalidated."""
+
+    shared = ChainedAuthProvider.Shared()
+    assert ChainedAuthProvider.Shared() is shared
+
+    ChainedAuthProvider.InvalidateShared()
+    assert ChainedAuthProvider.Shared() is not shared
+
+
+def test_cached_derived_keys(monkeypatch):
+    """Make sure only reusable keys are cached and they follow changes to the root key."""
+
+    monkeypatch.setenv('USER_KEY_00000002', '0000000000000000000000000000000000000000000000000000000000000000')
+    signer = EnvAuthProvider()
+    rotation = dict(reboot_counter=1, rotation_interval_power=5, current_timestamp=100)
+
+    key1 = signer.get_rotated_key(AuthProvider.UserKey, 2, **rotation)
+    assert isinstance(key1, bytes)
+    assert signer.get_rotated_key(AuthProvider.UserKey, 2, **dict(rotation, current_timestamp=101)) == key1
+    assert len(signer._key_cache) == 2
+
+    # One time report keys are never cached
+    report_key = signer.get_serialized_key(AuthProvider.UserKey, 2, report_id=1, sent_timestamp=2)
+    assert len(signer._key_cache) == 2
+
+    monkeypatch.setenv('USER_KEY_00000002', '1111111111111111111111111111111111111111111111111111111111111111')
+    root_key = signer.get_root_key(AuthProvider.UserKey, 2)
+    key2 = signer.get_rotated_key(AuthProvider.UserKey, 2, **rotation)
+    assert key2 != key1
+    assert key2 == AuthProvider.DeriveRotatedKey(AuthProvider.DeriveRebootKey(root_key, 0, 1), 100, 5)
+    assert signer.get_serialized_key(AuthProvider.UserKey, 2, report_id=1, sent_timestamp=2) != report_key
+    assert all(bytes(root_key) not in entry for entry in signer._key_cache._keys)
+
+    report1 = make_sequential(2, 0x1000, 10, give_ids=True, root_key=AuthProvider.UserKey, signer=signer)
+    encoded = report1.encode()
+
+    for _i in range(0, 3):
+        report2 = SignedListReport(encoded)
+        assert report2.verified
+        assert report2.visible_readings == report1.visible_readings
@@ -1,6 +1,8 @@
 """Tests for the shared background EventLoop."""
 
 import asyncio
+import threading
+import concurrent.futures
 import pytest
 import time
 from iotile.core.utilities import BackgroundEventLoop
@@ -171,3 +173,113 @@ def test_subtasks_nocleanup(clean_loop):
 
     assert subtask.task.done()
     assert subtask.task.cancelled()
+
+
+def test_many_threads(clean_loop):
+    """Make sure coroutines launched from many threads at once all run."""
+
+    async def _double(value):
+        await asyncio.sleep(0)
+        return value * 2
+
+    results = {}
+
+    def _worker(index):
+        results[index] = [clean_loop.run_coroutine(_double, index * 100 + i) for i in range(0, 100)]
+
+    threads = [threading.Thread(target=_worker, args=(i,)) for i in range(0, 8)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    for index in range(0, 8):
+        assert results[index] == [2 * (index * 100 + i) for i in range(0, 100)]
+
+
+def test_cancel_launched_coroutine(clean_loop):
+    """Make sure cancelling a launched coroutine's future cancels it."""
+
+    started = threading.Event()
+    cancelled = threading.Event()
+
+    async def _wait_forever():
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    future = clean_loop.launch_coroutine(_wait_forever)
+    assert started.wait(1.0)
+
+    assert future.cancel()
+    assert cancelled.wait(1.0)
+
+    with pytest.raises(concurrent.futures.CancelledError):
+        future.result()
+
+
+def test_latency_histograms(clean_loop):
+    """Make sure queueing and execution latencies are recorded when enabled."""
+
+    async def _sleep():
+        await asyncio.sleep(0.01)
+
+    clean_loop.run_coroutine(_sleep)
+    assert clean_loop.queue_latency is None
+
+    clean_loop.enable_latency_histograms()
+    for _i in range(0, 5):
+        clean_loop.run_coroutine(_sleep)
+
+    assert clean_loop.queue_latency.count == 5
+    assert clean_loop.execution_latency.count == 5
+
+    summary = clean_loop.execution_latency.summary()
+    assert summary['count'] == 5
+    assert 0.01 <= summary['max'] < 1.0
+    assert 0.01 <= summary['p50'] <= summary['max']
+
+    clean_loop.enable_latency_histograms(False)
+    clean_loop.run_coroutine(_sleep)
+    assert clean_loop.execution_latency is None
+
+
+def test_launch_non_coroutine(clean_loop):
+    """Make sure launching something that is not a coroutine fails immediately."""
+
+    with pytest.raises(TypeError):
+        clean_loop.launch_coroutine(object())
+
+    assert clean_loop.run_coroutine(asyncio.sleep(0, result=1)) == 1
+
+
+def test_failed_submission(clean_loop, monkeypatch):
+    """Make sure an error starting one queued coroutine fails only its future."""
+
+    async def _return(value):
+        return value
+
+    asyncio_loop = clean_loop.get_loop()
+    create_task = asyncio_loop.create_task
+    bad = _return(1)
+
+    def _create_task(cor):
+        if cor is bad:
+            bad.close()
+            raise RuntimeError("Could not create task")
+
+        return create_task(cor)
+
+    monkeypatch.setattr(asyncio_loop, 'create_task', _create_task)
+
+    failed = clean_loop.launch_coroutine(bad)
+    launched = clean_loop.launch_coroutine(_return(2))
+
+    with pytest.raises(RuntimeError):
+        failed.result(timeout=1.0)
+
+    assert launched.result(timeout=1.0) == 2
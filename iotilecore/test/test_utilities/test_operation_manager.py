@@ -105,3 +105,32 @@ def test_persistent_callbacks(op_man):
 
     loop.run_coroutine(man.process_message(dict(name="msg", value=1)))
     assert shared[0] == 2
+
+
+def test_counters_and_overlapping_specs(op_man):
+    """Make sure specs on different fields all match and messages are counted."""
+
+    loop, man = op_man
+
+    received = []
+
+    by_name = man.every_match(lambda msg: received.append('name'), name="msg")
+    by_value = man.every_match(lambda msg: received.append('value'), name="msg", value=1)
+    by_other = man.every_match(lambda msg: received.append('other'), other=None)
+
+    assert sorted(path for path, _waiter in man.waiters()) == [['name', 'msg'], ['name', 'msg', 'value', 1],
+                                                               ['other', None]]
+
+    assert loop.run_coroutine(man.process_message(dict(name="msg", value=1))) is True
+    assert sorted(received) == ['name', 'value']
+
+    # A missing key must not match a spec waiting for None
+    assert loop.run_coroutine(man.process_message(dict(name="other"))) is False
+    assert loop.run_coroutine(man.process_message(dict(other=None))) is True
+
+    assert man.counters == dict(processed=3, matched=2, ignored=1)
+
+    for handle in (by_name, by_value, by_other):
+        man.remove_waiter(handle)
+
+    assert len(list(man.waiters())) == 0
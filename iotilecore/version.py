@@ -1 +1 @@
-version = "5.2.0"
+version = "5.3.0"
@@ -549,7 +549,7 @@ async def process_graph_input(graph, stream, value, rpc_executor):
         associated_output = stream.associated_stream()
         graph.sensor_log.push(associated_output, value)
 
-    to_check = deque([x for x in graph.roots])
+    to_check = deque(graph.roots_for_input(stream))
 
     while len(to_check) > 0:
         node = to_check.popleft()
@@ -13,21 +13,33 @@ to the correct state.
 
 import struct
 import logging
+from iotile.core.exceptions import ArgumentError
 from iotile.core.hw.virtual import tile_rpc
 from iotile.core.hw.reports import IOTileReading
 from iotile.sg import SensorLog, DataStream, DataStreamSelector
-from iotile.sg.engine import InMemoryStorageEngine
+from iotile.sg.engine import KNOWN_ENGINES
 from iotile.sg.exceptions import StorageFullError, StreamEmptyError, UnresolvedIdentifierError
 from ...constants import rpcs, pack_error, Error, ControllerSubsystem, SensorLogError, streams
 from .controller_system import ControllerSubsystemBase
 
 class SensorLogSubsystem(ControllerSubsystemBase):
-    """Container for raw sensor log state."""
+    """Container for raw sensor log state.
 
-    def __init__(self, emulator, model):
+    Args:
+        emulator (EmulationLoop): The emulation loop this subsystem runs in.
+        model (DeviceModel): The device model used to size the storage buffers.
+        engine (str): The name of the sensor graph storage engine that should
+            hold readings, either ``in_memory`` or ``ring_buffer``.
+    """
+
+    def __init__(self, emulator, model, engine='in_memory'):
         super(SensorLogSubsystem, self).__init__(emulator)
 
-        self.engine = InMemoryStorageEngine(model=model)
+        engine_class = KNOWN_ENGINES.get(engine)
+        if engine_class is None:
+            raise ArgumentError("Unknown storage engine name", engine=engine, known_engines=sorted(KNOWN_ENGINES))
+
+        self.engine = engine_class(model=model)
         self.storage = SensorLog(self.engine, model=model, id_assigner=lambda x, y: self.allocate_id())
         self.dump_walker = None
         self.next_id = 1
@@ -245,21 +257,13 @@ class SensorLogSubsystem(ControllerSubsystemBase):
             return None
 
     def highest_stored_id(self):
-        """Scan through the stored readings and report the highest stored id.
+        """Report the highest stored reading id in either buffer.
 
         Returns:
             int: The highest stored id.
         """
 
-        shared = [0]
-        def _keep_max(_i, reading):
-            if reading.reading_id > shared[0]:
-                shared[0] = reading.reading_id
-
-        self.engine.scan_storage('storage', _keep_max)
-        self.engine.scan_storage('streaming', _keep_max)
-
-        return shared[0]
+        return self.engine.highest_id()
 
 
 class RawSensorLogMixin(object):
@@ -270,11 +274,12 @@ class RawSensorLogMixin(object):
     Args:
         model (DeviceModel): The device model to use to calculate
             constraints and other operating parameters.
+        engine (str): The name of the storage engine to use for readings.
     """
 
 
-    def __init__(self, emulator, model):
-        self.sensor_log = SensorLogSubsystem(emulator, model)
+    def __init__(self, emulator, model, engine='in_memory'):
+        self.sensor_log = SensorLogSubsystem(emulator, model, engine=engine)
         self._post_config_subsystems.append(self.sensor_log)
 
         # Declare all of our config variables
@@ -37,6 +37,8 @@ class ReferenceController(RawSensorLogMixin, RemoteBridgeMixin,
                 name (str): The 6 character name that should be returned when this
                     tile is asked for its status to allow matching it with a proxy
                     object.
+                storage_engine (str): The sensor graph storage engine used to
+                    hold readings, either in_memory (the default) or ring_buffer.
         device (TileBasedVirtualDevice) : optional, device on which this tile is running
     """
 
@@ -61,7 +63,7 @@ class ReferenceController(RawSensorLogMixin, RemoteBridgeMixin,
         ConfigDatabaseMixin.__init__(self, 4096, 4096)  #FIXME: Load the controller model info to get its memory map
         TileManagerMixin.__init__(self, device.emulator)
         RemoteBridgeMixin.__init__(self, device.emulator)
-        RawSensorLogMixin.__init__(self, device.emulator, model)
+        RawSensorLogMixin.__init__(self, device.emulator, model, engine=args.get('storage_engine', 'in_memory'))
         StreamingSubsystemMixin.__init__(self, device.emulator, basic=True)
         SensorGraphMixin.__init__(self, device.emulator, self.sensor_log, self.stream_manager, model=model)
 
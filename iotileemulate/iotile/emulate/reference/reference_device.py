@@ -21,6 +21,9 @@ class ReferenceDevice(EmulatedDevice):
             supported are:
                 iotile_id (int or hex string): The id of this device. This
                 defaults to 1 if not specified.
+                storage_engine (str): The sensor graph storage engine used
+                by the controller, either in_memory (the default) or
+                ring_buffer.
     """
 
     __NO_EXTENSION__ = True
@@ -31,13 +34,15 @@ class ReferenceDevice(EmulatedDevice):
     def __init__(self, args):
         iotile_id = args.get('iotile_id', 1)
         controller_name = args.get('controller_name', 'refcn1')
+        storage_engine = args.get('storage_engine', 'in_memory')
 
         if isinstance(iotile_id, str):
             iotile_id = int(iotile_id, 16)
 
         super(ReferenceDevice, self).__init__(iotile_id)
 
-        self.controller = ReferenceController(8, {'name': controller_name}, device=self)
+        self.controller = ReferenceController(8, {'name': controller_name, 'storage_engine': storage_engine},
+                                              device=self)
         self.add_tile(8, self.controller)
         self.reset_count = 0
         self._logger = logging.getLogger(__name__)
@@ -11,7 +11,7 @@ setup(
     description="IOTile Device Emulation",
     install_requires=[
         "iotile-core>=5.2",
-        "iotile-sensorgraph>=1.1",
+        "iotile-sensorgraph>=1.2",
     ],
     python_requires=">=3.7,<4",
     entry_points={'iotile.virtual_device': ['reference_1_0 = iotile.emulate.demo:DemoReferenceDevice',
@@ -67,11 +67,11 @@ def basic_sg():
         yield sensor_graph, hw, device
 
 
-@pytest.fixture(scope="function")
-def streaming_sg():
+@pytest.fixture(scope="function", params=['in_memory', 'ring_buffer'])
+def streaming_sg(request):
     """A preprogrammed basic sensorgraph for testing streaming."""
 
-    device = ReferenceDevice({'simulate_time': False})
+    device = ReferenceDevice({'simulate_time': False, 'storage_engine': request.param})
 
     adapter = EmulatedDeviceAdapter(None, devices=[device])
 
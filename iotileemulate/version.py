@@ -1 +1 @@
-version = "0.6.0"
+version = "0.7.0"
@@ -10,13 +10,19 @@ adapter that can see that device and has an open connection slot.  You can
 force a connection to use a specific device adapter by using a specially
 formatted connection string if you don't want the automatic behavior.
 
+The merged view of each device is updated incrementally as device_seen
+events arrive and expired devices are removed using a heap ordered by when
+they expire, so calling visible_devices() is cheap even when thousands of
+devices are visible.
+
 TODO:
-- [ ] Periodically expire devices from visible_devices
 - [ ] Add threadsafe mutex around visible_devices
 """
 
-import logging
 import copy
+import logging
+import heapq
+from types import MappingProxyType
 from time import monotonic
 import functools
 from iotile.core.exceptions import ArgumentError, InternalError
@@ -57,6 +63,10 @@ class AggregatingDeviceAdapter(BasicNotificationMixin,
 
         self._config = {}
         self._devices = {}
+        self._merged_devices = {}
+        self._visible_snapshot = None
+        self._expiry_heap = []
+        self._tracked_entries = 0
         self._conn_strings = {}
         self.adapters = []
         self.connections = {}
@@ -168,48 +178,22 @@ class AggregatingDeviceAdapter(BasicNotificationMixin,
     def visible_devices(self):
         """Unify all visible devices across all connected adapters
 
+        The merged information for each device is kept up to date as devices
+        are seen so this just expires any devices that are no longer visible
+        and returns a cached snapshot.  The snapshot is shared between
+        callers until the next change, so it and the information for each
+        device are read-only mappings.
+
         Returns:
-            dict: A dictionary mapping UUIDs to device information dictionaries
+            Mapping: A mapping of UUIDs to device information mappings.
         """
 
-        devs = {}
-
-        for device_id, adapters in self._devices.items():
-            dev = None
-            max_signal = None
-            best_adapter = None
-
-            for adapter_id, devinfo in adapters.items():
-                connstring = "adapter/{0}/{1}".format(adapter_id, devinfo['connection_string'])
-                if dev is None:
-                    dev = copy.deepcopy(devinfo)
-                    del dev['connection_string']
-
-                if 'adapters' not in dev:
-                    dev['adapters'] = []
-                    best_adapter = adapter_id
-
-                dev['adapters'].append((adapter_id, devinfo['signal_strength'], connstring))
-
-                if max_signal is None:
-                    max_signal = devinfo['signal_strength']
-                elif devinfo['signal_strength'] > max_signal:
-                    max_signal = devinfo['signal_strength']
-                    best_adapter = adapter_id
-
-            # If device has been seen in no adapters, it will get expired
-            # don't return it
-            if dev is None:
-                continue
-
-            dev['connection_string'] = "device/%x" % dev['uuid']
-            dev['adapters'] = sorted(dev['adapters'], key=lambda x: x[1], reverse=True)
-            dev['best_adapter'] = best_adapter
-            dev['signal_strength'] = max_signal
+        self._expire_devices(monotonic())
 
-            devs[device_id] = dev
+        if self._visible_snapshot is None:
+            self._visible_snapshot = MappingProxyType(dict(self._merged_devices))
 
-        return devs
+        return self._visible_snapshot
 
     async def connect(self, conn_id, connection_string):
         """Connect to a device.
@@ -334,10 +318,47 @@ class AggregatingDeviceAdapter(BasicNotificationMixin,
         if universal_conn not in self._devices:
             self._devices[universal_conn] = {}
 
+        if adapter_id not in self._devices[universal_conn]:
+            self._tracked_entries += 1
+
         event['expires'] = monotonic() + event.get('validity_period')
         self._devices[universal_conn][adapter_id] = event
         self._conn_strings[local_conn] = universal_conn
 
+        heapq.heappush(self._expiry_heap, (event['expires'], universal_conn, adapter_id))
+        self._merge_device(universal_conn)
+
+    def _merge_device(self, universal_conn):
+        """Rebuild the unified view of a single device from each adapter that sees it."""
+
+        adapters = self._devices.get(universal_conn)
+        if not adapters:
+            self._devices.pop(universal_conn, None)
+            self._merged_devices.pop(universal_conn, None)
+            self._visible_snapshot = None
+            return
+
+        dev = None
+        routes = []
+        for adapter_id, devinfo in adapters.items():
+            if dev is None:
+                dev = copy.deepcopy(devinfo)
+                del dev['connection_string']
+
+            connstring = "adapter/{0}/{1}".format(adapter_id, devinfo['connection_string'])
+            routes.append((adapter_id, devinfo['signal_strength'], connstring))
+
+        # sorted is stable so ties keep the first adapter that saw the device
+        routes.sort(key=lambda x: x[1], reverse=True)
+
+        dev['connection_string'] = universal_conn
+        dev['adapters'] = tuple(routes)
+        dev['best_adapter'] = routes[0][0]
+        dev['signal_strength'] = routes[0][1]
+
+        self._merged_devices[universal_conn] = MappingProxyType(dev)
+        self._visible_snapshot = None
+
     def _translate_device_seen(self, adapter_id, conn_string, event):
         universal_conn = self._translate_conn_string(adapter_id, conn_string)
 
@@ -361,25 +382,54 @@ class AggregatingDeviceAdapter(BasicNotificationMixin,
     def _device_expiry_callback(self):
         """Periodic callback to remove expired devices from visible_devices."""
 
+        expired = self._expire_devices(monotonic())
+        if expired > 0:
+            self._logger.info('Expired %d devices', expired)
+
+    def _expire_devices(self, now):
+        """Remove every device entry that expired before now.
+
+        Each device_seen event pushes a new entry onto the expiry heap, so
+        entries for devices that were seen again since are stale and skipped
+        when they reach the top.  If stale entries come to dominate the heap
+        it is rebuilt from the live entries.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            int: The number of device entries that were removed.
+        """
+
+        heap = self._expiry_heap
         expired = 0
-        for adapters in self._devices.values():
-            to_remove = []
-            now = monotonic()
+        changed = set()
 
-            for adapter_id, dev in adapters.items():
-                if 'expires' not in dev:
-                    continue
+        while heap and heap[0][0] < now:
+            expires, universal_conn, adapter_id = heapq.heappop(heap)
 
-                if now > dev['expires']:
-                    to_remove.append(adapter_id)
-                    local_conn = "adapter/%d/%s" % (adapter_id, dev['connection_string'])
+            adapters = self._devices.get(universal_conn)
+            if adapters is None:
+                continue
 
-                    if local_conn in self._conn_strings:
-                        del self._conn_strings[local_conn]
+            dev = adapters.get(adapter_id)
+            if dev is None or dev['expires'] != expires:
+                continue
 
-            for entry in to_remove:
-                del adapters[entry]
-                expired += 1
+            del adapters[adapter_id]
+            self._conn_strings.pop("adapter/%d/%s" % (adapter_id, dev['connection_string']), None)
+            changed.add(universal_conn)
+            expired += 1
 
-        if expired > 0:
-            self._logger.info('Expired %d devices', expired)
+        self._tracked_entries -= expired
+
+        for universal_conn in changed:
+            self._merge_device(universal_conn)
+
+        if len(heap) > 2 * self._tracked_entries + 64:
+            self._expiry_heap = [(dev['expires'], universal_conn, adapter_id)
+                                 for universal_conn, adapters in self._devices.items()
+                                 for adapter_id, dev in adapters.items()]
+            heapq.heapify(self._expiry_heap)
+
+        return expired
@@ -78,3 +78,69 @@ def test_connect_disconnect(loop, adapter):
         loop.run_coroutine(adapter.connect(1, 'adapter/1/1'))
 
     loop.run_coroutine(adapter.connect(1, 'adapter/0/1'))
+
+
+def test_merged_view_and_expiry(loop, adapter):
+    """Make sure devices seen on several adapters are merged and expire."""
+
+    adapter, _sub, _devs = adapter
+
+    def _seen(adapter_id, conn_string, signal, validity):
+        event = dict(uuid=0x10, connection_string=conn_string, signal_strength=signal,
+                     validity_period=validity)
+        loop.run_coroutine(adapter.handle_adapter_event(adapter_id, conn_string, None, 'device_seen', event))
+
+    _seen(0, 'a', -80, 60)
+    _seen(1, 'b', -50, 5)
+
+    devs = adapter.visible_devices()
+    assert adapter.visible_devices() is devs
+
+    dev = devs['device/10']
+    assert dev['best_adapter'] == 1
+    assert dev['signal_strength'] == -50
+    assert dev['adapters'] == ((1, -50, 'adapter/1/b'), (0, -80, 'adapter/0/a'))
+
+    # Seeing the device again replaces the stale heap entry
+    _seen(1, 'b', -40, 30)
+    assert adapter.visible_devices()['device/10']['signal_strength'] == -40
+    assert devs['device/10']['signal_strength'] == -50
+
+    now = adapter._devices['device/10'][1]['expires']
+    assert adapter._expire_devices(now - 1) == 0
+    assert adapter._expire_devices(now + 1) == 1
+
+    dev = adapter.visible_devices()['device/10']
+    assert dev['best_adapter'] == 0
+    assert dev['adapters'] == ((0, -80, 'adapter/0/a'),)
+    assert 'adapter/1/b' not in adapter._conn_strings
+
+    assert adapter._expire_devices(now + 60) == 1
+    assert 'device/10' not in adapter.visible_devices()
+    assert adapter._expiry_heap == []
+
+    with pytest.raises(DeviceAdapterError):
+        loop.run_coroutine(adapter.connect(1, 'device/10'))
+
+
+def test_visible_devices_read_only(loop, adapter):
+    """Make sure the shared snapshot cannot be used to modify internal state."""
+
+    adapter, _sub, _devs = adapter
+
+    event = dict(uuid=0x10, connection_string='a', signal_strength=-80, validity_period=60,
+                 extra={'key': 'value'})
+    loop.run_coroutine(adapter.handle_adapter_event(0, 'a', None, 'device_seen', event))
+
+    devs = adapter.visible_devices()
+    dev = devs['device/10']
+
+    with pytest.raises(TypeError):
+        devs['device/11'] = {}
+
+    with pytest.raises(TypeError):
+        dev['signal_strength'] = 0
+
+    dev['extra']['key'] = 'changed'
+    assert adapter._devices['device/10'][0]['extra'] == {'key': 'value'}
+    assert adapter._devices['device/10'][0]['connection_string'] == 'a'
@@ -1 +1 @@
-version = "3.1.0"
+version = "3.2.0"
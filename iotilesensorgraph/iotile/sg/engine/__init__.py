@@ -1,3 +1,9 @@
 from .in_memory import InMemoryStorageEngine
+from .ring_buffer import RingBufferStorageEngine
 
-__all__ = ['InMemoryStorageEngine']
+KNOWN_ENGINES = {
+    'in_memory': InMemoryStorageEngine,
+    'ring_buffer': RingBufferStorageEngine
+}
+
+__all__ = ['InMemoryStorageEngine', 'RingBufferStorageEngine', 'KNOWN_ENGINES']
@@ -4,6 +4,8 @@ from iotile.core.exceptions import ArgumentError
 from iotile.core.hw.reports import IOTileReading
 from iotile.sg import DataStream
 from iotile.sg.exceptions import StorageFullError, StreamEmptyError
+from .stream_index import StreamIndex
+from .reading_ids import ReadingIdIndex
 
 
 class InMemoryStorageEngine:
@@ -22,6 +24,10 @@ class InMemoryStorageEngine:
         self.streaming_length = model.get(u'max_streaming_buffer')
         self.streaming_data = []
         self.storage_data = []
+        self.streaming_index = StreamIndex()
+        self.storage_index = StreamIndex()
+        self.streaming_ids = ReadingIdIndex()
+        self.storage_ids = ReadingIdIndex()
 
     def dump(self):
         """Serialize the state of this InMemoryStorageEngine to a dict.
@@ -49,6 +55,18 @@ class InMemoryStorageEngine:
         self.storage_data = [IOTileReading.FromDict(x) for x in storage_data]
         self.streaming_data = [IOTileReading.FromDict(x) for x in streaming_data]
 
+        self.storage_index.clear()
+        self.storage_ids.clear()
+        for reading in self.storage_data:
+            self.storage_index.add(reading.stream)
+            self.storage_ids.add(reading.reading_id)
+
+        self.streaming_index.clear()
+        self.streaming_ids.clear()
+        for reading in self.streaming_data:
+            self.streaming_index.add(reading.stream)
+            self.streaming_ids.add(reading.reading_id)
+
     def count(self):
         """Count the number of readings.
 
@@ -58,6 +76,14 @@ class InMemoryStorageEngine:
 
         return (len(self.storage_data), len(self.streaming_data))
 
+    def _selector_index(self, selector):
+        if selector.output:
+            return self.streaming_index
+        elif selector.buffered:
+            return self.storage_index
+
+        raise ArgumentError("You can only pass a buffered selector to a storage engine", selector=selector)
+
     def count_matching(self, selector, offset=0):
         """Count the number of readings matching selector.
 
@@ -70,22 +96,55 @@ class InMemoryStorageEngine:
             int: The number of matching readings.
         """
 
-        if selector.output:
-            data = self.streaming_data
-        elif selector.buffered:
-            data = self.storage_data
-        else:
-            raise ArgumentError("You can only pass a buffered selector to count_matching", selector=selector)
+        return self._selector_index(selector).count_matching(selector, offset)
+
+    def next_matching(self, selector, offset=0):
+        """Find the offset of the next reading matching selector.
 
-        count = 0
-        for i in range(offset, len(data)):
-            reading = data[i]
+        Args:
+            selector (DataStreamSelector): The selector that we want to
+                find a matching reading for.
+            offset (int): The starting offset that we should begin searching at.
 
-            stream = DataStream.FromEncoded(reading.stream)
-            if selector.matches(stream):
-                count += 1
+        Returns:
+            int: The offset of the first matching reading at or after offset
+            or None if there are no more matching readings.
+        """
+
+        return self._selector_index(selector).next_matching(selector, offset)
+
+    def find_reading_id(self, buffer_type, reading_id):
+        """Find the offset of a reading by its reading id.
+
+        Reading ids are normally stored in increasing order so this is a
+        binary search rather than a scan of the buffer.
+
+        Args:
+            buffer_type (str): The buffer to search (either u"storage" or u"streaming")
+            reading_id (int): The reading id to find.
+
+        Returns:
+            int: The offset of the first reading with the given id or None
+            if there is no such reading.
+        """
+
+        if buffer_type == u'streaming':
+            return self.streaming_ids.find(lambda i: self.streaming_data[i].reading_id,
+                                           len(self.streaming_data), reading_id)
+
+        return self.storage_ids.find(lambda i: self.storage_data[i].reading_id,
+                                     len(self.storage_data), reading_id)
+
+    def highest_id(self):
+        """Get the highest reading id stored in either buffer.
+
+        Returns:
+            int: The highest stored reading id or 0 if nothing is stored.
+        """
 
-        return count
+        storage = self.storage_ids.highest(lambda i: self.storage_data[i].reading_id, len(self.storage_data))
+        streaming = self.streaming_ids.highest(lambda i: self.streaming_data[i].reading_id, len(self.streaming_data))
+        return max(storage, streaming)
 
     def scan_storage(self, area_name, callable, start=0, stop=None):
         """Iterate over streaming or storage areas, calling callable.
@@ -134,6 +193,10 @@ class InMemoryStorageEngine:
 
         self.storage_data = []
         self.streaming_data = []
+        self.storage_index.clear()
+        self.streaming_index.clear()
+        self.storage_ids.clear()
+        self.streaming_ids.clear()
 
     def push(self, value):
         """Store a new value for the given stream.
@@ -150,11 +213,15 @@ class InMemoryStorageEngine:
                 raise StorageFullError('Streaming buffer full')
 
             self.streaming_data.append(value)
+            self.streaming_index.add(value.stream)
+            self.streaming_ids.add(value.reading_id)
         else:
             if len(self.storage_data) == self.storage_length:
                 raise StorageFullError('Storage buffer full')
 
             self.storage_data.append(value)
+            self.storage_index.add(value.stream)
+            self.storage_ids.add(value.reading_id)
 
     def get(self, buffer_type, offset):
         """Get a reading from the buffer at offset.
@@ -206,7 +273,9 @@ class InMemoryStorageEngine:
 
         if buffer_type == u'streaming':
             self.streaming_data = remaining
+            self.streaming_index.remove_oldest(x.stream for x in popped)
         else:
             self.storage_data = remaining
+            self.storage_index.remove_oldest(x.stream for x in popped)
 
         return popped
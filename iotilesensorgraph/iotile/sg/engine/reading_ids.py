@@ -0,0 +1,86 @@
+"""Fast reading id lookups for a single FIFO storage buffer."""
+
+
+class ReadingIdIndex:
+    """Track whether the reading ids in a buffer are sorted.
+
+    Reading ids are assigned in increasing order when readings are stored,
+    so the ids in a FIFO buffer are normally sorted from oldest to newest.
+    As long as that is true we can find a reading id with a binary search
+    and the highest id is always the id of the newest reading.  If a reading
+    is ever stored out of order, we fall back to scanning the buffer until
+    it is cleared.
+
+    The buffer itself is accessed through a get_id(offset) callable so that
+    this class works with any storage layout.
+    """
+
+    def __init__(self):
+        self.sorted = True
+        self._last = None
+
+    def clear(self):
+        """Reset the index after the buffer has been emptied."""
+
+        self.sorted = True
+        self._last = None
+
+    def add(self, reading_id):
+        """Note a reading id that was just appended to the buffer."""
+
+        if self._last is not None and reading_id < self._last:
+            self.sorted = False
+
+        self._last = reading_id
+
+    def find(self, get_id, length, reading_id):
+        """Find the offset of the first reading with the given id.
+
+        Args:
+            get_id (callable): Returns the reading id stored at an offset.
+            length (int): The number of readings in the buffer.
+            reading_id (int): The reading id to find.
+
+        Returns:
+            int: The offset of the reading or None if it is not stored.
+        """
+
+        if not self.sorted:
+            for i in range(0, length):
+                if get_id(i) == reading_id:
+                    return i
+
+            return None
+
+        low = 0
+        high = length
+        while low < high:
+            mid = (low + high) // 2
+            if get_id(mid) < reading_id:
+                low = mid + 1
+            else:
+                high = mid
+
+        if low < length and get_id(low) == reading_id:
+            return low
+
+        return None
+
+    def highest(self, get_id, length):
+        """Return the highest stored reading id or 0 if the buffer is empty.
+
+        Args:
+            get_id (callable): Returns the reading id stored at an offset.
+            length (int): The number of readings in the buffer.
+
+        Returns:
+            int: The highest reading id.
+        """
+
+        if length == 0:
+            return 0
+
+        if self.sorted:
+            return get_id(length - 1)
+
+        return max(get_id(i) for i in range(0, length))
@@ -0,0 +1,364 @@
+"""A fixed capacity, array backed storage engine for sensor graph."""
+
+import array
+from iotile.core.exceptions import ArgumentError
+from iotile.core.hw.reports import IOTileReading
+from iotile.sg import DataStream
+from iotile.sg.exceptions import StorageFullError, StreamEmptyError
+from .stream_index import StreamIndex
+from .reading_ids import ReadingIdIndex
+
+
+class _ReadingRing:
+    """A circular buffer of readings stored as packed columns.
+
+    Each reading is split into its stream, reading_id, raw_time and value
+    and each of those is stored in a preallocated array.array so that the
+    memory used by the ring is fixed at creation time and removing the
+    oldest readings is just a matter of moving the start pointer.
+
+    The ring also keeps a StreamIndex of where each stream's readings are
+    and a ReadingIdIndex so that matching readings and reading ids can be
+    found without scanning.
+
+    Args:
+        capacity (int): The maximum number of readings that can be stored.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.start = 0
+        self.length = 0
+
+        self.streams = array.array('H', [0]) * capacity
+        self.reading_ids = array.array('L', [0]) * capacity
+        self.raw_times = array.array('L', [0]) * capacity
+        self.values = array.array('q', [0]) * capacity
+        self.stream_index = StreamIndex()
+        self.id_index = ReadingIdIndex()
+
+    def __len__(self):
+        return self.length
+
+    def index(self, offset):
+        """Convert an offset from the oldest reading into an array index."""
+
+        index = self.start + offset
+        if index >= self.capacity:
+            index -= self.capacity
+
+        return index
+
+    def append(self, reading):
+        """Store a reading after the newest reading in the ring."""
+
+        if self.length == self.capacity:
+            raise StorageFullError('Ring buffer full')
+
+        index = self.index(self.length)
+
+        try:
+            self.streams[index] = reading.stream
+            self.reading_ids[index] = reading.reading_id
+            self.raw_times[index] = reading.raw_time
+            self.values[index] = reading.value
+        except (OverflowError, TypeError) as err:
+            raise ArgumentError("Reading cannot be stored in a packed ring buffer", reading=str(reading),
+                                error=str(err))
+
+        self.length += 1
+        self.stream_index.add(reading.stream)
+        self.id_index.add(reading.reading_id)
+
+    def reading(self, offset):
+        """Build an IOTileReading from the packed columns at offset."""
+
+        index = self.index(offset)
+        return IOTileReading(self.raw_times[index], self.streams[index], self.values[index],
+                             reading_id=self.reading_ids[index])
+
+    def reading_id(self, offset):
+        """Get the reading id of the reading at offset."""
+
+        return self.reading_ids[self.index(offset)]
+
+    def find_reading_id(self, reading_id):
+        """Find the offset of the first reading with the given id."""
+
+        return self.id_index.find(self.reading_id, self.length, reading_id)
+
+    def highest_id(self):
+        """Get the highest reading id in the ring or 0 if it is empty."""
+
+        return self.id_index.highest(self.reading_id, self.length)
+
+    def popn(self, count):
+        """Remove the oldest count readings and return them."""
+
+        popped = [self.reading(i) for i in range(0, count)]
+        self.stream_index.remove_oldest(x.stream for x in popped)
+
+        self.start = self.index(count)
+        self.length -= count
+        return popped
+
+    def clear(self):
+        """Remove all readings from the ring."""
+
+        self.start = 0
+        self.length = 0
+        self.stream_index.clear()
+        self.id_index.clear()
+
+
+class RingBufferStorageEngine:
+    """A fixed capacity storage engine for sensor graph.
+
+    This engine has the same interface as InMemoryStorageEngine but stores
+    readings in preallocated circular buffers of packed columns rather than
+    in lists of IOTileReading objects.  Its memory usage is determined only
+    by the device model's buffer sizes and removing old readings during a
+    rollover (popn) does not need to move the remaining readings.
+
+    Since readings are stored packed, only their stream, reading_id, raw_time
+    and value are kept.  Readings returned from this engine are created on
+    demand and have their reading_time recomputed from raw_time, so an
+    explicit reading_time passed in with a reading is not preserved.
+
+    Args:
+        model (DeviceModel): A model for the device type that we are
+            emulating so that we can constrain our total memory
+            size appropriately to get the same behavior that would
+            be seen on an actual device.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.storage_length = model.get(u'max_storage_buffer')
+        self.streaming_length = model.get(u'max_streaming_buffer')
+        self.storage_data = _ReadingRing(self.storage_length)
+        self.streaming_data = _ReadingRing(self.streaming_length)
+
+    def _buffer(self, buffer_type):
+        if buffer_type == u'streaming':
+            return self.streaming_data
+
+        return self.storage_data
+
+    def dump(self):
+        """Serialize the state of this RingBufferStorageEngine to a dict.
+
+        The format is the same as InMemoryStorageEngine.dump() so states
+        can be moved between the two engines.
+
+        Returns:
+            dict: The serialized data.
+        """
+
+        return {
+            u'storage_data': [self.storage_data.reading(i).asdict() for i in range(0, len(self.storage_data))],
+            u'streaming_data': [self.streaming_data.reading(i).asdict() for i in range(0, len(self.streaming_data))]
+        }
+
+    def restore(self, state):
+        """Restore the state of this RingBufferStorageEngine from a dict."""
+
+        storage_data = state.get(u'storage_data', [])
+        streaming_data = state.get(u'streaming_data', [])
+
+        if len(storage_data) > self.storage_length or len(streaming_data) > self.streaming_length:
+            raise ArgumentError("Cannot restore RingBufferStorageEngine, too many readings",
+                                storage_size=len(storage_data), storage_max=self.storage_length,
+                                streaming_size=len(streaming_data), streaming_max=self.streaming_length)
+
+        self.clear()
+
+        for reading in storage_data:
+            self.storage_data.append(IOTileReading.FromDict(reading))
+
+        for reading in streaming_data:
+            self.streaming_data.append(IOTileReading.FromDict(reading))
+
+    def count(self):
+        """Count the number of readings.
+
+        Returns:
+            (int, int): The number of readings in storage and streaming buffers.
+        """
+
+        return (len(self.storage_data), len(self.streaming_data))
+
+    def _selector_buffer(self, selector):
+        if selector.output:
+            return self.streaming_data
+        elif selector.buffered:
+            return self.storage_data
+
+        raise ArgumentError("You can only pass a buffered selector to a storage engine", selector=selector)
+
+    def count_matching(self, selector, offset=0):
+        """Count the number of readings matching selector.
+
+        Args:
+            selector (DataStreamSelector): The selector that we want to
+                count matching readings for.
+            offset (int): The starting offset that we should begin counting at.
+
+        Returns:
+            int: The number of matching readings.
+        """
+
+        return self._selector_buffer(selector).stream_index.count_matching(selector, offset)
+
+    def next_matching(self, selector, offset=0):
+        """Find the offset of the next reading matching selector.
+
+        Args:
+            selector (DataStreamSelector): The selector that we want to
+                find a matching reading for.
+            offset (int): The starting offset that we should begin searching at.
+
+        Returns:
+            int: The offset of the first matching reading at or after offset
+            or None if there are no more matching readings.
+        """
+
+        return self._selector_buffer(selector).stream_index.next_matching(selector, offset)
+
+    def find_reading_id(self, buffer_type, reading_id):
+        """Find the offset of a reading by its reading id.
+
+        Reading ids are normally stored in increasing order so this is a
+        binary search rather than a scan of the buffer.
+
+        Args:
+            buffer_type (str): The buffer to search (either u"storage" or u"streaming")
+            reading_id (int): The reading id to find.
+
+        Returns:
+            int: The offset of the first reading with the given id or None
+            if there is no such reading.
+        """
+
+        return self._buffer(buffer_type).find_reading_id(reading_id)
+
+    def highest_id(self):
+        """Get the highest reading id stored in either buffer.
+
+        Returns:
+            int: The highest stored reading id or 0 if nothing is stored.
+        """
+
+        return max(self.storage_data.highest_id(), self.streaming_data.highest_id())
+
+    def scan_storage(self, area_name, callable, start=0, stop=None):
+        """Iterate over streaming or storage areas, calling callable.
+
+        Args:
+            area_name (str): Either 'storage' or 'streaming' to indicate which
+                storage area to scan.
+            callable (callable): A function that will be called as (offset, reading)
+                for each reading between start_offset and end_offset (inclusive).  If
+                the scan function wants to stop early it can return True.  If it returns
+                anything else (including False or None), scanning will continue.
+            start (int): Optional offset to start at (included in scan).
+            stop (int): Optional offset to end at (included in scan).
+
+        Returns:
+            int: The number of entries scanned.
+        """
+
+        if area_name == u'storage':
+            data = self.storage_data
+        elif area_name == u'streaming':
+            data = self.streaming_data
+        else:
+            raise ArgumentError("Unknown area name in scan_storage (%s) should be storage or streaming" % area_name)
+
+        if len(data) == 0:
+            return 0
+
+        if stop is None:
+            stop = len(data) - 1
+        elif stop >= len(data):
+            raise ArgumentError("Given stop offset is greater than the highest offset supported", length=len(data), stop_offset=stop)
+
+        scanned = 0
+        for i in range(start, stop + 1):
+            scanned += 1
+
+            should_break = callable(i, data.reading(i))
+            if should_break is True:
+                break
+
+        return scanned
+
+    def clear(self):
+        """Clear all data from this storage engine."""
+
+        self.storage_data.clear()
+        self.streaming_data.clear()
+
+    def push(self, value):
+        """Store a new value for the given stream.
+
+        Args:
+            value (IOTileReading): The value to store.  The stream
+                parameter must have the correct value
+        """
+
+        stream = DataStream.FromEncoded(value.stream)
+
+        if stream.stream_type == DataStream.OutputType:
+            if len(self.streaming_data) == self.streaming_length:
+                raise StorageFullError('Streaming buffer full')
+
+            self.streaming_data.append(value)
+        else:
+            if len(self.storage_data) == self.storage_length:
+                raise StorageFullError('Storage buffer full')
+
+            self.storage_data.append(value)
+
+    def get(self, buffer_type, offset):
+        """Get a reading from the buffer at offset.
+
+        Offset is specified relative to the start of the data buffer.
+        This means that if the buffer rolls over, the offset for a given
+        item will appear to change.  Anyone holding an offset outside of this
+        engine object will need to be notified when rollovers happen (i.e.
+        popn is called so that they can update their offset indices)
+
+        Args:
+            buffer_type (str): The buffer to pop from (either u"storage" or u"streaming")
+            offset (int): The offset of the reading to get
+        """
+
+        chosen_buffer = self._buffer(buffer_type)
+
+        if offset >= len(chosen_buffer):
+            raise StreamEmptyError("Invalid index given in get command", requested=offset, stored=len(chosen_buffer), buffer=buffer_type)
+
+        return chosen_buffer.reading(offset)
+
+    def popn(self, buffer_type, count):
+        """Remove and return the oldest count values from the named buffer
+
+        The remaining readings are not moved, so the cost of this method
+        depends only on count, not on how many readings are stored.
+
+        Args:
+            buffer_type (str): The buffer to pop from (either u"storage" or u"streaming")
+            count (int): The number of readings to pop
+
+        Returns:
+            list(IOTileReading): The values popped from the buffer
+        """
+
+        buffer_type = str(buffer_type)
+        chosen_buffer = self._buffer(buffer_type)
+
+        if count > len(chosen_buffer):
+            raise StreamEmptyError("Not enough data in buffer for popn command", requested=count, stored=len(chosen_buffer), buffer=buffer_type)
+
+        return chosen_buffer.popn(count)
@@ -0,0 +1,147 @@
+"""An index of where each stream's readings are stored in a storage buffer."""
+
+from array import array
+from bisect import bisect_left
+from iotile.sg import DataStream
+
+
+class _Posting:
+    """The sorted sequence numbers of all stored readings in one stream.
+
+    Sequence numbers are packed into an unsigned 64-bit array so that the
+    index costs 8 bytes per stored reading.
+    """
+
+    __slots__ = ('seqs', 'head')
+
+    # Only compact a posting list once this many stale entries have built up
+    # so that the cost of compaction is amortized over many rollovers.
+    COMPACT_THRESHOLD = 1024
+
+    def __init__(self):
+        self.seqs = array('Q')
+        self.head = 0
+
+    def drop_oldest(self):
+        self.head += 1
+
+        if self.head >= self.COMPACT_THRESHOLD and self.head * 2 >= len(self.seqs):
+            del self.seqs[:self.head]
+            self.head = 0
+
+    def first_at_or_after(self, seq):
+        """Return the list index of the first sequence number >= seq."""
+
+        return bisect_left(self.seqs, seq, self.head)
+
+
+class StreamIndex:
+    """Per-stream posting lists for a single FIFO storage buffer.
+
+    Every reading pushed into the buffer is assigned a monotonically
+    increasing sequence number and that number is appended to the posting
+    list for its encoded stream.  The offset of a reading in the buffer is
+    its sequence number minus the sequence number of the oldest reading, so
+    rollovers only need to advance the start of each posting list rather
+    than renumber anything.
+
+    This lets a storage engine count the readings that match a selector and
+    find the next matching reading after an offset with a binary search per
+    distinct stream instead of a linear scan of the buffer.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._selectors = {}
+        self._base = 0
+        self._next = 0
+
+    def clear(self):
+        """Forget all indexed readings."""
+
+        self._postings = {}
+        self._selectors = {}
+        self._base = 0
+        self._next = 0
+
+    def add(self, encoded_stream):
+        """Index a reading that was just appended to the buffer.
+
+        Args:
+            encoded_stream (int): The encoded stream of the new reading.
+        """
+
+        posting = self._postings.get(encoded_stream)
+        if posting is None:
+            posting = _Posting()
+            self._postings[encoded_stream] = posting
+            self._selectors = {}
+
+        posting.seqs.append(self._next)
+        self._next += 1
+
+    def remove_oldest(self, encoded_streams):
+        """Remove the oldest readings from the index.
+
+        Args:
+            encoded_streams (iterable of int): The encoded streams of the
+                readings that were removed from the front of the buffer,
+                in order from oldest to newest.
+        """
+
+        for encoded_stream in encoded_streams:
+            self._postings[encoded_stream].drop_oldest()
+            self._base += 1
+
+    def _matching_postings(self, selector):
+        postings = self._selectors.get(selector)
+        if postings is None:
+            postings = [posting for encoded, posting in self._postings.items()
+                        if selector.matches(DataStream.FromEncoded(encoded))]
+            self._selectors[selector] = postings
+
+        return postings
+
+    def count_matching(self, selector, offset=0):
+        """Count the readings at or after offset that match selector.
+
+        Args:
+            selector (DataStreamSelector): The selector to match.
+            offset (int): The buffer offset to start counting at.
+
+        Returns:
+            int: The number of matching readings.
+        """
+
+        seq = self._base + offset
+
+        count = 0
+        for posting in self._matching_postings(selector):
+            count += len(posting.seqs) - posting.first_at_or_after(seq)
+
+        return count
+
+    def next_matching(self, selector, offset=0):
+        """Find the first reading at or after offset that matches selector.
+
+        Args:
+            selector (DataStreamSelector): The selector to match.
+            offset (int): The buffer offset to start searching at.
+
+        Returns:
+            int: The offset of the matching reading or None if there is
+            no matching reading.
+        """
+
+        seq = self._base + offset
+
+        found = None
+        for posting in self._matching_postings(selector):
+            i = posting.first_at_or_after(seq)
+            if i < len(posting.seqs) and (found is None or posting.seqs[i] < found):
+                found = posting.seqs[i]
+
+        if found is None:
+            return None
+
+        return found - self._base
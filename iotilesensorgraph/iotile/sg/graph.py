@@ -44,6 +44,7 @@ class SensorGraph:
         self.model = model
 
         self._manually_triggered_streamers = set()
+        self._input_roots = {}
         self._logger = logging.getLogger(__name__)
 
         if enforce_limits:
@@ -71,6 +72,8 @@ class SensorGraph:
         self.metadata_database = {}
         self.config_database = {}
 
+        self.invalidate_dispatch()
+
     def add_node(self, node_descriptor):
         """Add a node to the sensor graph based on the description given.
 
@@ -129,6 +132,7 @@ class SensorGraph:
 
         node.set_func(processor, func)
         self.nodes.append(node)
+        self.invalidate_dispatch()
 
     def add_config(self, slot, config_id, config_type, value):
         """Add a config variable assignment to this sensor graph.
@@ -457,7 +461,7 @@ class SensorGraph:
             associated_output = stream.associated_stream()
             self.sensor_log.push(associated_output, value)
 
-        to_check = deque([x for x in self.roots])
+        to_check = deque(self.roots_for_input(stream))
 
         while len(to_check) > 0:
             node = to_check.popleft()
@@ -475,6 +479,45 @@ class SensorGraph:
                 if len(results) > 0:
                     to_check.extend(node.outputs)
 
+    def roots_for_input(self, stream):
+        """Find the root nodes that could be triggered by an input.
+
+        Only root nodes with an input that matches the stream, or its
+        associated output stream if it is important, are returned.  The
+        result is cached per stream until the graph is modified.
+
+        Args:
+            stream (DataStream): The stream that an input was pushed to.
+
+        Returns:
+            list(SGNode): The root nodes to check, in the same order as
+            self.roots.
+        """
+
+        encoded = stream.encode()
+
+        roots = self._input_roots.get(encoded)
+        if roots is None:
+            streams = [stream]
+            if stream.important:
+                streams.append(stream.associated_stream())
+
+            roots = [root for root in self.roots
+                     if any(walker.matches(x) for walker, _trigger in root.inputs for x in streams)]
+            self._input_roots[encoded] = roots
+
+        return roots
+
+    def invalidate_dispatch(self):
+        """Forget which root nodes are triggered by each input stream.
+
+        This is done automatically when nodes are added or sorted and only
+        needs to be called if roots or node inputs are modified directly,
+        as optimization passes do.
+        """
+
+        self._input_roots = {}
+
     def mark_streamer(self, index):
         """Manually mark a streamer that should trigger.
 
@@ -602,6 +645,7 @@ class SensorGraph:
         # sort the nodes and reorder them.
         node_order = toposort_flatten(node_deps)
         self.nodes = [self.nodes[x] for x in node_order]
+        self.invalidate_dispatch()
 
         #Check root nodes all topographically sorted to the beginning
         for root in self.roots:
@@ -106,3 +106,4 @@ class SensorGraphOptimizer:
 
             while rerun:
                 rerun = pass_instance.run(sensor_graph, model=model)
+                sensor_graph.invalidate_dispatch()
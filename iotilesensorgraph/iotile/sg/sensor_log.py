@@ -6,15 +6,17 @@ you can limit the number of readings stored in any given FIFO as needed to put
 a hard cap on storage requirements.
 """
 
-import copy
+from collections import namedtuple
 from iotile.sg.model import DeviceModel
 from iotile.core.exceptions import ArgumentError
 from iotile.core.hw.reports import IOTileReading
-from .engine import InMemoryStorageEngine
+from .engine import InMemoryStorageEngine, KNOWN_ENGINES
 from .stream import DataStream, DataStreamSelector
 from .walker import VirtualStreamWalker, CounterStreamWalker, BufferedStreamWalker
 from .exceptions import StreamEmptyError, StorageFullError, UnresolvedIdentifierError
 
+_StreamDispatch = namedtuple("_StreamDispatch", ["queue_walkers", "monitors", "virtual_walkers"])
+
 
 class SensorLog:
     """A storage engine holding multiple named FIFOs.
@@ -36,11 +38,13 @@ class SensorLog:
     called with the stream and reading and should return an integer.
 
     Args:
-        engine (StorageEngine): The engine used for storing persistent data
+        engine (StorageEngine or str): The engine used for storing persistent data
             generated by this sensor graph. This can either be a simple, in
             memory data store, or a more complicated persistent storage setup
             depending on needs.  If not specified, a temporary in memory
-            engine is used.
+            engine is used.  You may also pass the name of one of the
+            builtin engines (``in_memory`` or ``ring_buffer``) and it will
+            be created for you using ``model``.
         model (DeviceModel): An optional device model specifying the
             constraints of the device that we are emulating.  If not
             specified, no specific constraints are imposed on the sensor log.
@@ -57,12 +61,19 @@ class SensorLog:
         self._last_values = {}
         self._virtual_walkers = []
         self._queue_walkers = []
+        self._dispatch = {}
 
         if model is None:
             model = DeviceModel()
 
         if engine is None:
             engine = InMemoryStorageEngine(model=model)
+        elif isinstance(engine, str):
+            engine_class = KNOWN_ENGINES.get(engine)
+            if engine_class is None:
+                raise ArgumentError("Unknown storage engine name", engine=engine, known_engines=sorted(KNOWN_ENGINES))
+
+            engine = engine_class(model=model)
 
         self._engine = engine
         self._model = model
@@ -203,6 +214,7 @@ class SensorLog:
             self._monitors[selector] = set()
 
         self._monitors[selector].add(callback)
+        self._dispatch = {}
 
     def create_walker(self, selector, skip_all=True):
         """Create a stream walker based on the given selector.
@@ -227,6 +239,8 @@ class SensorLog:
             StreamWalker: A properly updating stream walker with the given selector.
         """
 
+        self._dispatch = {}
+
         if selector.buffered:
             walker = BufferedStreamWalker(selector, self._engine, skip_all=skip_all)
             self._queue_walkers.append(walker)
@@ -254,6 +268,8 @@ class SensorLog:
         else:
             self._virtual_walkers.remove(walker)
 
+        self._dispatch = {}
+
     def restore_walker(self, dumped_state):
         """Restore a stream walker that was previously serialized.
 
@@ -284,6 +300,7 @@ class SensorLog:
 
         self._queue_walkers = []
         self._virtual_walkers = []
+        self._dispatch = {}
 
     def count(self):
         """Count many many readings are persistently stored.
@@ -320,12 +337,15 @@ class SensorLog:
         """
 
         # Make sure the stream is correct
-        reading = copy.copy(reading)
-        reading.stream = stream.encode()
+        encoded = stream.encode()
+        reading = reading.clone(encoded)
 
-        if stream.buffered:
-            output_buffer = stream.output
+        dispatch = self._dispatch.get(encoded)
+        if dispatch is None:
+            dispatch = self._build_dispatch(stream)
+            self._dispatch[encoded] = dispatch
 
+        if stream.buffered:
             if self.id_assigner is not None:
                 reading.reading_id = self.id_assigner(stream, reading)
 
@@ -339,25 +359,48 @@ class SensorLog:
                 self._erase_buffer(stream.output)
                 self._engine.push(reading)
 
-            for walker in self._queue_walkers:
-                # Only notify the walkers that are on this queue
-                if walker.selector.output == output_buffer:
-                    walker.notify_added(stream)
+            for walker in dispatch.queue_walkers:
+                walker.notify_added(stream)
 
         # Activate any monitors we have for this stream
-        for selector in self._monitors:
-            if selector is None or selector.matches(stream):
-                for callback in self._monitors[selector]:
-                    callback(stream, reading)
+        for callback in dispatch.monitors:
+            callback(stream, reading)
 
         # Virtual streams live only in their walkers, so update each walker
         # that contains this stream.
-        for walker in self._virtual_walkers:
-            if walker.matches(stream):
-                walker.push(stream, reading)
+        for walker in dispatch.virtual_walkers:
+            walker.push(stream, reading)
 
         self._last_values[stream] = reading
 
+    def _build_dispatch(self, stream):
+        """Find the walkers and monitors that need to know about a stream.
+
+        The result is cached by push() until a walker or monitor is added
+        or removed so that pushing a reading does not need to check every
+        selector we know about.
+
+        Args:
+            stream (DataStream): The stream that readings are pushed to.
+
+        Returns:
+            _StreamDispatch: The queue walkers, monitor callbacks and virtual
+            walkers that should be notified of readings in the stream.
+        """
+
+        queue_walkers = []
+        if stream.buffered:
+            queue_walkers = [walker for walker in self._queue_walkers
+                             if walker.selector.output == stream.output and walker.matches(stream)]
+
+        monitors = []
+        for selector, callbacks in self._monitors.items():
+            if selector is None or selector.matches(stream):
+                monitors.extend(callbacks)
+
+        virtual_walkers = [walker for walker in self._virtual_walkers if walker.matches(stream)]
+        return _StreamDispatch(queue_walkers, monitors, virtual_walkers)
+
     def _erase_buffer(self, output_buffer):
         """Erase readings in the specified buffer to make space."""
 
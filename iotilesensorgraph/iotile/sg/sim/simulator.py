@@ -48,6 +48,7 @@ class SensorGraphSimulator:
         self.tick_count = 0
         self.sensor_graph = sensor_graph
         self._start_tick = 0  # the tick on which the current simulation started
+        self._tick_intervals = []
         self.rpc_executor = NullRPCExecutor()
 
         # Register known stop conditions
@@ -121,10 +122,13 @@ class SensorGraphSimulator:
                 actual device powers on.
             accelerated (bool): Whether to run this sensor graph as
                 fast as possible or to delay tick events to simulate
-                the actual passage of wall clock time.
+                the actual passage of wall clock time.  When running
+                accelerated, ticks where no input is generated and no stop
+                condition can trigger are skipped entirely.
         """
 
         self._start_tick = self.tick_count
+        self._load_tick_intervals()
 
         if self._check_stop_conditions(self.sensor_graph):
             return
@@ -145,6 +149,12 @@ class SensorGraphSimulator:
             self.stimuli = self.stimuli[i:]
 
         while not self._check_stop_conditions(self.sensor_graph):
+            if accelerated:
+                skip_to = self._next_interesting_tick()
+                if skip_to > self.tick_count:
+                    self.tick_count = skip_to
+                    continue
+
             # Process one more one second tick
             now = monotonic()
             next_tick = now + 1.0
@@ -182,23 +192,57 @@ class SensorGraphSimulator:
             if (not accelerated) and (now < next_tick):
                 time.sleep(next_tick - now)
 
-    def _check_additional_ticks(self, tick_value):
-        fast_interval = self.sensor_graph.get_tick('fast')
-        tick_1_interval = self.sensor_graph.get_tick('user1')
-        tick_2_interval = self.sensor_graph.get_tick('user2')
+    def _next_interesting_tick(self):
+        """Find the last tick that can be skipped to without changing results.
+
+        Nothing happens on a tick unless an input is generated on it or a
+        stop condition could trigger on it.  This returns the tick just
+        before the next input is generated or the tick where the next stop
+        condition should be checked, whichever comes first.  If that is the
+        current tick, there is nothing to skip.
+
+        Returns:
+            int: The tick count that the simulation can jump to.
+        """
 
-        if fast_interval != 0 and (tick_value % fast_interval) == 0:
-            reading = IOTileReading(self.tick_count, fast_tick.encode(), self.tick_count)
-            self.sensor_graph.process_input(fast_tick, reading, self.rpc_executor)
+        tick = self.tick_count
 
-        if tick_1_interval != 0 and (tick_value % tick_1_interval) == 0:
-            reading = IOTileReading(self.tick_count, tick_1.encode(), self.tick_count)
-            self.sensor_graph.process_input(tick_1, reading, self.rpc_executor)
+        # The system tick and battery voltage are generated every 10 seconds
+        next_input = (tick // 10 + 1) * 10
 
-        if tick_2_interval != 0 and (tick_value % tick_2_interval) == 0:
-            reading = IOTileReading(self.tick_count, tick_2.encode(), self.tick_count)
-            self.sensor_graph.process_input(tick_2, reading, self.rpc_executor)
+        for _stream, interval in self._tick_intervals:
+            if interval != 0:
+                next_input = min(next_input, (tick // interval + 1) * interval)
 
+        # Stimuli are only processed while the first pending stimulus is still in the future
+        if len(self.stimuli) > 0 and self.stimuli[0].time > tick:
+            next_input = min(next_input, self.stimuli[0].time)
+
+        skip_to = next_input - 1
+        for stop in self.stop_conditions:
+            skip_to = min(skip_to, stop.next_possible_stop(tick, tick - self._start_tick))
+
+        return skip_to
+
+    def _load_tick_intervals(self):
+        """Look up the configured tick intervals once at the start of a run.
+
+        The intervals are config variables that cannot change while the
+        simulation is running, so there is no need to look them up again
+        on every tick.
+        """
+
+        self._tick_intervals = [
+            (fast_tick, self.sensor_graph.get_tick('fast')),
+            (tick_1, self.sensor_graph.get_tick('user1')),
+            (tick_2, self.sensor_graph.get_tick('user2'))
+        ]
+
+    def _check_additional_ticks(self, tick_value):
+        for stream, interval in self._tick_intervals:
+            if interval != 0 and (tick_value % interval) == 0:
+                reading = IOTileReading(self.tick_count, stream.encode(), self.tick_count)
+                self.sensor_graph.process_input(stream, reading, self.rpc_executor)
 
     def _check_stop_conditions(self, sensor_graph):
         """Check if any of our stop conditions are met.
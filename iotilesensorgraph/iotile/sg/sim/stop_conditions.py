@@ -41,6 +41,9 @@ class StopCondition(object):
     There should be a second class method, FromString(cls, desc) that
     tries to parse this stop condition from a text string.  The function
     must raise an ArgumentError if it could not match the input string.
+
+    Subclasses may also override next_possible_stop so that an accelerated
+    simulation can skip over ticks where nothing happens.
     """
 
     def should_stop(self, abs_second_count, rel_second_count, sensor_graph):
@@ -60,6 +63,28 @@ class StopCondition(object):
 
         return False
 
+    def next_possible_stop(self, abs_second_count, rel_second_count):
+        """Find the first second at which this condition could become true.
+
+        This is only called after should_stop returned False for the given
+        second counts.  The simulator assumes that should_stop will keep
+        returning False until the returned second unless the sensor graph
+        is modified in between.  The default implementation makes no
+        assumptions and returns the next second.
+
+        Args:
+            abs_second_count (int): The number of seconds that
+                have expired since the start of the simulation.
+            rel_second_count (int): The number of seconds that
+                have expired since the start of the last `run` calls.
+
+        Returns:
+            int: The absolute second count at which should_stop must next
+            be checked.
+        """
+
+        return abs_second_count + 1
+
 
 class TimeBasedStopCondition(StopCondition):
     """Stop the simulation after a fixed period of time.
@@ -91,6 +116,21 @@ class TimeBasedStopCondition(StopCondition):
 
         return rel_seconds >= self.max_time
 
+    def next_possible_stop(self, abs_second_count, rel_second_count):
+        """Find the first second at which this condition becomes true.
+
+        Args:
+            abs_second_count (int): The number of seconds that
+                have expired since the start of the simulation.
+            rel_second_count (int): The number of seconds that
+                have expired since the start of the last `run` calls.
+
+        Returns:
+            int: The absolute second count at which the run time is reached.
+        """
+
+        return abs_second_count + max(self.max_time - rel_second_count, 1)
+
     @classmethod
     def FromString(cls, desc):
         """Parse this stop condition from a string representation.
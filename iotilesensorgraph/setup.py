@@ -23,7 +23,7 @@ setup(
     license="LGPLv3",
     description="IOTile SensorGraph Management and Simulation Package",
     install_requires=[
-        "iotile-core>=5.2",
+        "iotile-core>=5.3",
         "pyparsing~=2.2.0",  # Bugfix in 2.2.2 breaks things
         "toposort>=1.6",
     ],
@@ -1,6 +1,6 @@
 """Test to make sure we can create and use SensorGraph objects."""
 
-from iotile.sg import SensorGraph, DeviceModel, SensorLog, DataStream, SlotIdentifier
+from iotile.sg import SensorGraph, DeviceModel, SensorLog, DataStream, DataStreamSelector, SlotIdentifier
 from iotile.sg.streamer_descriptor import parse_string_descriptor
 from iotile.sg.known_constants import config_fast_tick_secs
 from iotile.core.hw.reports import IOTileReading
@@ -20,6 +20,44 @@ def test_basic_sensorgraph():
     assert sg.sensor_log.inspect_last(DataStream.FromString('unbuffered 1')).value == 1
 
 
+def test_input_dispatch():
+    """Make sure inputs only check the roots and walkers they can affect."""
+
+    model = DeviceModel()
+    log = SensorLog(model=model)
+    sg = SensorGraph(log, model=model)
+
+    sg.add_node('(input 1 always) => unbuffered 1 using copy_all_a')
+    sg.add_node('(input 2 always) => unbuffered 2 using copy_all_a')
+
+    input1 = DataStream.FromString('input 1')
+    input2 = DataStream.FromString('input 2')
+    assert sg.roots_for_input(input1) == [sg.roots[0]]
+    assert sg.roots_for_input(input2) == [sg.roots[1]]
+    assert sg.roots_for_input(DataStream.FromString('input 3')) == []
+
+    # Adding a node must update the cached roots for a stream
+    sg.add_node('(input 1 always && input 2 always) => unbuffered 3 using copy_all_a')
+    assert sg.roots_for_input(input1) == [sg.roots[0], sg.roots[2]]
+
+    seen = []
+    log.watch(DataStreamSelector.FromString('unbuffered 3'), lambda stream, value: seen.append(value.value))
+
+    sg.process_input(input1, IOTileReading(0, 1, 5), rpc_executor=None)
+    assert sg.sensor_log.inspect_last(DataStream.FromString('unbuffered 1')).value == 5
+    assert seen == [5]
+
+    # Destroying a walker must stop it from receiving readings
+    walker = log.create_walker(DataStreamSelector.FromString('input 2'))
+    sg.process_input(input2, IOTileReading(0, 1, 6), rpc_executor=None)
+    assert walker.count() == 1
+
+    log.destroy_walker(walker)
+    sg.process_input(input2, IOTileReading(0, 1, 7), rpc_executor=None)
+    assert walker.count() == 1
+    assert sg.sensor_log.inspect_last(DataStream.FromString('unbuffered 2')).value == 7
+
+
 def test_usertick():
     """Make sure we properly can set the user tick input."""
 
@@ -4,16 +4,23 @@ from iotile.core.exceptions import ArgumentError
 from iotile.sg.model import DeviceModel
 from iotile.sg.sensor_log import SensorLog
 from iotile.sg.exceptions import StorageFullError, UnresolvedIdentifierError
-from iotile.sg.engine import InMemoryStorageEngine
+from iotile.sg.engine import InMemoryStorageEngine, RingBufferStorageEngine
 from iotile.sg import DataStreamSelector, DataStream, StreamEmptyError
 from iotile.core.hw.reports import IOTileReading
 
 
-def test_counter_walker():
+@pytest.fixture(params=[InMemoryStorageEngine, RingBufferStorageEngine])
+def engine_class(request):
+    """Run each test against every builtin storage engine."""
+
+    return request.param
+
+
+def test_counter_walker(engine_class):
     """Make sure counter walkers work correctly."""
 
     model = DeviceModel()
-    log = SensorLog(model=model)
+    log = SensorLog(engine_class(model), model=model)
 
     walk = log.create_walker(DataStreamSelector.FromString('counter 1'))
 
@@ -42,11 +49,11 @@ def test_counter_walker():
         walk.pop()
 
 
-def test_unbuffered_walker():
+def test_unbuffered_walker(engine_class):
     """Make sure unbuffered walkers hold only 1 reading."""
 
     model = DeviceModel()
-    log = SensorLog(model=model)
+    log = SensorLog(engine_class(model), model=model)
 
     walk = log.create_walker(DataStreamSelector.FromString('unbuffered 1'))
     stream = DataStream.FromString('unbuffered 1')
@@ -68,11 +75,11 @@ def test_unbuffered_walker():
         walk.pop()
 
 
-def test_constant_walker():
+def test_constant_walker(engine_class):
     """Make sure constant walkers can be read any number of times."""
 
     model = DeviceModel()
-    log = SensorLog(model=model)
+    log = SensorLog(engine_class(model), model=model)
 
     walk = log.create_walker(DataStreamSelector.FromString('constant 1'))
     stream = DataStream.FromString('constant 1')
@@ -91,11 +98,11 @@ def test_constant_walker():
     assert walk.count() == 0xFFFFFFFF
 
 
-def test_storage_walker():
+def test_storage_walker(engine_class):
     """Make sure the storage walker works."""
 
     model = DeviceModel()
-    log = SensorLog(model=model)
+    log = SensorLog(engine_class(model), model=model)
 
 
     walk = log.create_walker(DataStreamSelector.FromString('buffered 1'))
@@ -117,11 +124,11 @@ def test_storage_walker():
     assert walk.count() == (old_count - erase_size + 1)
 
 
-def test_walker_at_beginning():
+def test_walker_at_beginning(engine_class):
     """Make sure we can start a walker at the beginning of a stream."""
 
     model = DeviceModel()
-    log = SensorLog(model=model)
+    log = SensorLog(engine_class(model), model=model)
 
     stream = DataStream.FromString('buffered 1')
     reading = IOTileReading(stream.encode(), 0, 1)
@@ -134,11 +141,11 @@ def test_walker_at_beginning():
     assert walk.count() == 2
 
 
-def test_storage_streaming_walkers():
+def test_storage_streaming_walkers(engine_class):
     """Make sure the storage and streaming walkers work simultaneously."""
 
     model = DeviceModel()
-    log = SensorLog(model=model)
+    log = SensorLog(engine_class(model), model=model)
 
 
     storage_walk = log.create_walker(DataStreamSelector.FromString('buffered 1'))
@@ -183,12 +190,12 @@ def test_storage_streaming_walkers():
     assert output_walk.offset == 0
 
 
-def test_storage_scan():
+def test_storage_scan(engine_class):
     """Make sure scan_storage works."""
 
     model = DeviceModel()
 
-    engine = InMemoryStorageEngine(model)
+    engine = engine_class(model)
     log = SensorLog(engine, model=model)
 
     storage1 = DataStream.FromString('buffered 1')
@@ -249,11 +256,11 @@ def test_storage_scan():
         engine.scan_storage('streaming', _max_counter, stop=7)
 
 
-def test_seek_walker():
+def test_seek_walker(engine_class):
     """Make sure we can seek a walker can count with an offset."""
 
     model = DeviceModel()
-    log = SensorLog(model=model)
+    log = SensorLog(engine_class(model), model=model)
 
     stream = DataStream.FromString('buffered 1')
     reading = IOTileReading(stream.encode(), 0, 1)
@@ -308,11 +315,11 @@ def test_seek_walker():
     with pytest.raises(ArgumentError):
         walk.seek(2, target="unsupported")
 
-def test_fill_stop():
+def test_fill_stop(engine_class):
     """Make sure we can configure SensorLog into fill-stop mode."""
 
     model = DeviceModel()
-    log = SensorLog(model=model)
+    log = SensorLog(engine_class(model), model=model)
 
     storage = DataStream.FromString('buffered 1')
     output = DataStream.FromString('output 1')
@@ -352,11 +359,11 @@ def test_fill_stop():
     assert log.count() == (16128, 48896)
 
 
-def test_dump_restore():
+def test_dump_restore(engine_class):
     """Make sure we can properly dump and restore a SensorLog."""
 
     model = DeviceModel()
-    log = SensorLog(model=model)
+    log = SensorLog(engine_class(model), model=model)
 
     storage = DataStream.FromString('buffered 1')
     output = DataStream.FromString('output 1')
@@ -426,3 +433,115 @@ def test_dump_restore():
     log.destroy_all_walkers()
     walk2 = log.restore_walker(dump)
     assert walk2.count() == 25
+
+
+def test_ring_buffer_rollover():
+    """Make sure the ring buffer engine wraps around correctly on rollover."""
+
+    model = DeviceModel()
+    model.set('max_storage_buffer', 10)
+    model.set('buffer_erase_size', 3)
+
+    log = SensorLog('ring_buffer', model=model)
+    assert isinstance(log._engine, RingBufferStorageEngine)
+
+    walk = log.create_walker(DataStreamSelector.FromString('buffered 1'), skip_all=False)
+    stream = DataStream.FromString('buffered 1')
+
+    for i in range(0, 35):
+        log.push(stream, IOTileReading(i, stream.encode(), i, reading_id=i + 1))
+
+    # Each rollover erases 3 readings so after 35 pushes we keep the last 8
+    assert log.count() == (8, 0)
+    assert walk.count() == 8
+
+    state = log.dump()
+    log.clear()
+    log.restore(state)
+    assert log.count() == (8, 0)
+    assert log._engine.get('storage', 0).reading_id == 28
+
+    values = [walk.pop().value for _i in range(0, 8)]
+    assert values == list(range(27, 35))
+
+    with pytest.raises(ArgumentError):
+        SensorLog('unknown_engine', model=model)
+
+
+def test_indexed_matching(engine_class):
+    """Make sure indexed count_matching and next_matching survive rollovers."""
+
+    model = DeviceModel()
+    model.set('max_storage_buffer', 3000)
+
+    engine = engine_class(model)
+    log = SensorLog(engine, model=model)
+
+    streams = [DataStream.FromString('buffered %d' % i) for i in range(1, 4)]
+    selectors = [DataStreamSelector.FromString('buffered 1'), DataStreamSelector.FromString('buffered 3'),
+                 DataStreamSelector.FromString('all buffered')]
+
+    for i in range(0, 20000):
+        stream = streams[(i * 7) % 5 % 3]
+        log.push(stream, IOTileReading(0, stream.encode(), i))
+
+    stored = []
+    engine.scan_storage('storage', lambda i, reading: stored.append(reading.stream))
+    assert len(stored) == engine.count()[0]
+
+    for selector in selectors:
+        matching = [i for i, stream in enumerate(stored) if selector.matches(DataStream.FromEncoded(stream))]
+
+        for offset in (0, 1, 500, 2743, len(stored)):
+            expected = [x for x in matching if x >= offset]
+            assert engine.count_matching(selector, offset) == len(expected)
+
+            if len(expected) > 0:
+                assert engine.next_matching(selector, offset) == expected[0]
+            else:
+                assert engine.next_matching(selector, offset) is None
+
+    walk = log.create_walker(selectors[1], skip_all=False)
+    popped = [walk.pop().value for _i in range(0, walk.count())]
+    assert popped == sorted(popped)
+    assert all(((x * 7) % 5 % 3) == 2 for x in popped)
+
+
+def test_find_reading_id(engine_class):
+    """Make sure reading ids can be found by bisection and highest_id is tracked."""
+
+    model = DeviceModel()
+    model.set('max_storage_buffer', 1000)
+
+    ids = iter(range(1, 100000))
+    engine = engine_class(model)
+    log = SensorLog(engine, model=model, id_assigner=lambda stream, reading: next(ids))
+
+    assert engine.highest_id() == 0
+    assert engine.find_reading_id('storage', 1) is None
+
+    storage = DataStream.FromString('buffered 1')
+    output = DataStream.FromString('output 1')
+    for i in range(0, 2500):
+        log.push(storage, IOTileReading(0, 0, i))
+        log.push(output, IOTileReading(0, 0, i))
+
+    stored_count, streaming_count = engine.count()
+    first_storage = engine.get('storage', 0).reading_id
+
+    assert engine.highest_id() == 5000
+    assert engine.find_reading_id('storage', first_storage) == 0
+    assert engine.find_reading_id('storage', first_storage + 2) == 1
+    assert engine.find_reading_id('storage', first_storage + 1) is None
+    assert engine.find_reading_id('storage', 4999) == stored_count - 1
+    assert engine.find_reading_id('streaming', 5000) == streaming_count - 1
+    assert engine.find_reading_id('storage', 1) is None
+
+    # Make sure out of order ids fall back to a scan
+    log.clear()
+    for reading_id in (5, 9, 3, 7):
+        engine.push(IOTileReading(0, storage.encode(), 0, reading_id=reading_id))
+
+    assert engine.highest_id() == 9
+    assert engine.find_reading_id('storage', 3) == 2
+    assert engine.find_reading_id('storage', 4) is None
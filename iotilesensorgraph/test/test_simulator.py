@@ -4,7 +4,7 @@ from iotile.sg.sim import SensorGraphSimulator
 from iotile.sg.sim.stimulus import SimulationStimulus
 from iotile.sg.slot import SlotIdentifier
 from iotile.sg.known_constants import config_fast_tick_secs, config_tick1_secs, config_tick2_secs
-from iotile.sg import DeviceModel, SensorLog, SensorGraph, DataStream
+from iotile.sg import DeviceModel, SensorLog, SensorGraph, DataStream, DataStreamSelector
 from iotile.core.hw.reports import IOTileReading
 
 @pytest.fixture
@@ -199,3 +199,37 @@ def test_stimulus_parsing():
     with pytest.raises(ArgumentError):
         SimulationStimulus.FromString('unbuffered 1 = 1')
 
+
+
+def test_accelerated_skipping(monkeypatch):
+    """Make sure skipping idle ticks gives the same results as every tick."""
+
+    def _simulate(skip):
+        model = DeviceModel()
+        log = SensorLog(model=model)
+        sg = SensorGraph(log, model=model)
+
+        sg.add_node('(system input 3 always) => counter 1 using copy_latest_a')
+        sg.add_node('(system input 5 always) => counter 2 using copy_latest_a')
+        sg.add_node('(input 1 always) => counter 3 using copy_latest_a')
+        sg.add_config(SlotIdentifier.FromString('controller'), config_fast_tick_secs, 'uint32_t', 7)
+        sg.add_config(SlotIdentifier.FromString('controller'), config_tick1_secs, 'uint32_t', 13)
+
+        sim = SensorGraphSimulator(sg)
+        sim.record_trace([DataStreamSelector.FromString(x) for x in ('counter 1', 'counter 2', 'counter 3')])
+        sim.stimulus('5 seconds: input 1 = 10')
+        sim.stimulus('33 seconds: input 1 = 11')
+        sim.stimulus('33 seconds: input 1 = 12')
+        sim.stop_condition('run_time 500 seconds')
+
+        if not skip:
+            monkeypatch.setattr(sim, '_next_interesting_tick', lambda: sim.tick_count)
+
+        sim.run()
+        sim.run()
+
+        return sim.tick_count, [(x.stream, x.raw_time, x.value) for x in sim.trace]
+
+    ticks, trace = _simulate(True)
+    assert ticks == 1000
+    assert (ticks, trace) == _simulate(False)
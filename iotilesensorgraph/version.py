@@ -1 +1 @@
-version = "1.1.0"
+version = "1.2.0"
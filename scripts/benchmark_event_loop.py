@@ -0,0 +1,76 @@
+"""Benchmark BackgroundEventLoop.run_coroutine from many threads.
+
+Each thread runs a trivial coroutine on the loop many times and waits for
+each result, like synchronous code sending RPCs through HardwareManager.
+The fastest of several repeats is printed along with the queueing and
+execution latencies recorded by the loop.  Pass --threadsafe to use
+asyncio.run_coroutine_threadsafe directly for comparison.
+
+Usage:
+    python benchmark_event_loop.py [--threads N] [--calls N] [--repeat N] [--threadsafe]
+"""
+
+import time
+import asyncio
+import argparse
+import threading
+from iotile.core.utilities import BackgroundEventLoop
+
+
+async def _noop():
+    return None
+
+
+def run_threads(loop, threads, calls, threadsafe):
+    if threadsafe:
+        def _call():
+            asyncio.run_coroutine_threadsafe(_noop(), loop.get_loop()).result()
+    else:
+        def _call():
+            loop.run_coroutine(_noop())
+
+    def _worker():
+        for _i in range(0, calls):
+            _call()
+
+    workers = [threading.Thread(target=_worker) for _i in range(0, threads)]
+
+    start = time.monotonic()
+    for worker in workers:
+        worker.start()
+
+    for worker in workers:
+        worker.join()
+
+    return time.monotonic() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BackgroundEventLoop.run_coroutine")
+    parser.add_argument('--threads', type=int, default=8, help="The number of threads calling run_coroutine")
+    parser.add_argument('--calls', type=int, default=5000, help="The number of calls made by each thread")
+    parser.add_argument('--repeat', type=int, default=3, help="The number of times to run the benchmark")
+    parser.add_argument('--threadsafe', action='store_true', help="Use asyncio.run_coroutine_threadsafe instead")
+    args = parser.parse_args()
+
+    loop = BackgroundEventLoop()
+    loop.start()
+
+    try:
+        duration = min(run_threads(loop, args.threads, args.calls, args.threadsafe) for _i in range(0, args.repeat))
+
+        loop.enable_latency_histograms()
+        run_threads(loop, args.threads, args.calls, args.threadsafe)
+    finally:
+        loop.stop()
+
+    total = args.threads * args.calls
+    print("%d calls from %d threads in %.2f s: %.0f calls/s" % (total, args.threads, duration, total / duration))
+
+    if not args.threadsafe:
+        print("Queue latency: %s" % (loop.queue_latency.summary(),))
+        print("Execution latency: %s" % (loop.execution_latency.summary(),))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark OperationManager.process_message with many pending waiters.
+
+This simulates a socket client with many outstanding commands: a number of
+response waiters keyed on type and uuid plus persistent event callbacks
+keyed on type and name.  Optionally, per connection notification callbacks
+keyed on type, connection and characteristic are added, like those used by
+bluetooth adapters.  It then processes a stream of responses and events and
+prints how many messages per second were dispatched in the fastest of
+several repeats.
+
+Usage:
+    python benchmark_operation_manager.py [--pending N] [--events N] [--connections N] [--messages N]
+                                          [--repeat N]
+"""
+
+import time
+import argparse
+from iotile.core.utilities.async_tools import BackgroundEventLoop, OperationManager
+
+
+async def run_benchmark(manager, pending, events, connections, messages, repeat):
+    received = [0]
+
+    def _on_event(_message):
+        received[0] += 1
+
+    for i in range(0, events):
+        manager.every_match(_on_event, type="event", name="event_%d" % i)
+
+    for i in range(0, connections):
+        manager.every_match(_on_event, type="notification", connection=i, characteristic=0x12)
+
+    waiters = [manager.wait_for(type="response", uuid=i) for i in range(0, pending)]
+
+    stream = []
+    for i in range(0, messages):
+        if i % 4 == 0 and connections > 0:
+            stream.append(dict(type="notification", connection=i % connections, characteristic=0x12, payload=None))
+        elif i % 2 == 0:
+            stream.append(dict(type="event", name="event_%d" % (i % events), payload=None))
+        else:
+            stream.append(dict(type="response", uuid=pending + i, success=True, payload=None))
+
+    duration = None
+    for _i in range(0, repeat):
+        start = time.monotonic()
+        for message in stream:
+            await manager.process_message(message)
+        elapsed = time.monotonic() - start
+
+        if duration is None or elapsed < duration:
+            duration = elapsed
+
+    for waiter in waiters:
+        waiter.close()
+
+    return duration, received[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OperationManager message dispatch")
+    parser.add_argument('--pending', type=int, default=1000, help="The number of outstanding response waiters")
+    parser.add_argument('--events', type=int, default=10, help="The number of distinct event callbacks")
+    parser.add_argument('--connections', type=int, default=0, help="The number of connection notification callbacks")
+    parser.add_argument('--messages', type=int, default=100000, help="The number of messages to process")
+    parser.add_argument('--repeat', type=int, default=5, help="The number of times to process the messages")
+    args = parser.parse_args()
+
+    loop = BackgroundEventLoop()
+    loop.start()
+
+    try:
+        manager = OperationManager(loop=loop)
+        duration, received = loop.run_coroutine(run_benchmark(manager, args.pending, args.events, args.connections,
+                                                               args.messages, args.repeat))
+    finally:
+        loop.stop()
+
+    print("Processed %d messages (%d events delivered) with %d pending waiters in %.2f s: %.0f messages/s"
+          % (args.messages, received, args.pending, duration, args.messages / duration))
+
+    counters = getattr(manager, 'counters', None)
+    if counters is not None:
+        print("Counters: %s" % (counters,))
+
+
+if __name__ == '__main__':
+    main()
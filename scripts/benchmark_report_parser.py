@@ -0,0 +1,65 @@
+"""Benchmark IOTileReportParser on a large stream of back to back reports.
+
+This generates a stream of concatenated SignedListReports and feeds it to
+an IOTileReportParser in randomly sized chunks, printing the throughput.
+
+Usage:
+    python benchmark_report_parser.py [--size MB] [--readings N] [--max-chunk BYTES]
+"""
+
+import argparse
+import random
+import time
+from iotile.core.hw.reports import IOTileReportParser, IOTileReading, SignedListReport
+
+
+def build_stream(size, readings_per_report):
+    """Build at least size bytes of encoded SignedListReports."""
+
+    readings = [IOTileReading(i, 0x5001, i, reading_id=i + 1) for i in range(0, readings_per_report)]
+    report = bytes(SignedListReport.FromReadings(1, readings).encode())
+
+    count = max(1, size // len(report))
+    return report * count, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IOTileReportParser")
+    parser.add_argument('--size', type=int, default=100, help="The amount of data to parse in MB")
+    parser.add_argument('--readings', type=int, default=100, help="The number of readings in each report")
+    parser.add_argument('--max-chunk', type=int, default=64 * 1024, help="The largest chunk to feed at once")
+    parser.add_argument('--seed', type=int, default=0, help="The random seed used to pick chunk sizes")
+    parser.add_argument('--feed-many', action='store_true', help="Feed all chunks with a single call to feed_many")
+    args = parser.parse_args()
+
+    data, count = build_stream(args.size * 1024 * 1024, args.readings)
+
+    rand = random.Random(args.seed)
+    view = memoryview(data)
+    chunks = []
+    offset = 0
+    while offset < len(data):
+        size = rand.randint(1, args.max_chunk)
+        chunks.append(view[offset:offset + size])
+        offset += size
+
+    report_parser = IOTileReportParser(report_callback=lambda report, context: False)
+
+    start = time.monotonic()
+    if args.feed_many:
+        report_parser.feed_many(chunks)
+    else:
+        for chunk in chunks:
+            report_parser.add_data(chunk)
+    duration = time.monotonic() - start
+
+    if report_parser.state == report_parser.ErrorState:
+        raise RuntimeError("Parser entered error state")
+
+    megabytes = len(data) / (1024.0 * 1024.0)
+    print("Parsed %d reports (%.1f MB) in %d chunks in %.2f s: %.1f MB/s, %.0f reports/s"
+          % (count, megabytes, len(chunks), duration, megabytes / duration, count / duration))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""Benchmark RPC and report throughput of the socket based transports.
+
+This serves a virtual device over a socket device server and measures how
+many RPCs per second a client can send, both one at a time and in batches,
+and how quickly reports are forwarded from the server to the client.  Each transport can be run with
+either wire protocol version so that the legacy base64 encoding can be
+compared with the binary encoding.
+
+Usage:
+    python benchmark_socket_lib.py [--transport tcp|unix|ws] [--protocol 1|2]
+                                   [--rpcs N] [--batch N] [--payload BYTES] [--reports N] [--readings N]
+                                   [--coalesce BYTES]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+from iotile.core.utilities import BackgroundEventLoop
+from iotile.core.hw.virtual import SimpleVirtualDevice, rpc
+from iotile.core.hw.transport import VirtualDeviceAdapter
+from iotile.core.hw.reports import IOTileReading, SignedListReport
+
+
+class EchoDevice(SimpleVirtualDevice):
+    """A virtual device with an RPC that echoes its payload."""
+
+    def __init__(self, loop):
+        super(EchoDevice, self).__init__(1, 'Echo01', loop=loop)
+
+    @rpc(8, 0x8000, "V", "V")
+    def echo(self, payload):
+        return [payload]
+
+
+def build_server(transport, adapter, loop, tmpdir, coalesce):
+    """Create a device server and a client adapter connected to it."""
+
+    if transport == 'tcp':
+        from iotile_transport_socket_lib.tcp_socket.tcpsocket_server import TcpSocketDeviceServer
+        from iotile_transport_socket_lib.tcp_socket.tcpsocket_adapter import TcpSocketDeviceAdapter
+
+        server = TcpSocketDeviceServer(adapter, {'host': '127.0.0.1', 'port': 0, 'coalesce_size': coalesce},
+                                       loop=loop)
+        loop.run_coroutine(server.start())
+        return server, TcpSocketDeviceAdapter("127.0.0.1:{}".format(server.implementation.port), loop=loop)
+
+    if transport == 'unix':
+        from iotile_transport_socket_lib.unix_socket.unixsocket_server import UnixSocketDeviceServer
+        from iotile_transport_socket_lib.unix_socket.unixsocket_adapter import UnixSocketDeviceAdapter
+
+        path = os.path.join(tmpdir, 'socket')
+        server = UnixSocketDeviceServer(adapter, {'path': path, 'coalesce_size': coalesce}, loop=loop)
+        loop.run_coroutine(server.start())
+        return server, UnixSocketDeviceAdapter(path, loop=loop)
+
+    from iotile_transport_websocket import WebSocketDeviceServer, WebSocketDeviceAdapter
+
+    server = WebSocketDeviceServer(adapter, {'host': '127.0.0.1', 'port': None}, loop=loop)
+    loop.run_coroutine(server.start())
+    return server, WebSocketDeviceAdapter("127.0.0.1:{}".format(server.implementation.port), loop=loop)
+
+
+async def benchmark_rpcs(client, count, payload):
+    start = time.monotonic()
+    for _i in range(0, count):
+        await client.send_rpc(0, 8, 0x8000, payload, 1.0)
+
+    return time.monotonic() - start
+
+
+async def benchmark_rpc_batches(client, count, batch_size, payload):
+    batch = [(8, 0x8000, payload, 1.0)] * batch_size
+
+    start = time.monotonic()
+    for _i in range(0, count // batch_size):
+        await client.send_rpc_batch(0, batch)
+
+    return time.monotonic() - start
+
+
+async def benchmark_reports(adapter, client, count, report):
+    received = [0]
+    done = adapter._loop.create_event()
+
+    def _on_report(_conn_string, _conn_id, _name, _event):
+        received[0] += 1
+        if received[0] == count:
+            done.set()
+
+    client.register_monitor(['1'], ['report'], _on_report)
+
+    start = time.monotonic()
+    for _i in range(0, count):
+        await adapter.notify_event('1', 'report', report)
+
+    await done.wait()
+    return time.monotonic() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark socket transport throughput")
+    parser.add_argument('--transport', choices=['tcp', 'unix', 'ws'], default='tcp', help="The transport to test")
+    parser.add_argument('--protocol', type=int, choices=[1, 2], default=2, help="The wire protocol version to use")
+    parser.add_argument('--rpcs', type=int, default=5000, help="The number of RPCs to send")
+    parser.add_argument('--batch', type=int, default=50, help="The number of RPCs in each batch")
+    parser.add_argument('--payload', type=int, default=20, help="The size of each RPC payload in bytes")
+    parser.add_argument('--reports', type=int, default=1000, help="The number of reports to forward")
+    parser.add_argument('--coalesce', type=int, default=0,
+                        help="Coalesce tcp and unix server writes up to this many bytes")
+    parser.add_argument('--readings', type=int, default=1000, help="The number of readings in each report")
+    args = parser.parse_args()
+
+    loop = BackgroundEventLoop()
+    loop.start()
+
+    readings = [IOTileReading(i, 0x5001, i, reading_id=i + 1) for i in range(0, args.readings)]
+    report = SignedListReport.FromReadings(1, readings)
+    payload = bytes(range(0, args.payload))
+
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            adapter = VirtualDeviceAdapter(devices=[EchoDevice(loop)], loop=loop)
+            loop.run_coroutine(adapter.start())
+
+            server, client = build_server(args.transport, adapter, loop, tmpdir, args.coalesce)
+            client.set_config('protocol_version', args.protocol)
+
+            try:
+                loop.run_coroutine(client.start())
+                loop.run_coroutine(client.connect(0, '1'))
+                loop.run_coroutine(client.open_interface(0, 'rpc'))
+                loop.run_coroutine(client.open_interface(0, 'streaming'))
+
+                duration = loop.run_coroutine(benchmark_rpcs(client, args.rpcs, payload))
+                print("%s protocol %d: %d RPCs in %.2f s: %.0f RPCs/s"
+                      % (args.transport, client.client.protocol_version, args.rpcs, duration, args.rpcs / duration))
+
+                rpc_count = args.rpcs - (args.rpcs % args.batch)
+                duration = loop.run_coroutine(benchmark_rpc_batches(client, rpc_count, args.batch, payload))
+                print("%s protocol %d: %d RPCs in batches of %d in %.2f s: %.0f RPCs/s"
+                      % (args.transport, client.client.protocol_version, rpc_count, args.batch, duration,
+                         rpc_count / duration))
+
+                duration = loop.run_coroutine(benchmark_reports(adapter, client, args.reports, report))
+                megabytes = args.reports * len(report.encode()) / (1024.0 * 1024.0)
+                print("%s protocol %d: %d reports (%.1f MB) in %.2f s: %.0f reports/s, %.1f MB/s"
+                      % (args.transport, client.client.protocol_version, args.reports, megabytes, duration,
+                         args.reports / duration, megabytes / duration))
+            finally:
+                loop.run_coroutine(client.stop())
+                loop.run_coroutine(server.stop())
+                loop.run_coroutine(adapter.stop())
+    finally:
+        loop.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -313,6 +313,8 @@ class AWSIOTDeviceAdapter(DeviceAdapter):
         """Periodically help maintain adapter internal state
         """
 
+        self.client.check_timeouts()
+
         while True:
             try:
                 action = self._deferred.get(False)
@@ -410,9 +412,13 @@ class AWSIOTDeviceAdapter(DeviceAdapter):
         try:
             rep_msg = messages.ReportNotification.verify(message)
 
+            encoded_report = self._reassemble_report(conn_key, rep_msg)
+            if encoded_report is None:
+                return
+
             serialized_report = {}
             serialized_report['report_format'] = rep_msg['report_format']
-            serialized_report['encoded_report'] = rep_msg['report']
+            serialized_report['encoded_report'] = encoded_report
             serialized_report['received_time'] = datetime.datetime.strptime(rep_msg['received_time'].encode().decode(), "%Y%m%dT%H:%M:%S.%fZ")
 
             report = self.report_parser.deserialize_report(serialized_report)
@@ -420,6 +426,45 @@ class AWSIOTDeviceAdapter(DeviceAdapter):
         except Exception:
             self._logger.exception("Error processing report conn_id=%d", conn_id)
 
+    def _reassemble_report(self, conn_key, rep_msg):
+        """Accumulate report fragments until we have the entire report.
+
+        Fragments are delivered in order since the streaming topic is
+        reordered by sequence number, so a fragment that does not follow the
+        previous one means some were lost and the partial report is dropped.
+
+        Args:
+            conn_key (string): The connection string the report was received on
+            rep_msg (dict): The verified report notification
+
+        Returns:
+            bytes: The complete encoded report or None if more fragments are needed.
+        """
+
+        index = rep_msg['fragment_index']
+        count = rep_msg['fragment_count']
+
+        if count == 1:
+            return rep_msg['report']
+
+        context = self.conns.get_context(conn_key)
+        fragments = context.get('report_fragments')
+
+        if index == 0:
+            fragments = []
+        elif fragments is None or len(fragments) != index:
+            self._logger.warning("Dropping report fragment %d of %d received out of sequence", index, count)
+            context['report_fragments'] = None
+            return None
+
+        fragments.append(rep_msg['report'])
+        if index < count - 1:
+            context['report_fragments'] = fragments
+            return None
+
+        context['report_fragments'] = None
+        return b''.join(fragments)
+
     def _on_trace(self, sequence, topic, message):
         """Process a trace received from a device.
 
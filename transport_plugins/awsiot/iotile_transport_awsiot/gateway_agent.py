@@ -1,5 +1,6 @@
 import logging
 import tornado.gen
+import base64
 import binascii
 import struct
 from . import messages
@@ -30,6 +31,17 @@ class AWSIOTGatewayAgent:
               in between this interval and only the last one is sent every interval unless
               the progres event indicates that the total operation has finished, in which
               case it is sent immediately.  Default: 2s
+            - max_fragment_size (int): the maximum number of bytes of report or trace
+              data to send in a single message.  Larger reports are split into
+              fragments that the client reassembles and larger traces are sent as
+              several messages.  64kB stays under the AWS IoT message size limit
+              once encoded.  Clients older than iotile-transport-awsiot 1.2 cannot
+              reassemble fragmented reports.  Default: None, which never splits
+              reports or traces.
+            - binary_encoding (str): either hex or base64, the encoding used for
+              report and trace data.  base64 messages are a third smaller but
+              clients older than iotile-transport-awsiot 1.2 only understand hex.
+              Default: hex
 
     """
 
@@ -58,6 +70,14 @@ class AWSIOTGatewayAgent:
         self.throttle_trace = self._args.get('trace_throttle_interval', 5.0)
         self.throttle_progress = self._args.get('progress_throttle_interval', 2.0)
         self.client_timeout = self._args.get('client_timeout', 60.0)
+        self.max_fragment_size = self._args.get('max_fragment_size', None)
+        self.binary_encoding = self._args.get('binary_encoding', 'hex')
+
+        if self.max_fragment_size is not None and self.max_fragment_size <= 0:
+            raise ArgumentError("max_fragment_size must be positive", max_fragment_size=self.max_fragment_size)
+
+        if self.binary_encoding not in ('base64', 'hex'):
+            raise ArgumentError("Unknown binary_encoding, must be base64 or hex", binary_encoding=self.binary_encoding)
 
     @classmethod
     def _build_device_slug(cls, device_id):
@@ -565,7 +585,7 @@ class AWSIOTGatewayAgent:
         if resp['success']:
             conn_id = resp['connection_id']
             self._connections[uuid] = {'key': key, 'client': client, 'connection_id': conn_id, 'last_touch': monotonic(),
-                                       'script': [], 'trace_accum': bytes(), 'last_trace': None, 'trace_scheduled': False,
+                                       'script': [], 'trace_accum': [], 'last_trace': None, 'trace_scheduled': False,
                                        'last_progress': None}
         else:
             message['failure_reason'] = resp['reason']
@@ -590,17 +610,23 @@ class AWSIOTGatewayAgent:
         slug = self._build_device_slug(device_uuid)
         streaming_topic = self.topics.prefix + 'devices/{}/data/streaming'.format(slug)
 
-        data = {'type': 'notification', 'operation': 'report'}
-
         ser = report.serialize()
-        data['received_time'] = ser['received_time'].strftime("%Y%m%dT%H:%M:%S.%fZ").encode()
-        data['report_origin'] = ser['origin']
-        data['report_format'] = ser['report_format']
-        data['report'] = binascii.hexlify(ser['encoded_report'])
-        data['fragment_count'] = 1
-        data['fragment_index'] = 0
-        self._logger.debug("Publishing report: (topic=%s)", streaming_topic)
-        self.client.publish(streaming_topic, data)
+        received_time = ser['received_time'].strftime("%Y%m%dT%H:%M:%S.%fZ")
+
+        # Reports larger than max_fragment_size are split up and reassembled by the client
+        fragments = self._fragment(ser['encoded_report'])
+        self._logger.debug("Publishing report in %d fragments: (topic=%s)", len(fragments), streaming_topic)
+
+        for i, fragment in enumerate(fragments):
+            data = {'type': 'notification', 'operation': 'report'}
+            data['received_time'] = received_time.encode()
+            data['report_origin'] = ser['origin']
+            data['report_format'] = ser['report_format']
+            data['fragment_count'] = len(fragments)
+            data['fragment_index'] = i
+            self._encode_binary(data, 'report', fragment)
+
+            self.client.publish(streaming_topic, data)
 
     def _notify_trace(self, device_uuid, event_name, trace):
         """Notify that we have received tracing data from a device.
@@ -616,7 +642,7 @@ class AWSIOTGatewayAgent:
         last_trace = conn_data['last_trace']
         now = monotonic()
 
-        conn_data['trace_accum'] += bytes(trace)
+        conn_data['trace_accum'].append(bytes(trace))
 
         # If we're throttling tracing data, we need to see if we should accumulate this trace or
         # send it now.  We acculumate if we've last sent tracing data less than self.throttle_trace seconds ago
@@ -637,22 +663,42 @@ class AWSIOTGatewayAgent:
 
         conn_data = self._connections[device_uuid]
 
-        trace = conn_data['trace_accum']
+        trace = b''.join(conn_data['trace_accum'])
 
         if len(trace) > 0:
             slug = self._build_device_slug(device_uuid)
             tracing_topic = self.topics.prefix + 'devices/{}/data/tracing'.format(slug)
 
-            data = {'type': 'notification', 'operation': 'trace'}
-            data['trace'] = binascii.hexlify(trace)
-            data['trace_origin'] = device_uuid
-
+            # Tracing data is an unstructured stream so large traces can just be sent as several messages
             self._logger.debug('Publishing trace: (topic=%s)', tracing_topic)
-            self.client.publish(tracing_topic, data)
+            for fragment in self._fragment(trace):
+                data = {'type': 'notification', 'operation': 'trace'}
+                data['trace_origin'] = device_uuid
+                self._encode_binary(data, 'trace', fragment)
+
+                self.client.publish(tracing_topic, data)
 
         conn_data['trace_scheduled'] = False
         conn_data['last_trace'] = monotonic()
-        conn_data['trace_accum'] = bytes()
+        conn_data['trace_accum'] = []
+
+    def _fragment(self, data):
+        """Split binary data into pieces no larger than max_fragment_size."""
+
+        view = memoryview(data)
+        if self.max_fragment_size is None or len(view) <= self.max_fragment_size:
+            return [view]
+
+        return [view[i:i + self.max_fragment_size] for i in range(0, len(view), self.max_fragment_size)]
+
+    def _encode_binary(self, data, key, value):
+        """Encode binary data into a message using our configured encoding."""
+
+        if self.binary_encoding == 'hex':
+            data[key] = binascii.hexlify(value)
+        else:
+            data['encoding'] = 'base64'
+            data[key] = base64.standard_b64encode(value)
 
     def _on_scan_request(self, sequence, topic, message):
         """Process a request for scanning information
@@ -154,21 +154,45 @@ FailedScriptResponse.add_required('failure_reason', StringVerifier())
 ScriptResponse = OptionsVerifier(SuccessfulScriptResponse, FailedScriptResponse)  # pylint: disable=C0103
 
 # Notifications that we support
-ReportNotification = DictionaryVerifier()  # pylint: disable=C0103
-ReportNotification.add_required('type', LiteralVerifier('notification'))
-ReportNotification.add_required('fragment_count', IntVerifier())
-ReportNotification.add_required('fragment_index', IntVerifier())
-ReportNotification.add_required('operation', LiteralVerifier('report'))
-ReportNotification.add_required('received_time', StringVerifier())
-ReportNotification.add_required('report', BytesVerifier(encoding='hex'))
-ReportNotification.add_required('report_origin', IntVerifier())
-ReportNotification.add_required('report_format', IntVerifier())
-
-TracingNotification = DictionaryVerifier()  # pylint: disable=C0103
-TracingNotification.add_required('type', LiteralVerifier('notification'))
-TracingNotification.add_required('operation', LiteralVerifier('trace'))
-TracingNotification.add_required('trace_origin', IntVerifier())
-TracingNotification.add_required('trace', BytesVerifier(encoding='hex'))
+# Reports and traces are hex encoded by older gateways and base64 encoded, with an
+# encoding key saying so, by newer ones.
+Base64ReportNotification = DictionaryVerifier()  # pylint: disable=C0103
+Base64ReportNotification.add_required('type', LiteralVerifier('notification'))
+Base64ReportNotification.add_required('fragment_count', IntVerifier())
+Base64ReportNotification.add_required('fragment_index', IntVerifier())
+Base64ReportNotification.add_required('operation', LiteralVerifier('report'))
+Base64ReportNotification.add_required('received_time', StringVerifier())
+Base64ReportNotification.add_required('encoding', LiteralVerifier('base64'))
+Base64ReportNotification.add_required('report', BytesVerifier(encoding='base64'))
+Base64ReportNotification.add_required('report_origin', IntVerifier())
+Base64ReportNotification.add_required('report_format', IntVerifier())
+
+HexReportNotification = DictionaryVerifier()  # pylint: disable=C0103
+HexReportNotification.add_required('type', LiteralVerifier('notification'))
+HexReportNotification.add_required('fragment_count', IntVerifier())
+HexReportNotification.add_required('fragment_index', IntVerifier())
+HexReportNotification.add_required('operation', LiteralVerifier('report'))
+HexReportNotification.add_required('received_time', StringVerifier())
+HexReportNotification.add_required('report', BytesVerifier(encoding='hex'))
+HexReportNotification.add_required('report_origin', IntVerifier())
+HexReportNotification.add_required('report_format', IntVerifier())
+
+ReportNotification = OptionsVerifier(Base64ReportNotification, HexReportNotification)  # pylint: disable=C0103
+
+Base64TracingNotification = DictionaryVerifier()  # pylint: disable=C0103
+Base64TracingNotification.add_required('type', LiteralVerifier('notification'))
+Base64TracingNotification.add_required('operation', LiteralVerifier('trace'))
+Base64TracingNotification.add_required('trace_origin', IntVerifier())
+Base64TracingNotification.add_required('encoding', LiteralVerifier('base64'))
+Base64TracingNotification.add_required('trace', BytesVerifier(encoding='base64'))
+
+HexTracingNotification = DictionaryVerifier()  # pylint: disable=C0103
+HexTracingNotification.add_required('type', LiteralVerifier('notification'))
+HexTracingNotification.add_required('operation', LiteralVerifier('trace'))
+HexTracingNotification.add_required('trace_origin', IntVerifier())
+HexTracingNotification.add_required('trace', BytesVerifier(encoding='hex'))
+
+TracingNotification = OptionsVerifier(Base64TracingNotification, HexTracingNotification)  # pylint: disable=C0103
 
 ProgressNotification = DictionaryVerifier()  # pylint: disable=C0103
 ProgressNotification.add_required('type', LiteralVerifier('notification'))
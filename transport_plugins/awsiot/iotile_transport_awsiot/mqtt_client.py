@@ -2,6 +2,7 @@ import json
 import logging
 import AWSIoTPythonSDK.MQTTLib
 import re
+import threading
 from AWSIoTPythonSDK.exception.operationError import operationError
 from iotile.core.exceptions import ArgumentError, ExternalError, InternalError
 from iotile.core.dev.registry import ComponentRegistry
@@ -12,9 +13,17 @@ from .topic_sequencer import TopicSequencer
 class OrderedAWSIOTClient:
     """An MQTT based channel to connect with an IOTile Device
 
+    Messages on ordered topics are passed through a :class:`PacketQueue`
+    per topic that reorders them by sequence number.  If a message goes
+    missing, later messages are held for at most ``missing_timeout``
+    seconds, or until ``reorder_window`` later sequence numbers have
+    arrived, before the missing one is skipped.
+
     Args:
         args (dict): A dictionary of arguments for setting up the
-            MQTT connection.
+            MQTT connection.  The optional ``missing_timeout`` (default
+            5.0 seconds) and ``reorder_window`` (default 256) keys control
+            how long out of order messages are held.
     """
 
     def __init__(self, args):
@@ -26,6 +35,8 @@ class OrderedAWSIOTClient:
         iamsecret = args.get('iam_secret', None)
         iamsession = args.get('iam_session', None)
         use_websockets = args.get('use_websockets', False)
+        missing_timeout = args.get('missing_timeout', 5.0)
+        reorder_window = args.get('reorder_window', 256)
 
         try:
             if not use_websockets:
@@ -73,6 +84,9 @@ class OrderedAWSIOTClient:
         self.sequencer = TopicSequencer()
         self.queues = {}
         self.wildcard_queues = []
+        self.missing_timeout = missing_timeout
+        self.reorder_window = reorder_window
+        self._queue_lock = threading.RLock()
         self._logger = logging.getLogger(__name__)
 
     def connect(self, client_id):
@@ -184,7 +198,8 @@ class OrderedAWSIOTClient:
             regex = re.compile(topic.replace('+', '[^/]+').replace('#', '.*'))
             self.wildcard_queues.append((topic, regex, callback, ordered))
         else:
-            self.queues[topic] = PacketQueue(0, callback, ordered)
+            with self._queue_lock:
+                self.queues[topic] = self._create_queue(callback, ordered)
 
         try:
             self.client.subscribe(topic, 1, self._on_receive)
@@ -202,8 +217,31 @@ class OrderedAWSIOTClient:
             topic (string): The topic to reset the packet queue on
         """
 
-        if topic in self.queues:
-            self.queues[topic].reset()
+        with self._queue_lock:
+            if topic in self.queues:
+                self.queues[topic].reset()
+
+    def check_timeouts(self):
+        """Skip missing messages that have been waited for too long.
+
+        Messages are normally only delivered when another message arrives on
+        the same topic, so this should be called periodically to make sure
+        that messages held behind a lost one are eventually delivered.
+        """
+
+        with self._queue_lock:
+            for packet_queue in self.queues.values():
+                packet_queue.check_timeout()
+
+    def queue_stats(self):
+        """Get the reordering counters for every topic with a queue.
+
+        Returns:
+            dict: A map of topic to the stats() of its PacketQueue.
+        """
+
+        with self._queue_lock:
+            return {topic: packet_queue.stats() for topic, packet_queue in self.queues.items()}
 
     def unsubscribe(self, topic):
         """Unsubscribe from messages on a given topic
@@ -212,7 +250,8 @@ class OrderedAWSIOTClient:
             topic (string): The MQTT topic to unsubscribe from
         """
 
-        del self.queues[topic]
+        with self._queue_lock:
+            del self.queues[topic]
 
         try:
             self.client.unsubscribe(topic)
@@ -244,18 +283,22 @@ class OrderedAWSIOTClient:
             self._logger.warn("Message received did not have required sequence and message keys: %s", packet)
             return
 
-        # If we received a packet that does not fit into a queue, check our wildcard
-        # queues
-        if topic not in self.queues:
-            found = False
-            for _, regex, callback, ordered in self.wildcard_queues:
-                if regex.match(topic):
-                    self.queues[topic] = PacketQueue(0, callback, ordered)
-                    found = True
-                    break
-
-            if not found:
-                self._logger.warn("Received message for unknown topic: %s", topic)
-                return
-
-        self.queues[topic].receive(seq, [seq, topic, message_data])
+        with self._queue_lock:
+            # If we received a packet that does not fit into a queue, check our wildcard
+            # queues
+            if topic not in self.queues:
+                found = False
+                for _, regex, callback, ordered in self.wildcard_queues:
+                    if regex.match(topic):
+                        self.queues[topic] = self._create_queue(callback, ordered)
+                        found = True
+                        break
+
+                if not found:
+                    self._logger.warn("Received message for unknown topic: %s", topic)
+                    return
+
+            self.queues[topic].receive(seq, [seq, topic, message_data])
+
+    def _create_queue(self, callback, ordered):
+        return PacketQueue(self.missing_timeout, callback, ordered, self.reorder_window)
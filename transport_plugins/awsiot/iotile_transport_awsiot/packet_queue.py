@@ -1,18 +1,24 @@
-"""A packet queue for reordering out of order packets
+"""A packet queue for reordering out of order packets."""
 
-TODO:
-- Add timeout
-- replace list with a priority queue
-- Add maximum out of order window
-"""
+import heapq
+import logging
+import time
 
 
 class PacketQueue:
     """A queue for reordering out-of-order messages
 
+    Packets that arrive ahead of the next expected sequence number are held
+    in a heap until the missing packets arrive.  A missing packet is not
+    waited for forever.  If it has not arrived ``missing_timeout`` seconds
+    after the first later packet was queued, or if more than ``max_window``
+    sequence numbers would need to be held, the queue skips ahead to the
+    oldest packet it has and continues from there.
+
     Args:
-        missing_timeout (int): The maximum time to wait for a missing packet
-            without triggering a timeout error
+        missing_timeout (float): The maximum time to wait for a missing packet
+            before skipping it.  If this is 0 or None, missing packets are
+            only skipped when the reorder window is exceeded.
         callback (callable): A callback function that should be called for
             each received message with the signature:
             callback(*args) where args is the list passed to receive
@@ -21,14 +27,40 @@ class PacketQueue:
             channel or if each packet is independent and sequence numbers
             should not be checked.  True means sequence numbers are checked
             and packets are reordered.
-
+        max_window (int): The maximum number of sequence numbers past the
+            next expected one that packets may be held for.  If this is 0 or
+            None, the window is unlimited.
     """
-    def __init__(self, missing_timeout, callback, reorder=True):
+
+    def __init__(self, missing_timeout, callback, reorder=True, max_window=None):
         self._out_of_order = []
+        self._queued = set()
         self._next_expected = None
+        self._waiting_since = None
         self._callback = callback
         self._reorder = reorder
         self._missing_timeout = missing_timeout
+        self._max_window = max_window
+        self._logger = logging.getLogger(__name__)
+
+        self.reordered = 0
+        self.dropped = 0
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self._out_of_order)
+
+    def stats(self):
+        """Get counters describing how packets have been handled.
+
+        Returns:
+            dict: The number of packets currently queued and the number that
+            were received out of order, dropped as duplicates or old packets
+            and sequence numbers that were skipped because they never arrived.
+        """
+
+        return dict(queued=len(self._out_of_order), reordered=self.reordered, dropped=self.dropped,
+                    skipped=self.skipped)
 
     def receive(self, sequence, args):
         """Receive one packet
@@ -37,7 +69,7 @@ class PacketQueue:
 
         If it is not the next expected sequence number, it is put into the
         _out_of_order queue to be processed once the holes in sequence number
-        are filled in.
+        are filled in or we give up waiting for them.
 
         Args:
             sequence (int): The sequence number of the received packet
@@ -50,27 +82,95 @@ class PacketQueue:
             self._callback(*args)
             return
 
-        # If this packet is in the past, drop it
-        if self._next_expected is not None and sequence < self._next_expected:
-            print("Dropping out of order packet, seq=%d" % sequence)
+        # If this packet is in the past or already queued, drop it
+        if (self._next_expected is not None and sequence < self._next_expected) or sequence in self._queued:
+            self._logger.debug("Dropping old or duplicate packet, seq=%d", sequence)
+            self.dropped += 1
             return
 
-        self._out_of_order.append((sequence, args))
-        self._out_of_order.sort(key=lambda x: x[0])
+        # Fast path for the common case of packets arriving in order
+        if not self._out_of_order and (self._next_expected is None or sequence == self._next_expected):
+            self._next_expected = sequence + 1
+            self._callback(*args)
+            return
 
-        # If we have received packets, attempt to process them in order
-        while len(self._out_of_order) > 0:
-            seq, args = self._out_of_order[0]
+        if self._next_expected is None or sequence != self._next_expected:
+            self.reordered += 1
 
-            if self._next_expected is not None and seq != self._next_expected:
-                return
+        heapq.heappush(self._out_of_order, (sequence, args))
+        self._queued.add(sequence)
 
-            self._callback(*args)
-            self._out_of_order.pop(0)
-            self._next_expected = seq+1
+        if self._waiting_since is None:
+            self._waiting_since = time.monotonic()
+
+        self._process()
+
+        if self._max_window:
+            while self._out_of_order and sequence - self._next_expected >= self._max_window:
+                self._skip_ahead()
+
+        self.check_timeout()
+
+    def check_timeout(self, now=None):
+        """Skip any missing packet that we have waited too long for.
+
+        This is called on every received packet but should also be called
+        periodically so that packets queued behind a missing one are
+        delivered even if no further packets arrive.
+
+        Args:
+            now (float): The current monotonic time, defaults to time.monotonic().
+        """
+
+        if not self._missing_timeout:
+            return
+
+        if now is None:
+            now = time.monotonic()
+
+        while self._waiting_since is not None and now - self._waiting_since >= self._missing_timeout:
+            self._skip_ahead()
+            if self._out_of_order:
+                self._waiting_since = now
 
     def reset(self):
         """Reset the expected next sequence number
+
+        Any queued out of order packets are discarded.
         """
 
+        self.dropped += len(self._out_of_order)
+        self._out_of_order = []
+        self._queued.clear()
+        self._waiting_since = None
         self._next_expected = None
+
+    def _skip_ahead(self):
+        """Give up on the next expected packet and deliver what we have after it."""
+
+        seq = self._out_of_order[0][0]
+        self._logger.debug("Skipping missing packets %d to %d", self._next_expected, seq - 1)
+
+        self.skipped += seq - self._next_expected
+        self._next_expected = seq
+        self._process()
+
+    def _process(self):
+        """Deliver queued packets that are now in order."""
+
+        delivered = False
+        while self._out_of_order:
+            seq = self._out_of_order[0][0]
+            if seq != self._next_expected:
+                # Start timing the new gap from when the previous one was filled
+                if delivered:
+                    self._waiting_since = time.monotonic()
+                return
+
+            _, args = heapq.heappop(self._out_of_order)
+            self._queued.discard(seq)
+            self._next_expected = seq + 1
+            self._callback(*args)
+            delivered = True
+
+        self._waiting_since = None
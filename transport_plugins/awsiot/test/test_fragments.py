@@ -0,0 +1,105 @@
+"""Tests of fragmented report and trace publishing."""
+
+import logging
+import pytest
+from iotile.core.hw.reports import IOTileReading, SignedListReport
+from iotile_transport_awsiot import messages
+from iotile_transport_awsiot.gateway_agent import AWSIOTGatewayAgent
+from iotile_transport_awsiot.device_adapter import AWSIOTDeviceAdapter
+from iotile_transport_awsiot.topic_validator import MQTTTopicValidator
+
+
+class _FakeClient:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, topic, message):
+        # Bytes are decoded before being serialized to json by OrderedAWSIOTClient
+        message = {key: value.decode('utf8') if isinstance(value, bytes) else value
+                   for key, value in message.items()}
+        self.published.append((topic, message))
+
+
+class _FakeConnections:
+    def __init__(self):
+        self.context = {}
+
+    def get_context(self, _conn_key):
+        return self.context
+
+
+@pytest.fixture
+def agent():
+    agent = AWSIOTGatewayAgent({'iotile_id': '0x2', 'max_fragment_size': 100}, None, None)
+    agent.client = _FakeClient()
+    agent.topics = MQTTTopicValidator('devices/d--0000-0000-0000-0002')
+    agent._connections[1] = {'trace_accum': [], 'trace_scheduled': False, 'last_trace': None}
+    return agent
+
+
+def _build_adapter():
+    adapter = AWSIOTDeviceAdapter.__new__(AWSIOTDeviceAdapter)
+    adapter.conns = _FakeConnections()
+    adapter._logger = logging.getLogger(__name__)
+    return adapter
+
+
+@pytest.mark.parametrize("encoding", ['base64', 'hex'])
+def test_report_fragments(agent, encoding):
+    """Make sure large reports are split up and can be reassembled."""
+
+    agent.binary_encoding = encoding
+
+    readings = [IOTileReading(i, 0x5001, i, reading_id=i + 1) for i in range(0, 50)]
+    report = SignedListReport.FromReadings(1, readings)
+    encoded = report.encode()
+
+    agent._notify_report(1, 'report', report)
+
+    published = agent.client.published
+    assert len(published) == (len(encoded) + 99) // 100
+
+    adapter = _build_adapter()
+    results = []
+    for _topic, message in published:
+        verified = messages.ReportNotification.verify(message)
+        assert verified['fragment_count'] == len(published)
+        results.append(adapter._reassemble_report('1', verified))
+
+    assert results[:-1] == [None] * (len(published) - 1)
+    assert results[-1] == encoded
+
+    # A missing fragment causes the partial report to be dropped
+    for _topic, message in published[:1] + published[2:]:
+        assert adapter._reassemble_report('1', messages.ReportNotification.verify(message)) is None
+
+
+def test_trace_fragments(agent):
+    """Make sure accumulated traces are sent in pieces."""
+
+    agent._connections[1]['trace_accum'] = [b'a' * 150, b'b' * 100]
+    agent._send_accum_trace(1)
+
+    traces = [messages.TracingNotification.verify(message)['trace'] for _topic, message in agent.client.published]
+    assert [len(x) for x in traces] == [100, 100, 50]
+    assert b''.join(traces) == b'a' * 150 + b'b' * 100
+    assert agent._connections[1]['trace_accum'] == []
+
+
+def test_default_encoding():
+    """Make sure reports are sent in one hex message by default for older clients."""
+
+    agent = AWSIOTGatewayAgent({'iotile_id': '0x2'}, None, None)
+    agent.client = _FakeClient()
+    agent.topics = MQTTTopicValidator('devices/d--0000-0000-0000-0002')
+    agent._connections[1] = {'trace_accum': [], 'trace_scheduled': False, 'last_trace': None}
+
+    readings = [IOTileReading(i, 0x5001, i, reading_id=i + 1) for i in range(0, 5000)]
+    report = SignedListReport.FromReadings(1, readings)
+
+    agent._notify_report(1, 'report', report)
+
+    assert len(agent.client.published) == 1
+    _topic, message = agent.client.published[0]
+    assert 'encoding' not in message
+    assert messages.HexReportNotification.verify(message)['report'] == report.encode()
@@ -0,0 +1,80 @@
+"""Tests of PacketQueue reordering."""
+
+from iotile_transport_awsiot.packet_queue import PacketQueue
+
+
+def _make_queue(*args, **kwargs):
+    received = []
+    queue = PacketQueue(*args, callback=lambda seq: received.append(seq), **kwargs)
+    return queue, received
+
+
+def test_reordering():
+    """Make sure out of order packets are delivered in order and old ones dropped."""
+
+    queue, received = _make_queue(0)
+
+    for seq in [0, 3, 1, 5, 2, 1, 4, 3]:
+        queue.receive(seq, [seq])
+
+    assert received == [0, 1, 2, 3, 4, 5]
+    assert queue.stats() == dict(queued=0, reordered=2, dropped=2, skipped=0)
+
+
+def test_missing_timeout():
+    """Make sure we skip a missing packet after waiting long enough for it."""
+
+    queue, received = _make_queue(1.0)
+
+    queue.receive(0, [0])
+    queue.receive(2, [2])
+    queue.receive(3, [3])
+    assert received == [0]
+    assert len(queue) == 2
+
+    queue.check_timeout(now=queue._waiting_since + 0.5)
+    assert received == [0]
+
+    queue.check_timeout(now=queue._waiting_since + 1.0)
+    assert received == [0, 2, 3]
+    assert queue.skipped == 1
+
+    # A late copy of the skipped packet is dropped
+    queue.receive(1, [1])
+    assert received == [0, 2, 3]
+    assert queue.dropped == 1
+
+
+def test_reorder_window():
+    """Make sure we skip ahead rather than holding more than the window."""
+
+    queue, received = _make_queue(0, max_window=4)
+
+    queue.receive(0, [0])
+    queue.receive(2, [2])
+    queue.receive(4, [4])
+    assert received == [0]
+
+    queue.receive(5, [5])
+    assert received == [0, 2]
+    assert queue.skipped == 1
+
+    queue.receive(3, [3])
+    assert received == [0, 2, 3, 4, 5]
+
+
+def test_unordered_and_reset():
+    """Make sure unordered queues pass everything and reset starts over."""
+
+    queue, received = _make_queue(0, reorder=False)
+    for seq in [3, 1, 1]:
+        queue.receive(seq, [seq])
+    assert received == [3, 1, 1]
+
+    queue, received = _make_queue(0)
+    queue.receive(10, [10])
+    queue.receive(12, [12])
+    queue.reset()
+    queue.receive(0, [0])
+    assert received == [10, 0]
+    assert queue.dropped == 1
@@ -1,3 +1,4 @@
+from collections import deque
 from serial import SerialException
 from threading import Thread, Event
 from queue import Queue, Empty
@@ -18,11 +19,16 @@ class AsyncPacketBuffer:
     def __init__(self, filelike, header_length, length_function, deduplicate=False, deduplicate_timeout=0):
         """
         Given an underlying file like object, synchronously read from it
-        in a separate thread and communicate the data back to the buffer
-        one packet at a time.
+        in a separate thread and communicate the data back to the buffer.
+
+        The reader thread passes packets back in batches of all the packets
+        found in each read, and each packet is a memoryview into the data
+        that was read rather than a copy.  Packets are returned one at a time
+        by read_packet and read_packet_nowait.
         """
 
         self.queue = Queue()
+        self._packets = deque()
         self.file = filelike
         self._stop = Event()
         self._thread = Thread(target=reader_thread,
@@ -43,15 +49,26 @@ class AsyncPacketBuffer:
     def has_packet(self):
         """return True if there is a packet waiting in the queue."""
 
-        return not self.queue.empty()
+        return len(self._packets) > 0 or not self.queue.empty()
 
     def read_packet(self, timeout=3.0):
         """read one packet, timeout if one packet is not available in the timeout period"""
 
-        try:
-            return self.queue.get(timeout=timeout)
-        except Empty:
-            raise InternalTimeoutError("Timeout waiting for packet in AsyncPacketBuffer")
+        if not self._packets:
+            try:
+                self._packets.extend(self.queue.get(timeout=timeout))
+            except Empty:
+                raise InternalTimeoutError("Timeout waiting for packet in AsyncPacketBuffer")
+
+        return self._packets.popleft()
+
+    def read_packet_nowait(self):
+        """read one packet if one is available, otherwise raise queue.Empty"""
+
+        if not self._packets:
+            self._packets.extend(self.queue.get_nowait())
+
+        return self._packets.popleft()
 
 
 def reader_thread(filelike, read_queue, header_length, length_function, stop, dedupe=False, dedupe_timeout=5):
@@ -61,42 +78,50 @@ def reader_thread(filelike, read_queue, header_length, length_function, stop, de
     if dedupe:
         broadcast_v2_dedupers = BroadcastV2DeduperCollection(dedupe_timeout)
 
+    # Any partial packet left over at the end of the last read
+    leftover = b''
+
     while not stop.is_set():
         try:
-            header = bytearray()
-            while len(header) < header_length:
-                chunk = bytearray(filelike.read(header_length - len(header)))
-                header += chunk
-
-                if stop.is_set():
-                    break
+            # Read everything that is waiting, or block until at least a header arrives
+            waiting = getattr(filelike, 'in_waiting', 0)
+            chunk = filelike.read(max(waiting, header_length - len(leftover), 1))
 
             if stop.is_set():
                 break
 
-            remaining_length = length_function(header)
+            if len(chunk) == 0:
+                continue
+
+            if leftover:
+                data = leftover + chunk
+            else:
+                data = chunk
 
-            remaining = bytearray()
-            while len(remaining) < remaining_length:
-                chunk = bytearray(filelike.read(remaining_length - len(remaining)))
-                remaining += chunk
-                if stop.is_set():
+            # Frame all complete packets in place without copying them
+            view = memoryview(data)
+            data_length = len(view)
+            offset = 0
+            packets = []
+
+            while data_length - offset >= header_length:
+                packet_length = header_length + length_function(view[offset:offset + header_length])
+                if data_length - offset < packet_length:
                     break
 
-            if stop.is_set():
-                break
+                packet = view[offset:offset + packet_length]
+                offset += packet_length
 
-            # We have a complete packet now, process it
-            packet = header + remaining
+                if broadcast_v2_dedupers is not None and not broadcast_v2_dedupers.allow_packet(packet):
+                    continue
 
-            if broadcast_v2_dedupers is not None and not broadcast_v2_dedupers.allow_packet(packet):
-                continue
+                packets.append(packet)
 
-            if stop.is_set():
-                break
+            leftover = bytes(view[offset:])
 
-            read_queue.put(packet)
+            if packets:
+                read_queue.put(packets)
         except:
             logger.exception("Error in reader thread, putting device failure event")
-            read_queue.put(bytearray([0x80, 0, 255, 255]))
+            read_queue.put([bytearray([0x80, 0, 255, 255])])
             break
@@ -31,6 +31,15 @@ except ImportError:
 
 EPHEMERAL_KEY_CYCLE_POWER = 6
 
+# Precompiled structures for parsing advertisements, which arrive at a high rate
+_SCAN_EVENT_HEADER = struct.Struct("<bB6sBB")
+_V1_MANUFACTURER_DATA = struct.Struct("<BBHLH")
+_V1_SCAN_RESPONSE = struct.Struct("<BBHHHLLL11x")
+_V2_ADVERTISEMENT = struct.Struct("<LHBBLBBHLL")
+
+# The maximum number of BLE address strings to cache before starting over
+_MAX_CACHED_ADDRESSES = 4096
+
 def packet_length(header):
     """Find the BGAPI packet length given its header"""
 
@@ -116,6 +125,7 @@ class BLED112Adapter(DeviceAdapter):
         self.connecting_count = 0
         self.maximum_connections = 0
         self._conn_map = OrderedDict()
+        self._address_strings = {}
 
         self._scan_event_count = 0
         self._v1_scan_count = 0
@@ -663,19 +673,15 @@ class BLED112Adapter(DeviceAdapter):
         broadcast_multiplex = 0
 
         payload = response.payload
-        length = len(payload) - 10
 
-        if length < 0:
+        if len(payload) < _SCAN_EVENT_HEADER.size:
             return
 
-        rssi, packet_type, sender, _addr_type, _bond, data = unpack("<bB6sBB%ds" % length, payload)
-        string_address = ':'.join([format(x, "02X") for x in bytearray(sender[::-1])])
+        rssi, packet_type, sender, _addr_type, _bond = _SCAN_EVENT_HEADER.unpack_from(payload)
+        string_address = self._format_address(sender)
 
         # Scan data is prepended with a length
-        if len(data) > 0:
-            data = bytearray(data[1:])
-        else:
-            data = bytearray([])
+        data = payload[_SCAN_EVENT_HEADER.size + 1:]
 
         self._scan_event_count += 1
 
@@ -716,6 +722,19 @@ class BLED112Adapter(DeviceAdapter):
                 report = BroadcastReport.FromReadings(info['uuid'], [io_tile_reading], reading_time)
                 self._trigger_callback('on_report', None, report)
 
+    def _format_address(self, sender):
+        """Convert a little endian BLE address into a string, caching the result."""
+
+        string_address = self._address_strings.get(sender)
+        if string_address is None:
+            if len(self._address_strings) >= _MAX_CACHED_ADDRESSES:
+                self._address_strings.clear()
+
+            string_address = ':'.join(["%02X" % x for x in reversed(sender)])
+            self._address_strings[sender] = string_address
+
+        return string_address
+
     def _parse_v2_advertisement(self, rssi, sender, data):
         """ Parse the IOTile Specific advertisement packet"""
 
@@ -728,7 +747,7 @@ class BLED112Adapter(DeviceAdapter):
 
         device_id, reboot_low, reboot_high_packed, flags, timestamp, \
         battery, counter_packed, broadcast_stream_packed, broadcast_value, \
-        _mac = unpack("<LHBBLBBHLL", data[7:])
+        _mac = _V2_ADVERTISEMENT.unpack_from(data, 7)
 
         reboots = (reboot_high_packed & 0xF) << 16 | reboot_low
         counter = counter_packed & ((1 << 5) - 1)
@@ -827,7 +846,7 @@ class BLED112Adapter(DeviceAdapter):
             # Now parse out the manufacturer specific data
             manu_data = advert[21:]
 
-            _length, _datatype, _manu_id, device_uuid, flags = unpack("<BBHLH", manu_data)
+            _length, _datatype, _manu_id, device_uuid, flags = _V1_MANUFACTURER_DATA.unpack(manu_data)
 
             self._device_scan_counts.setdefault(device_uuid, {'v1': 0, 'v2': 0})['v1'] += 1
 
@@ -860,7 +879,7 @@ class BLED112Adapter(DeviceAdapter):
             return None, None, None, None
 
         # Check if this is a scan response packet from an iotile based device
-        _length, _datatype, _manu_id, voltage, stream, reading, reading_time, curr_time = unpack("<BBHHHLLL11x", scan_data)
+        _length, _datatype, _manu_id, voltage, stream, reading, reading_time, curr_time = _V1_SCAN_RESPONSE.unpack(scan_data)
 
         info['voltage'] = voltage / 256.0
         info['current_time'] = curr_time
@@ -893,7 +893,7 @@ class BLED112CommandProcessor(threading.Thread):
         to_return = []
         try:
             while True:
-                event_data = self._stream.queue.get_nowait()
+                event_data = self._stream.read_packet_nowait()
                 event = BGAPIPacket(is_event=(event_data[0] == 0x80), command_class=event_data[2],
                                     command=event_data[3], payload=event_data[4:])
 
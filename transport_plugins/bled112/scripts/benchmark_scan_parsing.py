@@ -0,0 +1,97 @@
+"""Benchmark how quickly BLED112Adapter processes advertisement packets.
+
+This runs a BLED112Adapter against a MockAdvertisingBLED112 connected
+through an in-memory serial port rather than a real dongle or virtual
+terminal.  Once the adapter has started scanning, bursts of advertisements
+from many simulated devices are written to the serial port as fast as
+possible and the time taken until the adapter has parsed every one of them
+is measured.
+
+Usage:
+    python benchmark_scan_parsing.py [--packets N] [--burst N] [--unique-devices N] [--active]
+"""
+
+import argparse
+import threading
+import time
+import serial
+from iotile_transport_bled112.bled112 import BLED112Adapter
+from iotile_transport_bled112.hardware.emulator.mock_adv_bled112 import MockAdvertisingBLED112
+
+
+class LoopbackSerial:
+    """An in-memory serial port connected to a mock BLED112."""
+
+    def __init__(self, mock, timeout=0.01):
+        self.timeout = timeout
+        self._mock = mock
+        self._data = bytearray()
+        self._cond = threading.Condition()
+
+    @property
+    def in_waiting(self):
+        return len(self._data)
+
+    def inject(self, data):
+        with self._cond:
+            self._data += data
+            self._cond.notify_all()
+
+    def write(self, data):
+        self.inject(self._mock.generate_response(data))
+
+    def read(self, size):
+        with self._cond:
+            if len(self._data) < size:
+                self._cond.wait(self.timeout)
+
+            data = bytes(self._data[:size])
+            del self._data[:size]
+            return data
+
+    def close(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BLED112 advertisement processing")
+    parser.add_argument('--packets', type=int, default=50000, help="The number of advertisements to send")
+    parser.add_argument('--burst', type=int, default=500, help="The number of advertisements written at once")
+    parser.add_argument('--unique-devices', type=int, default=100, help="The number of distinct devices advertising")
+    parser.add_argument('--active', action="store_true", help="Use active scanning so each advertisement "
+                                                               "is followed by a scan response")
+    args = parser.parse_args()
+
+    mock = MockAdvertisingBLED112(3)
+    port = LoopbackSerial(mock)
+
+    old_serial = serial.Serial
+    serial.Serial = lambda *_args, **_kwargs: port
+
+    try:
+        adapter = BLED112Adapter('loopback', passive=not args.active, stop_check_interval=0.01)
+    finally:
+        serial.Serial = old_serial
+
+    try:
+        bursts = mock.generate_multiple_adv_packets(args.burst, args.unique_devices, 5)
+        per_burst = args.burst * (2 if args.active else 1)
+        count = (args.packets // args.burst) * per_burst
+
+        initial_count = adapter.get_scan_stats()[0]
+        start = time.monotonic()
+        for _i in range(0, args.packets // args.burst):
+            port.inject(next(bursts))
+
+        while adapter.get_scan_stats()[0] - initial_count < count:
+            time.sleep(0.001)
+
+        duration = time.monotonic() - start
+    finally:
+        adapter.stop_sync()
+
+    print("Processed %d scan events in %.2f s: %.0f events/s" % (count, duration, count / duration))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Tests of framing BGAPI packets read from a serial port."""
+
+import threading
+import pytest
+from iotile_transport_bled112.async_packet import AsyncPacketBuffer, InternalTimeoutError
+from iotile_transport_bled112.bled112 import packet_length
+
+
+class ChunkedSerial:
+    """A serial port that returns preset chunks of data one read at a time."""
+
+    def __init__(self, chunks):
+        self._chunks = list(chunks)
+        self._done = threading.Event()
+        self.in_waiting = 0
+
+    def read(self, _size):
+        if not self._chunks:
+            self._done.wait(0.01)
+            return b''
+
+        return self._chunks.pop(0)
+
+    def write(self, _value):
+        pass
+
+
+def _packet(payload):
+    return bytes([0x80, len(payload), 6, 0]) + payload
+
+
+def test_framing_across_reads():
+    """Make sure packets split across reads or sharing a read are framed correctly."""
+
+    packets = [_packet(bytes([i]) * (10 + i)) for i in range(0, 5)]
+    data = b''.join(packets)
+
+    # Split the data at points that land in both headers and payloads
+    chunks = [data[0:2], data[2:20], data[20:45], data[45:]]
+    buffer = AsyncPacketBuffer(ChunkedSerial(chunks), header_length=4, length_function=packet_length)
+
+    try:
+        received = [bytes(buffer.read_packet(timeout=1.0)) for _i in range(0, 5)]
+        assert received == packets
+
+        assert not buffer.has_packet()
+        with pytest.raises(InternalTimeoutError):
+            buffer.read_packet(timeout=0.05)
+    finally:
+        buffer.stop()
+
+
+def test_batched_packets():
+    """Make sure every packet from a single read is handed off together."""
+
+    packets = [_packet(bytes([i]) * 5) for i in range(0, 10)]
+    buffer = AsyncPacketBuffer(ChunkedSerial([b''.join(packets)]), header_length=4, length_function=packet_length)
+
+    try:
+        first = buffer.read_packet(timeout=1.0)
+        assert isinstance(first, memoryview)
+
+        received = [bytes(first)]
+        while buffer.has_packet():
+            received.append(bytes(buffer.read_packet_nowait()))
+
+        assert received == packets
+    finally:
+        buffer.stop()
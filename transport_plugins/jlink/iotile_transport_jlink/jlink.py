@@ -282,6 +282,9 @@ class JLinkAdapter(StandardDeviceAdapter):
         if name == 'heartbeat':
             return {'alive': True}
 
+        if name == 'queue_stats':
+            return self._jlink_async.queue_stats()
+
         self._ensure_connection(conn_id, True)
 
         func = known_commands.get(name)
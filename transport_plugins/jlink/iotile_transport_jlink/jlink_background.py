@@ -31,6 +31,10 @@ class AsyncJLink:
     RESET_RPC_ID = 1
     CONTROLLER_ADDRESS = 8
 
+    # The shortest time to wait between polls of the streaming/tracing queue when
+    # it is not filling up, the longest time is the maintenance step_timeout
+    MIN_POLL_INTERVAL = 0.001
+
     def __init__(self, jlink_adapter, loop=SharedLoop):
         self._jlink_adapter = jlink_adapter
         self._jlink = None
@@ -41,6 +45,15 @@ class AsyncJLink:
         self._maintenance_task = None
         self.rpc_response_event = self._loop.create_event() # triggered when the controller acknowledge rpc response
 
+        # Queue polling statistics, the whole queue is read at once while it is busy
+        self._queue_size = None
+        self._queue_busy = False
+        self.poll_interval = 0.0
+        self.received_bytes = 0
+        self.bytes_per_second = 0.0
+        self._rate_start = time.monotonic()
+        self._rate_bytes = 0
+
     async def send_rpc(self, device_info, control_info, address, rpc_id, payload, timeout):
         """Write and trigger an RPC."""
 
@@ -381,6 +394,8 @@ class AsyncJLink:
 
         if counter == 0:
             await self._clear_queue(control_info)
+            self._queue_size = None
+            self._queue_busy = False
             self._maintenance_task = self._loop.add_task(
                 self._maintenance_coroutine(control_info, step_timeout), parent=self._jlink_adapter._task)
 
@@ -456,77 +471,140 @@ class AsyncJLink:
         if value & poll_mask:
             self.rpc_response_event.set()
 
-    async def _read_queue_frames(self, control_info, read_index, write_index, queue_size):
-        header_address, _ = control_info.queue_element_info(read_index)
+    def _read_queue_blocking(self, control_info, full):
+        """Read and acknowledge all pending frames in the streaming/tracing queue.
+
+        The queue header and frames are read with aligned 32-bit reads.  If
+        ``full`` is True, the header and every frame are read in a single
+        bulk read, otherwise the header is read first and then only the
+        frames that are needed.  The read index is advanced past the frames
+        that were read before returning.
+
+        Returns:
+            (int, int, bytes, int): The index of the first pending frame, the
+            number of pending frames, the frames that were read, which is
+            None if the queue is empty, and the index of the first frame that
+            was read.
+        """
+
+        read_address, write_address, queue_size_address = control_info.queue_info()
+
+        if read_address != (write_address - 1) and write_address != (queue_size_address - 1):
+            raise HardwareError("Read/Write/Queue Size addresses are not algined.")
 
-        if read_index > write_index:
-            queue_wrapped = True
-            number_frames = (write_index + 1) + (queue_size - read_index)
-            number_pre_wrapped_frames = queue_size - read_index
-            pre_wrapped_frame_bytes = control_info.FRAME_SIZE * number_pre_wrapped_frames
-            post_wrapped_frame_bytes = (number_frames - number_pre_wrapped_frames) * control_info.FRAME_SIZE
+        if full and self._queue_size:
+            data = self._read_aligned_blocking(read_address, 4 + self._queue_size * control_info.FRAME_SIZE)
         else:
-            queue_wrapped = False
-            number_frames = write_index - read_index + 1
+            data = self._read_aligned_blocking(read_address, 4)
+
+        read_index, write_index, queue_size = struct.unpack_from("<BBH", data)
+        self._queue_size = queue_size
+
+        if read_index == write_index or queue_size == 0:
+            return read_index, 0, None, 0
 
-        total_frame_bytes = control_info.FRAME_SIZE * number_frames
+        frame_count = (write_index - read_index) % queue_size
 
-        if queue_wrapped is True:
-            frames = await self.read_memory(header_address, pre_wrapped_frame_bytes, chunk_size=1)
-            header_address, _ = control_info.queue_element_info(0)
-            frames += await self.read_memory(header_address, post_wrapped_frame_bytes, chunk_size=1)
+        if len(data) >= 4 + queue_size * control_info.FRAME_SIZE:
+            first_frame = 0
+            frames = data[4:]
+        elif read_index > write_index:
+            # The pending frames wrap around the end of the queue so read all of it at once
+            first_frame = 0
+            frame_address, _ = control_info.queue_element_info(0)
+            frames = self._read_aligned_blocking(frame_address, queue_size * control_info.FRAME_SIZE)
         else:
-            frames = await self.read_memory(header_address, total_frame_bytes, chunk_size=1)
+            first_frame = read_index
+            frame_address, _ = control_info.queue_element_info(read_index)
+            frames = self._read_aligned_blocking(frame_address, frame_count * control_info.FRAME_SIZE)
+
+        self._write_memory_blocking(read_address, [write_index], chunk_size=1)
+        return read_index, frame_count, frames, first_frame
+
+    def _read_aligned_blocking(self, address, length):
+        """Read an unaligned range of memory using 32-bit reads."""
+
+        start = address & ~0x3
+        end = (address + length + 3) & ~0x3
+
+        data = self._read_memory_blocking(start, end - start, chunk_size=4)
+        return data[address - start:address - start + length]
+
+    def _process_queue_frames(self, control_info, read_index, frame_count, frames, first_frame):
+        """Pass a batch of frames read from the queue on to the adapter."""
+
+        queue_size = self._queue_size
+        frame_size = control_info.FRAME_SIZE
+
+        trace = bytearray()
+        stream = bytearray()
 
-        for frame in range(number_frames - 1):
-            frame_index = frame * control_info.FRAME_SIZE
-            is_trace = frames[frame_index] & 0x40
-            is_stream = frames[frame_index] & 0x80
-            frame_length = frames[frame_index] & 0x3F
-            frame_data = frames[(frame_index + 1):(frame_index + frame_length + 1)]
+        for i in range(0, frame_count):
+            frame_index = ((read_index + i) % queue_size - first_frame) * frame_size
+            header = frames[frame_index]
+            frame_length = header & 0x3F
 
-            if frame_length > ControlStructure.FRAME_SIZE - 1:
+            if frame_length > frame_size - 1:
                 raise HardwareError("Data length is too big {}".format(frame_length))
 
-            if is_trace and self._jlink_adapter.opened_interfaces["tracing"]:
-                self._jlink_adapter.add_trace(frame_data)
-            elif is_stream and self._jlink_adapter.opened_interfaces["streaming"]:
-                self._jlink_adapter.report_parser.add_data(frame_data)
-            else:
-                pass # Drop if interface is not opened
+            if header & 0x40:
+                trace += frames[(frame_index + 1):(frame_index + frame_length + 1)]
+            elif header & 0x80:
+                stream += frames[(frame_index + 1):(frame_index + frame_length + 1)]
 
-    async def _poll_queue_status(self, control_info):
-        """ Read next frame from queue
+        self._record_received(len(trace) + len(stream))
 
-            Returns:
-                bool: true if queue is empty
+        # Drop data for interfaces that are not opened
+        if trace and self._jlink_adapter.opened_interfaces["tracing"]:
+            self._jlink_adapter.add_trace(bytes(trace))
+
+        if stream and self._jlink_adapter.opened_interfaces["streaming"]:
+            self._jlink_adapter.report_parser.add_data(stream)
+
+    def _record_received(self, length):
+        self.received_bytes += length
+        self._rate_bytes += length
+
+        now = time.monotonic()
+        if now - self._rate_start >= 1.0:
+            self.bytes_per_second = self._rate_bytes / (now - self._rate_start)
+            self._rate_start = now
+            self._rate_bytes = 0
+
+    def queue_stats(self):
+        """Get statistics about how data is being read from the device's queue.
+
+        Returns:
+            dict: The current polling interval in seconds, the total number
+            of bytes received and the number of bytes received per second,
+            measured over at least the last second.
         """
 
-        read_address, write_address, queue_size_address = control_info.queue_info()
+        return dict(poll_interval=self.poll_interval, received_bytes=self.received_bytes,
+                    bytes_per_second=self.bytes_per_second)
 
-        if read_address != (write_address - 1) and write_address != (queue_size_address - 1):
-            raise HardwareError("Read/Write/Queue Size addresses are not algined.")
+    async def _poll_queue_status(self, control_info):
+        """ Read all pending frames from queue
+
+            Returns:
+                float: the fraction of the queue that was occupied, 0 if it was empty
+        """
 
-        queue_info = await self.read_memory(read_address, 4, chunk_size=1)
-        read_index = queue_info[0]
-        write_index = queue_info[1]
-        queue_size = queue_info[2] + (queue_info[3] << 8)
+        read_index, frame_count, frames, first_frame = await self._loop.run_in_executor(
+            self._read_queue_blocking, control_info, self._queue_busy)
+        self._queue_busy = frame_count > 0
 
-        if read_index == write_index:
-            return True
+        if frame_count == 0:
+            return 0.0
 
         try:
-            await self._read_queue_frames(control_info, read_index, write_index, queue_size)
-        except (HardwareError, pylink.errors.JLinkException):
+            self._process_queue_frames(control_info, read_index, frame_count, frames, first_frame)
+        except HardwareError:
             logger.debug("Queue poll exception.", exc_info=True)
         except:
             logger.exception("Unexpected queue poll exception!")
 
-        if queue_size != 0:
-            read_index = write_index
-        await self.write_memory(read_address, [read_index], chunk_size=1)
-
-        return read_index == write_index
+        return frame_count / self._queue_size
 
     async def _clear_queue(self, control_info):
         read_address, write_address, _ = control_info.queue_info()
@@ -542,15 +620,32 @@ class AsyncJLink:
 
     async def _maintenance_coroutine(self, control_info, step_timeout):
         last_timer_update = time.time()
+        self.poll_interval = 0.0
+
         while self._maintenance_counter > 0:
             try:
-                await self._poll_queue_status(control_info)
+                try:
+                    occupancy = await self._poll_queue_status(control_info)
+                except pylink.errors.JLinkException:
+                    logger.debug("Queue poll exception.", exc_info=True)
+                    occupancy = 0.0
+
+                # Poll as fast as possible while the queue is filling up and back off while it is empty
+                if occupancy >= 0.5:
+                    self.poll_interval = 0.0
+                elif occupancy > 0:
+                    self.poll_interval /= 2
+                else:
+                    self.poll_interval = min(max(self.poll_interval * 2, self.MIN_POLL_INTERVAL), step_timeout)
 
                 if (time.time() - last_timer_update) > step_timeout:
                     last_timer_update = time.time()
                     await self._update_watch_counter(control_info)
                     await self._poll_rpc_status(control_info)
 
+                if self.poll_interval >= self.MIN_POLL_INTERVAL:
+                    await asyncio.sleep(self.poll_interval)
+
             except asyncio.CancelledError:
                 logger.debug("Maintenance task is canceled")
                 break
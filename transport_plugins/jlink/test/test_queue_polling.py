@@ -0,0 +1,98 @@
+"""Tests of reading the streaming and tracing queue over the jlink."""
+
+import struct
+import pytest
+from iotile.core.utilities import BackgroundEventLoop
+from iotile_transport_jlink.jlink_background import AsyncJLink
+from iotile_transport_jlink.structures import ControlStructure
+
+BASE_ADDRESS = 0x20000100
+QUEUE_SIZE = 8
+
+
+class FakeJLink:
+    """A jlink that reads and writes a block of RAM containing the queue."""
+
+    def __init__(self):
+        self.memory = bytearray(ControlStructure.QUEUE_OFFSET + 4 + QUEUE_SIZE * ControlStructure.FRAME_SIZE + 4)
+        self.reads = []
+
+    def memory_read32(self, address, count):
+        self.reads.append((address, count))
+        offset = address - BASE_ADDRESS
+        return list(struct.unpack_from("<%dL" % count, self.memory, offset))
+
+    def memory_write8(self, address, data):
+        offset = address - BASE_ADDRESS
+        self.memory[offset:offset + len(data)] = bytes(data)
+
+
+class FakeAdapter:
+    def __init__(self):
+        self.opened_interfaces = {'streaming': True, 'tracing': True}
+        self.report_parser = self
+        self.streamed = []
+        self.traces = []
+
+    def add_data(self, data):
+        self.streamed.append(bytes(data))
+
+    def add_trace(self, trace):
+        self.traces.append(trace)
+
+
+@pytest.fixture
+def queue_jlink():
+    loop = BackgroundEventLoop()
+    loop.start()
+
+    header = struct.pack("<LLLLBBH", ControlStructure.CONTROL_MAGIC_1, ControlStructure.CONTROL_MAGIC_2,
+                         ControlStructure.CONTROL_MAGIC_3, ControlStructure.CONTROL_MAGIC_4, 1, 0, 24)
+    control = ControlStructure(BASE_ADDRESS, header + struct.pack("<L", 1))
+
+    adapter = FakeAdapter()
+    jlink = AsyncJLink(adapter, loop=loop)
+    jlink._jlink = FakeJLink()
+
+    yield loop, jlink, control, adapter
+
+    loop.stop()
+
+
+def _push_frames(jlink, frames, read_index):
+    memory = jlink._jlink.memory
+    queue_offset = ControlStructure.QUEUE_OFFSET
+
+    write_index = read_index
+    for kind, data in frames:
+        offset = queue_offset + 4 + write_index * ControlStructure.FRAME_SIZE
+        memory[offset] = kind | len(data)
+        memory[offset + 1:offset + 1 + len(data)] = data
+        write_index = (write_index + 1) % QUEUE_SIZE
+
+    struct.pack_into("<BBH", memory, queue_offset, read_index, write_index, QUEUE_SIZE)
+
+
+def test_queue_polling(queue_jlink):
+    """Make sure frames are read in batches, including when they wrap around."""
+
+    loop, jlink, control, adapter = queue_jlink
+
+    assert loop.run_coroutine(jlink._poll_queue_status(control)) == 0.0
+
+    _push_frames(jlink, [(0x80, b'a' * 20), (0x40, b'trace'), (0x80, b'b' * 3)], 0)
+    assert loop.run_coroutine(jlink._poll_queue_status(control)) == 3 / QUEUE_SIZE
+    assert adapter.streamed == [b'a' * 20 + b'b' * 3]
+    assert adapter.traces == [b'trace']
+    assert jlink._jlink.memory[ControlStructure.QUEUE_OFFSET] == 3
+
+    # Frames that wrap around the end of the queue are read in a single bulk read
+    jlink._jlink.reads = []
+    _push_frames(jlink, [(0x80, bytes([i])) for i in range(0, 5)], 6)
+    loop.run_coroutine(jlink._poll_queue_status(control))
+
+    assert adapter.streamed[1] == bytes(range(0, 5))
+    assert len(jlink._jlink.reads) == 1
+    assert jlink._jlink.reads[0][0] == BASE_ADDRESS + ControlStructure.QUEUE_OFFSET
+    assert jlink._jlink.memory[ControlStructure.QUEUE_OFFSET] == 3
+    assert jlink.queue_stats()['received_bytes'] == 33
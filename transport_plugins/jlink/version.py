@@ -1 +1 @@
-version = "1.2.0"
+version = "1.3.0"
@@ -17,35 +17,93 @@ import asyncio
 class AsyncioSocketConnection:
     """Paired read and write commands for an active Socket Connection
 
+    Each message is framed with a fixed size header containing a magic number
+    and the length of the message.  Headers and messages are always read with
+    readexactly() so that large messages arriving in several pieces are never
+    truncated.
+
+    By default every message is written to the transport as soon as send() is
+    called.  If ``coalesce_size`` is set, messages are buffered and written
+    together once at least ``coalesce_size`` bytes are waiting or
+    ``coalesce_delay`` seconds have passed since the first one was buffered,
+    which cuts down on the number of writes when streaming many small
+    messages like reports and traces.
+
     Args:
         reader (asyncio.StreamReader): The reader returned from the connect command or callback
         writer (asyncio.StreamWriter): The writer returned from the connect command or callback
         logger (logging.Logger): The logger to use (Since this is used by both the Server and Client, the
             logger should be that of the Server or Client)
+        coalesce_size (int): The number of buffered bytes that triggers a write.  Defaults to 0,
+            which disables coalescing.
+        coalesce_delay (float): The maximum time in seconds that a message may be buffered before
+            it is written when coalescing is enabled.
     """
 
     _ARCHMAGIC = "ARCH".encode()
     _HEADERFORMAT = '4sL'
-    def __init__(self, reader, writer, logger):
+    _HEADER = struct.Struct(_HEADERFORMAT)
+
+    def __init__(self, reader, writer, logger, coalesce_size=0, coalesce_delay=0.002):
         self.reader = reader
         self.writer = writer
         self._logger = logger
 
+        self.coalesce_size = coalesce_size
+        self.coalesce_delay = coalesce_delay
+        self._pending = []
+        self._pending_size = 0
+        self._flush_handle = None
+
     async def send(self, encoded):
         """Send encoded byte data. First send a header with the data's length, then the data itself
-        Return once data in the buffer has been drained
+
+        The header and data are written together and, if the transport's
+        buffer is full, this waits for it to drain before returning.
 
         Args:
             encoded (bytes): Encoded data to send
         """
+
+        packed_header = self._HEADER.pack(self._ARCHMAGIC, len(encoded))
+
         try:
-            packed_header = struct.pack(self._HEADERFORMAT, self._ARCHMAGIC, len(encoded))
+            if self.coalesce_size <= 0:
+                self.writer.writelines((packed_header, encoded))
+            else:
+                self._pending.append(packed_header)
+                self._pending.append(encoded)
+                self._pending_size += len(packed_header) + len(encoded)
+
+                if self._pending_size < self.coalesce_size:
+                    if self._flush_handle is None:
+                        self._flush_handle = asyncio.get_event_loop().call_later(self.coalesce_delay, self.flush)
+                    return
+
+                self.flush()
+
             await self.writer.drain()
-            self.writer.write(packed_header)
-            self.writer.write(encoded)
+        except Exception as err:
+            raise ConnectionError("Error sending data") from err
+
+    def flush(self):
+        """Write any messages buffered while coalescing to the transport."""
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
 
-        except Exception:
-            raise ConnectionError from Exception
+        pending = self._pending
+        self._pending = []
+        self._pending_size = 0
+
+        try:
+            self.writer.writelines(pending)
+        except Exception:  #pylint:disable=broad-except;This may be called from a timer callback
+            self._logger.exception("Error writing %d buffered messages", len(pending) // 2)
 
     async def recv(self):
         """Await incoming data, return the encoded bytes
@@ -53,14 +111,24 @@ class AsyncioSocketConnection:
         Returns:
             bytes: Encoded data object
         """
-        packed_header = await self.reader.read(struct.calcsize(self._HEADERFORMAT))
-        magic, encoded_len = struct.unpack(self._HEADERFORMAT, packed_header)
 
-        if magic != self._ARCHMAGIC:
-            raise struct.error
+        try:
+            packed_header = await self.reader.readexactly(self._HEADER.size)
+            magic, encoded_len = self._HEADER.unpack(packed_header)
+
+            if magic != self._ARCHMAGIC:
+                raise struct.error("Invalid magic number in message header: %r" % magic)
+
+            return await self.reader.readexactly(encoded_len)
+        except asyncio.IncompleteReadError as err:
+            raise ConnectionError("Connection closed after %d of %d bytes"
+                                  % (len(err.partial), err.expected)) from err
+
+    async def close(self):
+        """Write any buffered messages and close the connection."""
 
-        encoded = await self.reader.read(encoded_len)
-        return encoded
+        self.flush()
+        self.writer.close()
 
 
 class AbstractSocketServerImplementation(abc.ABC):
@@ -96,6 +164,17 @@ class AbstractSocketServerImplementation(abc.ABC):
                 The implementation must know how to use this object
         """
 
+    def flush(self, con):
+        """Immediately write any data buffered for the given connection
+
+        This is called after sending a command response so that responses
+        are not delayed by implementations that coalesce outgoing messages.
+        The default implementation does nothing.
+
+        Args:
+            con (a connection object): The connection to flush.
+        """
+
 class AbstractSocketClientImplementation(abc.ABC):
     """Abstract Socket Client"""
 
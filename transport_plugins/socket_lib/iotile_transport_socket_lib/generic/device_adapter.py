@@ -1,22 +1,34 @@
 # This file is copyright Arch Systems, Inc.
 # Except as otherwise provided in the relevant LICENSE file, all rights are reserved.
 
-import base64
 import logging
 import asyncio
+import itertools
 from iotile.core.hw.transport.adapter import StandardDeviceAdapter
 from iotile.core.utilities.schema_verify import NoneVerifier
 from iotile.core.utilities import SharedLoop
 from iotile.core.hw.virtual import unpack_rpc_response
 from iotile.core.hw.reports import IOTileReportParser
-from iotile.core.hw.exceptions import DeviceAdapterError
+from iotile.core.hw.exceptions import DeviceAdapterError, VALID_RPC_EXCEPTIONS
 from iotile.core.exceptions import ExternalError
 from iotile_transport_socket_lib.protocol import OPERATIONS, NOTIFICATIONS, COMMANDS
 from .socket_client import AsyncSocketClient
+from .packing import encode_bytes, BINARY_PROTOCOL, SUPPORTED_PROTOCOL
 
 class SocketDeviceAdapter(StandardDeviceAdapter):
     """ A device adapter allowing connections to devices over any socket implementation
 
+    The adapter asks the server for the newest wire protocol version up to
+    the ``protocol_version`` config value when it starts, which defaults to
+    the newest version this library supports.
+
+    Scripts larger than the ``script_fragment_size`` config value are split
+    into fragments when the server supports the binary protocol.  Up to
+    ``script_max_inflight`` fragments are sent before waiting for the server
+    to acknowledge them.  Every fragmented script is tagged with a new upload
+    id so that the server can tell a retried script from fragments of an
+    earlier attempt that failed.
+
     Args:
         implementation (AbstractSocketClient): The implementation of the socket client
             that will be used to connect to the SocketDeviceServer
@@ -32,22 +44,26 @@ class SocketDeviceAdapter(StandardDeviceAdapter):
         self.set_config('max_connections', 100)
         self.set_config('probe_required', True)
         self.set_config('probe_supported', True)
+        self.set_config('protocol_version', SUPPORTED_PROTOCOL)
+        self.set_config('script_fragment_size', 64*1024)
+        self.set_config('script_max_inflight', 4)
 
         # Set logger
         self.logger = logging.getLogger(__name__)
         self.logger.addHandler(logging.NullHandler())
 
         self._report_parser = IOTileReportParser()
+        self._script_upload_ids = itertools.count(1)
 
         self.client = AsyncSocketClient(implementation, loop=loop)
         self.client.register_event(OPERATIONS.NOTIFY_DEVICE_FOUND, self._on_device_found,
                                    NOTIFICATIONS.ScanEvent)
         self.client.register_event(OPERATIONS.NOTIFY_TRACE, self._on_trace_notification,
-                                   NOTIFICATIONS.TraceEvent)
+                                   NOTIFICATIONS.TraceEvent, NOTIFICATIONS.TraceEventBinary)
         self.client.register_event(OPERATIONS.NOTIFY_REPORT, self._on_report_notification,
-                                   NOTIFICATIONS.ReportEvent)
+                                   NOTIFICATIONS.ReportEvent, NOTIFICATIONS.ReportEventBinary)
         self.client.register_event(OPERATIONS.NOTIFY_BROADCAST, self._on_broadcast_notification,
-                                   NOTIFICATIONS.ReportEvent)
+                                   NOTIFICATIONS.ReportEvent, NOTIFICATIONS.ReportEventBinary)
         self.client.register_event(OPERATIONS.NOTIFY_PROGRESS, self._on_progress_notification,
                                    NOTIFICATIONS.ProgressEvent)
         self.client.register_event(OPERATIONS.NOTIFY_SOCKET_DISCONNECT,
@@ -59,6 +75,7 @@ class SocketDeviceAdapter(StandardDeviceAdapter):
         See :meth:`AbstractDeviceAdapter.start`.
         """
 
+        self.client.max_protocol_version = min(self.get_config('protocol_version'), SUPPORTED_PROTOCOL)
         await self.client.start()
 
     async def stop(self):
@@ -138,15 +155,79 @@ class SocketDeviceAdapter(StandardDeviceAdapter):
         self._ensure_connection(conn_id, True)
         connection_string = self._get_property(conn_id, "connection_string")
 
-        msg = dict(address=address, rpc_id=rpc_id, payload=base64.b64encode(payload),
+        version = self.client.protocol_version
+        msg = dict(address=address, rpc_id=rpc_id, payload=encode_bytes(payload, version),
                    timeout=timeout, connection_string=connection_string)
 
-        response = await self._send_command(OPERATIONS.SEND_RPC, msg, COMMANDS.SendRPCResponse,
-                                            timeout=timeout)
+        if version >= BINARY_PROTOCOL:
+            verifier = COMMANDS.SendRPCResponseBinary
+        else:
+            verifier = COMMANDS.SendRPCResponse
+
+        response = await self._send_command(OPERATIONS.SEND_RPC, msg, verifier, timeout=timeout)
 
         return unpack_rpc_response(response.get('status'), response.get('payload'),
                                    rpc_id=rpc_id, address=address)
 
+    async def send_rpc_batch(self, conn_id, rpcs):
+        """Send a batch of RPCs to a device in a single message.
+
+        The RPCs are sent to the device in order by the server and all of
+        their responses are returned together, which avoids a round trip per
+        RPC when polling many values at once.  If the server predates the
+        binary protocol, the RPCs are sent one at a time instead.
+
+        Args:
+            conn_id (int): A unique identifier that will refer to this connection
+            rpcs (list of tuple): The RPCs to send as (address, rpc_id, payload,
+                timeout) tuples.
+
+        Returns:
+            list: The result of each RPC in order.  This is the response
+            payload as bytes if the RPC succeeded or the exception that
+            :meth:`send_rpc` would have raised if it failed.
+        """
+
+        self._ensure_connection(conn_id, True)
+        connection_string = self._get_property(conn_id, "connection_string")
+
+        version = self.client.protocol_version
+        if version < BINARY_PROTOCOL:
+            return [await self._try_rpc(conn_id, *rpc) for rpc in rpcs]
+
+        if len(rpcs) == 0:
+            return []
+
+        batch = [dict(address=address, rpc_id=rpc_id, payload=encode_bytes(payload, version), timeout=timeout)
+                 for address, rpc_id, payload, timeout in rpcs]
+        msg = dict(connection_string=connection_string, rpcs=batch)
+
+        total_timeout = sum(rpc[3] for rpc in rpcs)
+        responses = await self._send_command(OPERATIONS.SEND_RPC_BATCH, msg, COMMANDS.SendRPCBatchResponseBinary,
+                                             timeout=total_timeout)
+
+        if len(responses) != len(rpcs):
+            raise DeviceAdapterError(conn_id, 'send_rpc_batch', 'server returned %d responses for %d RPCs'
+                                     % (len(responses), len(rpcs)))
+
+        results = []
+        for (address, rpc_id, _payload, _timeout), response in zip(rpcs, responses):
+            try:
+                result = unpack_rpc_response(response.get('status'), response.get('payload'),
+                                             rpc_id=rpc_id, address=address)
+            except VALID_RPC_EXCEPTIONS as err:
+                result = err
+
+            results.append(result)
+
+        return results
+
+    async def _try_rpc(self, conn_id, address, rpc_id, payload, timeout):
+        try:
+            return await self.send_rpc(conn_id, address, rpc_id, payload, timeout)
+        except VALID_RPC_EXCEPTIONS as err:
+            return err
+
     async def send_script(self, conn_id, data):
         """Send a a script to this IOTile device
 
@@ -158,9 +239,64 @@ class SocketDeviceAdapter(StandardDeviceAdapter):
         self._ensure_connection(conn_id, True)
         connection_string = self._get_property(conn_id, "connection_string")
 
-        msg = dict(connection_string=connection_string, fragment_count=1, fragment_index=0,
-                   script=base64.b64encode(data))
-        await self._send_command(OPERATIONS.SEND_SCRIPT, msg, COMMANDS.SendScriptResponse)
+        version = self.client.protocol_version
+        fragment_size = self.get_config('script_fragment_size')
+
+        # Servers that predate the binary protocol do not support fragmented scripts
+        if version < BINARY_PROTOCOL or len(data) <= fragment_size:
+            msg = dict(connection_string=connection_string, fragment_count=1, fragment_index=0,
+                       script=encode_bytes(data, version))
+            await self._send_command(OPERATIONS.SEND_SCRIPT, msg, COMMANDS.SendScriptResponse)
+            return
+
+        await self._send_script_fragments(connection_string, data, fragment_size)
+
+    async def _send_script_fragments(self, connection_string, data, fragment_size):
+        """Send a script as a pipelined series of fragments.
+
+        The server acknowledges each fragment once it has been copied into
+        its reassembly buffer, so a window of fragments is kept in flight to
+        overlap sending with the server's processing.  The final fragment is
+        only acknowledged after the entire script has been sent to the
+        device.
+        """
+
+        view = memoryview(data)
+        total_size = len(view)
+        fragment_count = (total_size + fragment_size - 1) // fragment_size
+        upload_id = next(self._script_upload_ids)
+        window = asyncio.Semaphore(self.get_config('script_max_inflight'))
+        failures = []
+
+        async def _send_fragment(index):
+            offset = index * fragment_size
+            msg = dict(connection_string=connection_string, fragment_count=fragment_count, fragment_index=index,
+                       fragment_offset=offset, total_size=total_size, upload_id=upload_id,
+                       script=encode_bytes(view[offset:offset + fragment_size], BINARY_PROTOCOL))
+
+            try:
+                await self._send_command(OPERATIONS.SEND_SCRIPT, msg, COMMANDS.SendScriptResponse)
+            except Exception as err:  #pylint:disable=broad-except;The error is reraised by the sending loop
+                failures.append(err)
+            finally:
+                window.release()
+
+        fragments = []
+        try:
+            for index in range(0, fragment_count):
+                await window.acquire()
+                if failures:
+                    break
+
+                fragments.append(asyncio.ensure_future(_send_fragment(index)))
+
+            await asyncio.gather(*fragments)
+        finally:
+            for fragment in fragments:
+                fragment.cancel()
+
+        if failures:
+            raise failures[0]
 
     async def _on_device_found(self, device):
         """Callback function called when a new device has been scanned by the probe.
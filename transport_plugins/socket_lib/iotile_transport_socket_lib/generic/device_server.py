@@ -1,20 +1,70 @@
 """Generic implementation of serving access to a device over websockets."""
 
 import logging
-import base64
 from iotile.core.utilities import SharedLoop
 from iotile.core.hw.transport.server import StandardDeviceServer
 from iotile.core.hw.exceptions import VALID_RPC_EXCEPTIONS, DeviceServerError, DeviceAdapterError
+from iotile.core.exceptions import ArgumentError
 from iotile.core.hw.virtual import pack_rpc_response
 from iotile_transport_socket_lib.protocol import COMMANDS, OPERATIONS
 from . import ServerCommandError
 from .socket_server import AsyncSocketServer
+from .packing import encode_bytes, SUPPORTED_PROTOCOL
+from .event_queue import OutboundEventQueue
 
 _MISSING = object()
 
+
+class _ScriptUpload:
+    """A fragmented script that is being reassembled."""
+
+    def __init__(self, upload_id, total_size, fragment_count):
+        self.upload_id = upload_id
+        self.finished = False
+        self.script = bytearray(total_size)
+        self.fragment_count = fragment_count
+        self.received = bytearray(fragment_count)
+        self.received_count = 0
+        self.received_bytes = 0
+
+    def finish(self):
+        """Release the reassembly buffer and reject any later fragments."""
+
+        self.finished = True
+        self.script = None
+        self.received = None
+
+
 class SocketDeviceServer(StandardDeviceServer):
     """A device server for connections to multiple devices over any socket implementation
 
+    Clients may send large scripts as a series of fragments.  Each fragment
+    is copied into a buffer preallocated for the whole script and a
+    ``progress`` event is sent to the client as fragments arrive.  The
+    script is sent to the device once all fragments have been received.
+    Every fragment carries the id of the upload it belongs to.  A fragment
+    with a newer id than the current upload for a device replaces it, and
+    fragments of an older, failed or finished upload are rejected.
+    The largest script that will be accepted can be set with the
+    ``max_script_size`` argument, which defaults to 16 MB.
+
+    Clients may negotiate any wire protocol version up to the
+    ``protocol_version`` argument, which defaults to the newest version this
+    library supports.
+
+    Events are encoded once and the encoded message is shared by every
+    client with the same protocol version.  Each client has its own bounded
+    queue of events waiting to be sent by its own task, so a slow client does
+    not delay events for other clients.  Reports, traces and other events
+    that must be delivered are always queued.  Once a client has
+    ``client_queue_size`` events waiting, which defaults to 256, its
+    ``device_seen`` and ``broadcast`` events are dropped.  With the default
+    ``client_queue_policy`` of ``coalesce``, a queued ``device_seen`` or
+    ``broadcast`` event is replaced by a newer one for the same device
+    rather than both being sent.  Set it to ``drop`` to send every event
+    that fits in the queue.  Queue depths and drop counts are returned by
+    :meth:`client_queue_stats`.
+
     Args:
         adapter (AbstractDeviceAdapter): The device adapter that we should use to find devices.
         implementation (AbstractSocketServer): The implementation of the socket Server
@@ -26,9 +76,20 @@ class SocketDeviceServer(StandardDeviceServer):
     def __init__(self, adapter, implementation, args=None, *, loop=SharedLoop):
         StandardDeviceServer.__init__(self, adapter, args, loop=loop)
 
-        self.server = AsyncSocketServer(implementation, loop=loop)
+        protocol_version = (args or {}).get('protocol_version', SUPPORTED_PROTOCOL)
+        self.server = AsyncSocketServer(implementation, loop=loop, protocol_version=protocol_version)
 
         self.chunk_size = 4*1024  # Config chunk size to be 4kb for traces and reports streaming
+        self.max_script_size = (args or {}).get('max_script_size', 16*1024*1024)
+        self.client_queue_size = (args or {}).get('client_queue_size', 256)
+        self.client_queue_policy = (args or {}).get('client_queue_policy', 'coalesce')
+        self._script_uploads = {}
+        self._client_queues = {}
+        self._encoded_event = (None, None, None, {})
+
+        if self.client_queue_policy not in OutboundEventQueue.POLICIES:
+            raise ArgumentError("Unknown client_queue_policy: %s" % self.client_queue_policy,
+                                known_policies=sorted(OutboundEventQueue.POLICIES))
         self._logger = logging.getLogger(__name__)
 
         self.server.register_command(OPERATIONS.CONNECT, self.connect_message, COMMANDS.ConnectCommand)
@@ -38,8 +99,12 @@ class SocketDeviceServer(StandardDeviceServer):
                                      COMMANDS.OpenInterfaceCommand)
         self.server.register_command(OPERATIONS.CLOSE_INTERFACE, self.close_interface_message,
                                      COMMANDS.CloseInterfaceCommand)
-        self.server.register_command(OPERATIONS.SEND_RPC, self.send_rpc_message, COMMANDS.SendRPCCommand)
-        self.server.register_command(OPERATIONS.SEND_SCRIPT, self.send_script_message, COMMANDS.SendScriptCommand)
+        self.server.register_command(OPERATIONS.SEND_RPC, self.send_rpc_message, COMMANDS.SendRPCCommand,
+                                     COMMANDS.SendRPCCommandBinary)
+        self.server.register_command(OPERATIONS.SEND_RPC_BATCH, self.send_rpc_batch_message,
+                                     COMMANDS.SendRPCBatchCommand, COMMANDS.SendRPCBatchCommandBinary)
+        self.server.register_command(OPERATIONS.SEND_SCRIPT, self.send_script_message, COMMANDS.SendScriptCommand,
+                                     COMMANDS.SendScriptCommandBinary)
         self.server.register_command(OPERATIONS.DEBUG, self.debug_command_message, COMMANDS.SendDebugCommand)
 
         # Setup our hooks whenever a client connects or disconnects
@@ -47,7 +112,13 @@ class SocketDeviceServer(StandardDeviceServer):
         self.server.teardown_conn = self.teardown_conn
 
     async def prepare_conn(self, conn):
+        queue = OutboundEventQueue(self.client_queue_size, self.client_queue_policy)
+        self._client_queues[conn] = queue
+
         client_id = self.setup_client(user_data=conn, broadcast=True)
+        queue.client_id = client_id
+        queue.sender = self._loop.add_task(self._send_client_events(conn, queue),
+                                           name="client %s event sender" % client_id)
 
         self._logger.info("New client connection: %s", client_id)
         return client_id
@@ -56,8 +127,20 @@ class SocketDeviceServer(StandardDeviceServer):
         client_id = context.user_data
 
         self._logger.info("Tearing down client connection: %s", client_id)
+
+        # Stop monitoring the adapter before closing the queue so that no new
+        # events are queued.
+        queue = self._client_queues.pop(context.connection, None)
+
+        for key in [x for x in self._script_uploads if x[0] == client_id]:
+            del self._script_uploads[key]
+
         await self.teardown_client(client_id)
 
+        if queue is not None:
+            queue.close()
+            await queue.sender.stop()
+
     async def start(self):
         """Start serving access to devices.
 
@@ -98,6 +181,39 @@ class SocketDeviceServer(StandardDeviceServer):
         # Cleanup any resources we had on the adapter
         await super(SocketDeviceServer, self).stop()
 
+    def client_queue_stats(self):
+        """Get statistics about each client's queue of outgoing events.
+
+        Returns:
+            dict: A dict mapping each client id to a dict with the current and
+            maximum depth of its queue and the number of events that were
+            sent, dropped and coalesced.
+        """
+
+        return {queue.client_id: queue.stats() for queue in self._client_queues.values()}
+
+    async def _send_client_events(self, conn, queue):
+        """Send queued events to a client until its connection is torn down."""
+
+        while True:
+            encoded = await queue.get()
+
+            try:
+                await self.server.send_encoded(conn, encoded)
+            finally:
+                queue.task_done()
+
+    async def _flush_client_events(self, conn):
+        """Wait until all events queued for a client have been sent.
+
+        This is used before responding to commands that generate events, like
+        progress events, so that they arrive before the command's response.
+        """
+
+        queue = self._client_queues.get(conn)
+        if queue is not None:
+            await queue.join()
+
     async def probe_message(self, _message, context):
         """Handle a probe message.
 
@@ -159,12 +275,38 @@ class SocketDeviceServer(StandardDeviceServer):
         """
 
         conn_string = message.get('connection_string')
-        rpc_id = message.get('rpc_id')
-        address = message.get('address')
-        timeout = message.get('timeout')
-        payload = message.get('payload')
         client_id = context.user_data
 
+        return await self._call_rpc(client_id, conn_string, message, context.protocol_version)
+
+    async def send_rpc_batch_message(self, message, context):
+        """Handle a send_rpc_batch message.
+
+        The RPCs are sent to the device one at a time in the order they were
+        given and a list with the status and payload of each is returned.
+        RPCs that fail with an RPC level error, like a missing RPC, have that
+        error packed into their status and the rest of the batch continues.
+        Any other error stops the batch and fails the entire command.
+        """
+
+        conn_string = message.get('connection_string')
+        client_id = context.user_data
+
+        results = []
+        for rpc in message.get('rpcs'):
+            result = await self._call_rpc(client_id, conn_string, rpc, context.protocol_version)
+            results.append(result)
+
+        return results
+
+    async def _call_rpc(self, client_id, conn_string, rpc, version):
+        """Send a single RPC and pack its response for the client."""
+
+        rpc_id = rpc.get('rpc_id')
+        address = rpc.get('address')
+        timeout = rpc.get('timeout')
+        payload = rpc.get('payload')
+
         self._logger.debug("Calling RPC %d:0x%04X with payload %s on %s",
                            address, rpc_id, payload, conn_string)
 
@@ -183,7 +325,7 @@ class SocketDeviceServer(StandardDeviceServer):
         status, response = pack_rpc_response(response, err)
         return {
             'status': status,
-            'payload': base64.b64encode(response)
+            'payload': encode_bytes(response, version)
         }
 
     async def send_script_message(self, message, context):
@@ -196,10 +338,95 @@ class SocketDeviceServer(StandardDeviceServer):
         conn_string = message.get('connection_string')
         client_id = context.user_data
 
-        if message.get('fragment_count') != 1:
-            raise DeviceServerError(client_id, conn_string, 'send_script', 'fragmented scripts are not yet supported')
+        if message.get('fragment_count') == 1:
+            await self.send_script(client_id, conn_string, script)
+            await self._flush_client_events(context.connection)
+            return
+
+        key = (client_id, conn_string)
+        upload = self._receive_script_fragment(key, message)
+
+        if upload.received_count < upload.fragment_count:
+            progress = dict(operation='script', finished=upload.received_bytes, total=len(upload.script))
+            await self.client_event_handler(client_id, (conn_string, 'progress', progress), context.connection)
+            return
 
+        script = upload.script
+        upload.finish()
         await self.send_script(client_id, conn_string, script)
+        await self._flush_client_events(context.connection)
+
+    def _receive_script_fragment(self, key, message):
+        """Copy a script fragment into its preallocated reassembly buffer.
+
+        If the fragment is invalid, its upload is finished so that the rest
+        of its fragments, which may already be in flight, are rejected too.
+        """
+
+        client_id, conn_string = key
+        script = message.get('script')
+        fragment_count = message.get('fragment_count')
+        fragment_index = message.get('fragment_index')
+        offset = message.get('fragment_offset')
+        total_size = message.get('total_size')
+        upload_id = message.get('upload_id')
+
+        if offset is None or total_size is None or upload_id is None:
+            raise DeviceServerError(client_id, conn_string, 'send_script',
+                                    'fragmented scripts must include fragment_offset, total_size and upload_id')
+
+        upload = self._script_uploads.get(key)
+        if upload is not None and upload_id < upload.upload_id:
+            raise DeviceServerError(client_id, conn_string, 'send_script',
+                                    'fragment of upload %d was replaced by upload %d' % (upload_id, upload.upload_id))
+
+        if upload is None or upload_id > upload.upload_id:
+            # Any older upload was abandoned by the client, so it is discarded
+            buffer_size = total_size if total_size <= self.max_script_size else 0
+            upload = _ScriptUpload(upload_id, buffer_size, fragment_count)
+            self._script_uploads[key] = upload
+
+        try:
+            self._check_script_fragment(key, upload, message)
+        except DeviceServerError:
+            upload.finish()
+            raise
+
+        upload.script[offset:offset + len(script)] = script
+        upload.received[fragment_index] = 1
+        upload.received_count += 1
+        upload.received_bytes += len(script)
+
+        return upload
+
+    def _check_script_fragment(self, key, upload, message):
+        client_id, conn_string = key
+        script = message.get('script')
+        fragment_count = message.get('fragment_count')
+        fragment_index = message.get('fragment_index')
+        offset = message.get('fragment_offset')
+        total_size = message.get('total_size')
+
+        if upload.finished:
+            raise DeviceServerError(client_id, conn_string, 'send_script',
+                                    'upload %d already failed or finished' % upload.upload_id)
+
+        if total_size > self.max_script_size:
+            raise DeviceServerError(client_id, conn_string, 'send_script',
+                                    'script of %d bytes is larger than the maximum of %d bytes'
+                                    % (total_size, self.max_script_size))
+
+        if len(upload.script) != total_size or upload.fragment_count != fragment_count:
+            raise DeviceServerError(client_id, conn_string, 'send_script',
+                                    'fragment does not match the script being received')
+
+        if fragment_index < 0 or fragment_index >= fragment_count or upload.received[fragment_index]:
+            raise DeviceServerError(client_id, conn_string, 'send_script',
+                                    'invalid or duplicate fragment index %d' % fragment_index)
+
+        if offset < 0 or offset + len(script) > total_size:
+            raise DeviceServerError(client_id, conn_string, 'send_script',
+                                    'fragment at offset %d does not fit in the script' % offset)
 
     async def debug_command_message(self, message, context):
         """Handle a debug message.
@@ -213,6 +440,7 @@ class SocketDeviceServer(StandardDeviceServer):
         client_id = context.user_data
 
         result = await self.debug(client_id, conn_string, command, args)
+        await self._flush_client_events(context.connection)
         return result
 
     async def client_event_handler(self, client_id, event_tuple, user_data):
@@ -233,13 +461,46 @@ class SocketDeviceServer(StandardDeviceServer):
 
         conn_string, event_name, event = event_tuple
 
+        queue = self._client_queues.get(user_data)
+        if queue is None:
+            self._logger.debug("Could not send notification because connection was closed for client %s", client_id)
+            return
+
+        encoded = self._encode_client_event(conn_string, event_name, event, self.server.protocol_version(user_data))
+        if encoded is None:
+            self._logger.debug("Not forwarding unknown event over websockets: %s", event_tuple)
+            return
+
+        if event_name in ('device_seen', 'broadcast'):
+            if not queue.put_lossy((event_name, conn_string), encoded):
+                self._logger.debug("Dropped %s event for client %s because its queue is full", event_name, client_id)
+        else:
+            queue.put(encoded)
+
+    def _encode_client_event(self, conn_string, event_name, event, version):
+        """Encode an event for a client, reusing the encoding for other clients.
+
+        Every client monitoring a device is notified of the same event object
+        one after another, so the most recent event is cached along with its
+        encoding for each protocol version.
+        """
+
+        last_event, last_name, last_conn_string, encodings = self._encoded_event
+        if last_event is not event or last_name != event_name or last_conn_string != conn_string:
+            encodings = {}
+            self._encoded_event = (event, event_name, conn_string, encodings)
+
+        encoded = encodings.get(version)
+        if encoded is not None:
+            return encoded
+
         if event_name == 'report':
             report = event.serialize()
-            report['encoded_report'] = base64.b64encode(report['encoded_report'])
+            report['encoded_report'] = encode_bytes(report['encoded_report'], version)
             msg_payload = dict(connection_string=conn_string, serialized_report=report)
             msg_name = OPERATIONS.NOTIFY_REPORT
         elif event_name == 'trace':
-            encoded_payload = base64.b64encode(event)
+            encoded_payload = encode_bytes(event, version)
             msg_payload = dict(connection_string=conn_string, payload=encoded_payload)
             msg_name = OPERATIONS.NOTIFY_TRACE
         elif event_name == 'progress':
@@ -251,15 +512,13 @@ class SocketDeviceServer(StandardDeviceServer):
             msg_name = OPERATIONS.NOTIFY_DEVICE_FOUND
         elif event_name == 'broadcast':
             report = event.serialize()
-            report['encoded_report'] = base64.b64encode(report['encoded_report'])
+            report['encoded_report'] = encode_bytes(report['encoded_report'], version)
             msg_payload = dict(connection_string=conn_string, serialized_report=report)
             msg_name = OPERATIONS.NOTIFY_BROADCAST
         else:
-            self._logger.debug("Not forwarding unknown event over websockets: %s", event_tuple)
-            return
+            return None
 
-        try:
-            self._logger.debug("Sending event %s: %s", msg_name, msg_payload)
-            await self.server.send_event(user_data, msg_name, msg_payload)
-        except ConnectionError:
-            self._logger.debug("Could not send notification because connection was closed for client %s", client_id)
\ No newline at end of file
+        self._logger.debug("Encoding event %s: %s", msg_name, msg_payload)
+        encoded = self.server.encode_event(msg_name, msg_payload, version)
+        encodings[version] = encoded
+        return encoded
@@ -0,0 +1,158 @@
+"""A queue of encoded events waiting to be sent to one client."""
+
+import asyncio
+
+
+class OutboundEventQueue:
+    """A queue of encoded events for a single client connection.
+
+    Events are split into two kinds.  Lossy events, like ``device_seen`` and
+    ``broadcast``, are only interesting until a newer one for the same device
+    arrives.  They are dropped once ``max_size`` events are queued and, with
+    the ``coalesce`` policy, a lossy event replaces any event with the same
+    key that is still waiting to be sent.  All other events, like reports and
+    traces, are reliable and are always queued, however many events are
+    waiting, until the queue is closed.  Nothing ever waits for space, so a
+    client that cannot keep up never delays whoever is producing events.
+
+    The task sending events must call task_done() after each event returned
+    by get() has been sent so that join() can wait for the queue to drain.
+    Once the client disconnects, close() must be called so that queued events
+    are discarded and later events are dropped.
+
+    Args:
+        max_size (int): The number of queued events beyond which lossy
+            events are dropped.
+        policy (str): Either ``coalesce`` or ``drop``, which controls what
+            happens to lossy events that are already queued.
+    """
+
+    POLICIES = frozenset(['coalesce', 'drop'])
+
+    def __init__(self, max_size, policy):
+        self.coalesce = policy == 'coalesce'
+        self.client_id = None
+        self.sender = None
+
+        self.max_size = max_size
+
+        self._queue = asyncio.Queue()
+        self._pending = {}
+        self._closed = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        """Get the current depth of the queue and what has happened to events.
+
+        Returns:
+            dict: The current and maximum depth of the queue and the number of
+            events that were sent, dropped and coalesced.
+        """
+
+        return dict(depth=self._queue.qsize(), max_depth=self.max_depth, sent=self.sent,
+                    dropped=self.dropped, coalesced=self.coalesced)
+
+    def put_lossy(self, key, encoded):
+        """Queue an event that may be dropped or replaced by a newer one.
+
+        Args:
+            key (object): A hashable key identifying events that supersede
+                each other, such as the event name and device.
+            encoded (bytes): The encoded event.
+
+        Returns:
+            bool: True if the event was queued or coalesced, False if it was
+            dropped.
+        """
+
+        if self._closed:
+            self.dropped += 1
+            return False
+
+        if self.coalesce:
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry[1] = encoded
+                self.coalesced += 1
+                return True
+
+        if self._queue.qsize() >= self.max_size:
+            self.dropped += 1
+            return False
+
+        entry = [key, encoded]
+        if self.coalesce:
+            self._pending[key] = entry
+
+        self._queue.put_nowait(entry)
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    def put(self, encoded):
+        """Queue an event that must be delivered.
+
+        The event is queued even if ``max_size`` events are already waiting.
+        It is only dropped if the queue is closed because the client
+        disconnected.
+
+        Args:
+            encoded (bytes): The encoded event.
+
+        Returns:
+            bool: True if the event was queued, False if it was dropped
+            because the queue was closed.
+        """
+
+        if self._closed:
+            self.dropped += 1
+            return False
+
+        self._queue.put_nowait([None, encoded])
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    async def get(self):
+        """Wait for and remove the next event to send.
+
+        Returns:
+            bytes: The encoded event.
+        """
+
+        entry = await self._queue.get()
+
+        key, encoded = entry
+        if key is not None and self._pending.get(key) is entry:
+            del self._pending[key]
+
+        return encoded
+
+    def task_done(self):
+        """Mark the last event returned by get() as sent."""
+
+        self.sent += 1
+        self._queue.task_done()
+
+    def close(self):
+        """Stop accepting events.
+
+        Events that are still queued are discarded.
+        """
+
+        self._closed = True
+        self._pending.clear()
+
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            self._queue.task_done()
+
+    async def join(self):
+        """Wait until every queued event has been sent."""
+
+        await self._queue.join()
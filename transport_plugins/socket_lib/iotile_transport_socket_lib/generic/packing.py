@@ -1,21 +1,72 @@
-"""Helper functions for packing/unpacking msgpack messages."""
+"""Helper functions for packing/unpacking msgpack messages.
 
+Two versions of the wire format are supported.  The legacy format (version
+1) base64 encodes all binary payloads and sends datetimes as dictionaries
+containing a formatted string.  The binary format (version 2) sends binary
+payloads as native msgpack bin objects and datetimes as a msgpack ext type.
+
+Clients and servers negotiate which version to use when a client connects.
+Unpacking always understands both datetime encodings, but whether binary
+payloads are base64 encoded depends on the negotiated version, so senders
+should use encode_bytes() and receivers should pick the matching
+verifier.
+"""
+
+import base64
 import datetime
+import struct
 import msgpack
 
+LEGACY_PROTOCOL = 1
+BINARY_PROTOCOL = 2
+SUPPORTED_PROTOCOL = BINARY_PROTOCOL
+
+_DATETIME_EXT_TYPE = 1
+_DATETIME_EXT = struct.Struct("<qL")
+_EPOCH = datetime.datetime(1970, 1, 1)
+
 
 def unpack(message):
     """Unpack a binary msgpacked message."""
 
-    return msgpack.unpackb(message, object_hook=_decode_datetime)
+    return msgpack.unpackb(message, object_hook=_decode_datetime, ext_hook=_decode_ext)
+
+
+def pack(message, version=LEGACY_PROTOCOL):
+    """Pack a message into a binary packed message with datetime handling.
 
+    Args:
+        message (object): The message to pack.
+        version (int): The negotiated protocol version, which determines
+            how datetimes are encoded.
 
-def pack(message):
-    """Pack a message into a binary packed message with datetime handling."""
+    Returns:
+        bytes: The packed message.
+    """
+
+    if version >= BINARY_PROTOCOL:
+        return msgpack.packb(message, default=_encode_datetime_ext)
 
     return msgpack.packb(message, default=_encode_datetime)
 
 
+def encode_bytes(data, version):
+    """Encode a binary payload for the negotiated protocol version.
+
+    Args:
+        data (bytes): The binary data to send.
+        version (int): The negotiated protocol version.
+
+    Returns:
+        bytes: The data, base64 encoded if the legacy protocol is in use.
+    """
+
+    if version >= BINARY_PROTOCOL:
+        return bytes(data)
+
+    return base64.b64encode(data)
+
+
 def _decode_datetime(obj):
     """Decode a msgpack'ed datetime."""
 
@@ -30,3 +81,27 @@ def _encode_datetime(obj):
     if isinstance(obj, datetime.datetime):
         obj = {'__datetime__': True, 'as_str': obj.strftime("%Y%m%dT%H:%M:%S.%f").encode()}
     return obj
+
+
+def _decode_ext(code, data):
+    """Decode a datetime sent as a msgpack ext type."""
+
+    if code == _DATETIME_EXT_TYPE:
+        seconds, microseconds = _DATETIME_EXT.unpack(data)
+        return _EPOCH + datetime.timedelta(seconds=seconds, microseconds=microseconds)
+
+    return msgpack.ExtType(code, data)
+
+
+def _encode_datetime_ext(obj):
+    """Encode a datetime as a msgpack ext type.
+
+    Like the legacy encoding, any timezone information is dropped.
+    """
+
+    if isinstance(obj, datetime.datetime):
+        delta = obj.replace(tzinfo=None) - _EPOCH
+        seconds = delta.days * 86400 + delta.seconds
+        return msgpack.ExtType(_DATETIME_EXT_TYPE, _DATETIME_EXT.pack(seconds, delta.microseconds))
+
+    raise TypeError("Cannot serialize %r" % (obj,))
@@ -1,13 +1,16 @@
 import logging
 import uuid
+import itertools
 import inspect
 import asyncio
 from iotile.core.exceptions import ExternalError, ValidationError
 from iotile.core.utilities.async_tools import OperationManager, SharedLoop
 from iotile.core.utilities.schema_verify import Verifier
-from iotile_transport_socket_lib.generic.packing import pack, unpack
+from iotile_transport_socket_lib.generic.packing import pack, unpack, LEGACY_PROTOCOL, BINARY_PROTOCOL, \
+    SUPPORTED_PROTOCOL
 from iotile_transport_socket_lib.protocol.messages import VALID_SERVER_MESSAGE
-from iotile_transport_socket_lib.protocol.operations import NOTIFY_SOCKET_DISCONNECT
+from iotile_transport_socket_lib.protocol.operations import NOTIFY_SOCKET_DISCONNECT, NEGOTIATE
+from iotile_transport_socket_lib.protocol.commands import NegotiateResponse
 
 class AsyncSocketClient:
     """An asynchronous socket client that validates messages received.
@@ -24,6 +27,11 @@ class AsyncSocketClient:
     Messages are packed using msgpack in a binary format and are decoded and
     validated automatically.
 
+    When the client connects, it negotiates the newest protocol version that
+    both it and the server support and stores it in ``protocol_version``.
+    Servers that predate negotiation reject the request, in which case the
+    client stays on the legacy protocol.
+
     Args:
         implementation (AbstractSocketClient): The implementation of the socket client
             that will be used for data transport
@@ -31,10 +39,17 @@ class AsyncSocketClient:
             run in, or None to use the default shared background loop.
         logger_name (str): Optional name for the logger we should use to
             log messages.
+        protocol_version (int): The highest protocol version the client
+            should ask for.  Defaults to the newest supported version.
     """
 
-    def __init__(self, implementation, loop=SharedLoop, logger_name=__name__):
+    NEGOTIATE_TIMEOUT = 5.0
+
+    def __init__(self, implementation, loop=SharedLoop, logger_name=__name__,
+                 protocol_version=SUPPORTED_PROTOCOL):
         self._implementation = implementation
+        self.max_protocol_version = min(protocol_version, SUPPORTED_PROTOCOL)
+        self.protocol_version = LEGACY_PROTOCOL
 
         self._connection_task = None
         self._logger = logging.getLogger(logger_name)
@@ -42,6 +57,7 @@ class AsyncSocketClient:
         self._event_validators = {}
         self._allowed_exceptions = {}
         self._manager = OperationManager(loop=loop)
+        self._command_ids = itertools.count(1)
 
         logger = logging.getLogger('SocketClient')
         logger.setLevel(logging.ERROR)
@@ -83,6 +99,28 @@ class AsyncSocketClient:
         await self._implementation.connect()
         self._connection_task = self._loop.add_task(self._manage_connection(), name=name)
 
+        if self.max_protocol_version > LEGACY_PROTOCOL:
+            await self._negotiate_protocol()
+
+    async def _negotiate_protocol(self):
+        """Agree on a protocol version with the server.
+
+        Older servers do not know the negotiation command and respond with an
+        error, so any failure leaves the client on the legacy protocol.
+        """
+
+        args = dict(max_version=self.max_protocol_version)
+
+        try:
+            response = await self.send_command(NEGOTIATE, args, NegotiateResponse,
+                                               timeout=self.NEGOTIATE_TIMEOUT)
+        except (ExternalError, ValidationError, asyncio.TimeoutError) as err:
+            self._logger.info("Server did not negotiate a protocol version, using legacy protocol: %s", err)
+            return
+
+        self.protocol_version = max(LEGACY_PROTOCOL, min(response['version'], self.max_protocol_version))
+        self._logger.debug("Negotiated protocol version %d", self.protocol_version)
+
     async def stop(self):
         """Stop this socket client and disconnect from the server.
 
@@ -97,6 +135,7 @@ class AsyncSocketClient:
             await self._connection_task.stop()
         finally:
             self._connection_task = None
+            self.protocol_version = LEGACY_PROTOCOL
             self._manager.clear()
 
     async def send_command(self, command, args, validator, timeout=10.0):
@@ -124,11 +163,16 @@ class AsyncSocketClient:
         if not self._implementation.connected:
             raise ExternalError("No websock connection established")
 
-        cmd_uuid = str(uuid.uuid4())
+        # Servers that negotiated the binary protocol accept cheaper integer ids
+        if self.protocol_version >= BINARY_PROTOCOL:
+            cmd_uuid = next(self._command_ids)
+        else:
+            cmd_uuid = str(uuid.uuid4())
+
         msg = dict(type='command', operation=command, uuid=cmd_uuid,
                    payload=args)
 
-        packed = pack(msg)
+        packed = pack(msg, self.protocol_version)
 
         # Note: register future before sending to avoid race conditions
         response_future = self._manager.wait_for(type="response", uuid=cmd_uuid,
@@ -185,7 +229,7 @@ class AsyncSocketClient:
             await self._manager.process_message(dict(type='event', name=NOTIFY_SOCKET_DISCONNECT, payload=None))
             await self._implementation.close()
 
-    def register_event(self, name, callback, validator):
+    def register_event(self, name, callback, validator, binary_validator=None):
         """Register a callback to receive events.
 
         Every event with the matching name will have its payload validated
@@ -196,6 +240,10 @@ class AsyncSocketClient:
         allowed.  If you need to run a coroutine you are free to schedule it
         from your callback.
 
+        If the event contains binary fields, their encoding depends on the
+        protocol version the server encoded it with.  In that case, pass the
+        validator to use with the binary protocol in ``binary_validator``.
+
         Args:
             name (str): The name of the event that we are listening
                 for
@@ -203,13 +251,24 @@ class AsyncSocketClient:
                 when a message that matches validator is received.
             validator (Verifier): A schema verifier that will
                 validate a received message uniquely
+            binary_validator (Verifier): Optional schema verifier used
+                instead of ``validator`` for events encoded with the binary
+                protocol.
         """
 
+        if binary_validator is None:
+            binary_validator = validator
+
         async def _validate_and_call(message):
             payload = message.get('payload')
 
+            # Events sent around the time the protocol was negotiated may use
+            # either version, so trust the version the event says it has
             try:
-                payload = validator.verify(payload)
+                if message.get('version', LEGACY_PROTOCOL) >= BINARY_PROTOCOL:
+                    payload = binary_validator.verify(payload)
+                else:
+                    payload = validator.verify(payload)
             except ValidationError:
                 self._logger.warning("Dropping invalid payload for event %s, payload=%s",
                                      name, payload)
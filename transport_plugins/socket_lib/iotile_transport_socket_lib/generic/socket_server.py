@@ -7,7 +7,9 @@ from iotile.core.exceptions import ValidationError
 
 from iotile.core.utilities.async_tools import SharedLoop
 from iotile_transport_socket_lib.protocol.messages import VALID_CLIENT_MESSAGE
-from .packing import pack, unpack
+from iotile_transport_socket_lib.protocol.operations import NEGOTIATE
+from iotile_transport_socket_lib.protocol.commands import NegotiateCommand
+from .packing import pack, unpack, LEGACY_PROTOCOL, SUPPORTED_PROTOCOL, BINARY_PROTOCOL
 from .errors import ServerCommandError
 
 
@@ -17,6 +19,7 @@ class _ConnectionContext:
         self.connection = con
         self.operations = set()
         self.user_data = None
+        self.protocol_version = LEGACY_PROTOCOL
 
 
 class AsyncSocketServer:
@@ -30,6 +33,14 @@ class AsyncSocketServer:
     The server can also, at any time, send an EVENT message to the client,
     which is able to register a callback for the event.
 
+    All connections start out using the legacy protocol version.  A client
+    can ask to use a newer version by sending a ``negotiate_protocol``
+    command, which is handled by the server itself, and all later messages
+    on that connection are then encoded with the agreed version.  Events may
+    already be on their way to the client when the version changes, so every
+    event encoded with a newer version than the legacy one says which
+    version it uses.
+
     This class is the server side implementation of AsyncSocketClient
     and is designed to be used with that class.
 
@@ -40,15 +51,19 @@ class AsyncSocketServer:
             port property after ``await start()`` finished without error.
         loop (BackgroundEventLoop): The background event loop we should
             run in.  Defaults to the shared global loop.
+        protocol_version (int): The highest protocol version this server
+            will agree to use.  Defaults to the newest supported version.
     """
 
     OPERATIONS_MAX_PRUNE = 10
 
-    def __init__(self, implementation, loop=SharedLoop):
+    def __init__(self, implementation, loop=SharedLoop, protocol_version=SUPPORTED_PROTOCOL):
         self.task = None
         self.implementation = implementation
+        self.max_protocol_version = min(protocol_version, SUPPORTED_PROTOCOL)
 
         self._commands = {}
+        self._contexts = {}
         self._server_task = None
         self._loop = loop
         self._logger = logging.getLogger(__name__)
@@ -57,6 +72,25 @@ class AsyncSocketServer:
         logger.setLevel(logging.ERROR)
         logger.addHandler(logging.NullHandler())
 
+        self.register_command(NEGOTIATE, self._negotiate_protocol, NegotiateCommand)
+
+    def protocol_version(self, con):
+        """Get the protocol version negotiated with a client connection.
+
+        Args:
+            con (a connection object): The client connection.
+
+        Returns:
+            int: The negotiated protocol version.  This is the legacy version
+            if the connection has not negotiated or is no longer open.
+        """
+
+        context = self._contexts.get(con)
+        if context is None:
+            return LEGACY_PROTOCOL
+
+        return context.protocol_version
+
     async def prepare_conn(self, _con):
         """Called when a new connection is established.
 
@@ -90,7 +124,7 @@ class AsyncSocketServer:
 
         pass
 
-    def register_command(self, name, handler, validator):
+    def register_command(self, name, handler, validator, binary_validator=None):
         """Register a coroutine command handler.
 
         This handler will be called whenever a command message is received
@@ -111,6 +145,10 @@ class AsyncSocketServer:
         verification fails, a failure response to the command is returned
         automatically to the client.
 
+        If the command contains binary fields, their encoding depends on the
+        protocol version negotiated by the client.  In that case, pass the
+        validator to use for binary protocol clients in ``binary_validator``.
+
         Args:
             name (str): The unique command name that will be used to dispatch
                 client command messages to this handler.
@@ -118,9 +156,15 @@ class AsyncSocketServer:
                 called whenever this command is received.
             validator (SchemaVerifier): A validator object for checking the
                 command payload before calling this handler.
+            binary_validator (SchemaVerifier): Optional validator used instead
+                of ``validator`` for clients that negotiated the binary
+                protocol.
         """
 
-        self._commands[name] = (handler, validator)
+        if binary_validator is None:
+            binary_validator = validator
+
+        self._commands[name] = (handler, validator, binary_validator)
 
     async def start(self):
         """Start the websocket server.
@@ -192,8 +236,39 @@ class AsyncSocketServer:
                 as the event's payload.
         """
 
-        message = dict(type="event", name=name, payload=payload)
-        encoded = pack(message)
+        encoded = self.encode_event(name, payload, self.protocol_version(con))
+        await self.send_encoded(con, encoded)
+
+    @classmethod
+    def encode_event(cls, name, payload, version):
+        """Encode an event message once so it can be sent to many clients.
+
+        Args:
+            name (str): The name of the event.
+            payload (object): The msgpack-serializable event payload.
+            version (int): The protocol version of the clients it will be
+                sent to.
+
+        Returns:
+            bytes: The encoded event message.
+        """
+
+        if version >= BINARY_PROTOCOL:
+            return pack(dict(type="event", name=name, payload=payload, version=version), version)
+
+        return pack(dict(type="event", name=name, payload=payload), version)
+
+    async def send_encoded(self, con, encoded):
+        """Send an already encoded message to a client connection.
+
+        Args:
+            con (a connection object): The connection to use to send
+                the message.
+            encoded (bytes): A message encoded with the protocol version
+                negotiated on this connection, such as one returned by
+                :meth:`encode_event`.
+        """
+
         try:
             await self.implementation.send(con, encoded)
         except Exception:
@@ -201,6 +276,7 @@ class AsyncSocketServer:
 
     async def _manage_connection(self, con, _path):
         context = _ConnectionContext(self, con)
+        self._contexts[con] = context
 
         try:
             try:
@@ -227,6 +303,7 @@ class AsyncSocketServer:
             self._logger.debug("Error sending data")
         finally:
             await _cancel_operations(context.operations)
+            self._contexts.pop(con, None)
 
             try:
                 await self.teardown_conn(context)
@@ -258,16 +335,17 @@ class AsyncSocketServer:
             response = _error_response(reason, cmd_uuid, exc=type(err).__name__)
 
         try:
-            encoded_resp = pack(response)
+            encoded_resp = pack(response, context.protocol_version)
         except:
             self._logger.exception("Unable to pack response message: %s", response)
             response = _error_response("Unable to pack response message", cmd_uuid)
-            encoded_resp = pack(response)
+            encoded_resp = pack(response, context.protocol_version)
 
         self._logger.debug("Sending response: %s", response)
 
         try:
             await self.implementation.send(con, encoded_resp)
+            self.implementation.flush(con)
         except ConnectionError:
             self._logger.debug("Response %s not sent because connection may be closed", response)
 
@@ -282,7 +360,9 @@ class AsyncSocketServer:
         if handler_info is None:
             raise ServerCommandError(name, 'Command %s not found' % name)
 
-        handler, validator = handler_info
+        handler, validator, binary_validator = handler_info
+        if context.protocol_version >= BINARY_PROTOCOL:
+            validator = binary_validator
 
         try:
             payload = validator.verify(payload)
@@ -292,6 +372,15 @@ class AsyncSocketServer:
         payload = await handler(payload, context)
         return dict(type="response", uuid=uuid, success=True, payload=payload)
 
+    async def _negotiate_protocol(self, message, context):
+        """Agree on the newest protocol version both sides support."""
+
+        version = max(LEGACY_PROTOCOL, min(message.get('max_version'), self.max_protocol_version))
+        context.protocol_version = version
+
+        self._logger.debug("Negotiated protocol version %d", version)
+        return {'version': version}
+
 
 def _error_response(reason, uuid, exc=None):
     return dict(type="response", uuid=uuid, success=False,
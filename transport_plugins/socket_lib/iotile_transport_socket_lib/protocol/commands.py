@@ -1,8 +1,20 @@
-"""List of known command and response payloads."""
+"""List of known command and response payloads.
+
+Commands with binary fields have a second verifier with a ``Binary`` suffix
+that is used when the binary protocol version has been negotiated and those
+fields are sent without base64 encoding.
+"""
 
 from iotile.core.utilities.schema_verify import BytesVerifier, DictionaryVerifier, \
     EnumVerifier, FloatVerifier, IntVerifier, StringVerifier, NoneVerifier, Verifier, \
-    OptionsVerifier
+    OptionsVerifier, ListVerifier
+
+# Negotiate the protocol version
+NegotiateCommand = DictionaryVerifier()
+NegotiateCommand.add_required('max_version', IntVerifier())
+
+NegotiateResponse = DictionaryVerifier()
+NegotiateResponse.add_required('version', IntVerifier())
 
 # Connect Command
 ConnectCommand = DictionaryVerifier()
@@ -50,12 +62,60 @@ SendRPCResponse = DictionaryVerifier()
 SendRPCResponse.add_required('status', IntVerifier())
 SendRPCResponse.add_required('payload', BytesVerifier(encoding="base64"))
 
+SendRPCCommandBinary = DictionaryVerifier()
+SendRPCCommandBinary.add_required('connection_string', StringVerifier())
+SendRPCCommandBinary.add_required('address', IntVerifier())
+SendRPCCommandBinary.add_required('rpc_id', IntVerifier())
+SendRPCCommandBinary.add_required('timeout', FloatVerifier())
+SendRPCCommandBinary.add_required('payload', BytesVerifier())
+
+SendRPCResponseBinary = DictionaryVerifier()
+SendRPCResponseBinary.add_required('status', IntVerifier())
+SendRPCResponseBinary.add_required('payload', BytesVerifier())
+
+# Send a batch of RPCs that are executed in order
+BatchedRPC = DictionaryVerifier()
+BatchedRPC.add_required('address', IntVerifier())
+BatchedRPC.add_required('rpc_id', IntVerifier())
+BatchedRPC.add_required('timeout', FloatVerifier())
+BatchedRPC.add_required('payload', BytesVerifier(encoding="base64"))
+
+SendRPCBatchCommand = DictionaryVerifier()
+SendRPCBatchCommand.add_required('connection_string', StringVerifier())
+SendRPCBatchCommand.add_required('rpcs', ListVerifier(BatchedRPC, min_length=1))
+
+SendRPCBatchResponse = ListVerifier(SendRPCResponse)
+
+BatchedRPCBinary = DictionaryVerifier()
+BatchedRPCBinary.add_required('address', IntVerifier())
+BatchedRPCBinary.add_required('rpc_id', IntVerifier())
+BatchedRPCBinary.add_required('timeout', FloatVerifier())
+BatchedRPCBinary.add_required('payload', BytesVerifier())
+
+SendRPCBatchCommandBinary = DictionaryVerifier()
+SendRPCBatchCommandBinary.add_required('connection_string', StringVerifier())
+SendRPCBatchCommandBinary.add_required('rpcs', ListVerifier(BatchedRPCBinary, min_length=1))
+
+SendRPCBatchResponseBinary = ListVerifier(SendRPCResponseBinary)
+
 # Send script
 SendScriptCommand = DictionaryVerifier()
 SendScriptCommand.add_required('connection_string', StringVerifier())
 SendScriptCommand.add_required('fragment_count', IntVerifier())
 SendScriptCommand.add_required('fragment_index', IntVerifier())
 SendScriptCommand.add_required('script', BytesVerifier(encoding="base64"))
+SendScriptCommand.add_optional('fragment_offset', IntVerifier())
+SendScriptCommand.add_optional('total_size', IntVerifier())
+SendScriptCommand.add_optional('upload_id', IntVerifier())
+
+SendScriptCommandBinary = DictionaryVerifier()
+SendScriptCommandBinary.add_required('connection_string', StringVerifier())
+SendScriptCommandBinary.add_required('fragment_count', IntVerifier())
+SendScriptCommandBinary.add_required('fragment_index', IntVerifier())
+SendScriptCommandBinary.add_required('script', BytesVerifier())
+SendScriptCommandBinary.add_optional('fragment_offset', IntVerifier())
+SendScriptCommandBinary.add_optional('total_size', IntVerifier())
+SendScriptCommandBinary.add_optional('upload_id', IntVerifier())
 
 SendScriptResponse = NoneVerifier()
 
@@ -1,25 +1,29 @@
 """The classes of messages supported by this socket impementation."""
 
-from iotile.core.utilities.schema_verify import Verifier, NoneVerifier, DictionaryVerifier, StringVerifier
+from iotile.core.utilities.schema_verify import Verifier, NoneVerifier, DictionaryVerifier, StringVerifier, IntVerifier
 from iotile.core.utilities.schema_verify import LiteralVerifier, OptionsVerifier
 
+# Commands are identified by a uuid string with the legacy protocol and by
+# an integer counter with the binary protocol
+COMMAND_ID = OptionsVerifier(StringVerifier(), IntVerifier())
+
 # The prescribed schema of command response messages
 # Messages with this format are automatically processed inside the Client
 COMMAND = DictionaryVerifier()
 COMMAND.add_required('type', LiteralVerifier('command'))
 COMMAND.add_required('operation', StringVerifier())
-COMMAND.add_required('uuid', StringVerifier())
+COMMAND.add_required('uuid', COMMAND_ID)
 COMMAND.add_optional('payload', Verifier())
 
 SUCCESSFUL_RESPONSE = DictionaryVerifier()
-SUCCESSFUL_RESPONSE.add_required('uuid', StringVerifier())
+SUCCESSFUL_RESPONSE.add_required('uuid', COMMAND_ID)
 SUCCESSFUL_RESPONSE.add_required('type', LiteralVerifier('response'))
 SUCCESSFUL_RESPONSE.add_required('success', LiteralVerifier(True))
 SUCCESSFUL_RESPONSE.add_optional('payload', Verifier())
 
 FAILURE_RESPONSE = DictionaryVerifier()
 FAILURE_RESPONSE.add_required('type', LiteralVerifier('response'))
-FAILURE_RESPONSE.add_required('uuid', StringVerifier())
+FAILURE_RESPONSE.add_required('uuid', COMMAND_ID)
 FAILURE_RESPONSE.add_required('success', LiteralVerifier(False))
 FAILURE_RESPONSE.add_required('reason', StringVerifier())
 FAILURE_RESPONSE.add_required('exception_class', OptionsVerifier(StringVerifier(), NoneVerifier()))
@@ -30,6 +34,9 @@ EVENT = DictionaryVerifier()
 EVENT.add_required('type', LiteralVerifier('event'))
 EVENT.add_required('name', StringVerifier())
 EVENT.add_optional('payload', Verifier())
+# Events encoded with a newer protocol version than the legacy one are tagged
+# with that version since they may cross a negotiation in flight
+EVENT.add_optional('version', IntVerifier())
 
 VALID_SERVER_MESSAGE = OptionsVerifier(RESPONSE, EVENT)
 VALID_CLIENT_MESSAGE = OptionsVerifier(COMMAND)
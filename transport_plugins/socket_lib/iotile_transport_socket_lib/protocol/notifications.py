@@ -18,6 +18,17 @@ ReportEvent = DictionaryVerifier()
 ReportEvent.add_required('connection_string', StringVerifier())
 ReportEvent.add_required('serialized_report', SerializedReport)
 
+# Report when the binary protocol version has been negotiated
+SerializedReportBinary = DictionaryVerifier()
+SerializedReportBinary.add_required('encoded_report', BytesVerifier())
+SerializedReportBinary.add_required('received_time', Verifier())
+SerializedReportBinary.add_required('report_format', IntVerifier())
+SerializedReportBinary.add_required('origin', IntVerifier())
+
+ReportEventBinary = DictionaryVerifier()
+ReportEventBinary.add_required('connection_string', StringVerifier())
+ReportEventBinary.add_required('serialized_report', SerializedReportBinary)
+
 
 DisconnectionEvent = DictionaryVerifier()
 DisconnectionEvent.add_required('connection_string', StringVerifier())
@@ -29,6 +40,10 @@ TraceEvent = DictionaryVerifier()
 TraceEvent.add_required('connection_string', StringVerifier())
 TraceEvent.add_required('payload', BytesVerifier(encoding="base64"))
 
+TraceEventBinary = DictionaryVerifier()
+TraceEventBinary.add_required('connection_string', StringVerifier())
+TraceEventBinary.add_required('payload', BytesVerifier())
+
 # Script and debug progress
 ProgressEvent = DictionaryVerifier()
 ProgressEvent.add_required('connection_string', StringVerifier())
@@ -9,9 +9,11 @@ SEND_RPC = 'send_rpc'
 SEND_SCRIPT = 'send_script'
 DEBUG = 'debug_command'
 DISCONNECT = 'disconnect'
+NEGOTIATE = 'negotiate_protocol'
+SEND_RPC_BATCH = 'send_rpc_batch'
 
 COMMANDS = frozenset([CONNECT, CLOSE_INTERFACE, OPEN_INTERFACE, PROBE, SEND_RPC,
-                      SEND_SCRIPT, DISCONNECT, DEBUG])
+                      SEND_SCRIPT, DISCONNECT, DEBUG, NEGOTIATE, SEND_RPC_BATCH])
 
 # Events
 NOTIFY_DEVICE_FOUND = 'device_found'
@@ -13,14 +13,19 @@ class TcpServerImplementation(AbstractSocketServerImplementation):
     Args:
         host (str): The host name to serve on, defaults to 127.0.0.1
         port (str): The port name to serve on, defaults to a random port if not specified.
-
         loop (iotile.core.utilities.BackgroundEventLoop): The background event loop we should
             run in.  Defaults to the shared global loop.
+        coalesce_size (int): Buffer outgoing messages until this many bytes are waiting.
+            Defaults to 0, which writes each message immediately.
+        coalesce_delay (float): The longest time in seconds to buffer outgoing messages
+            when coalesce_size is set.
     """
 
-    def __init__(self, host='127.0.0.1', port=0, loop=SharedLoop):
+    def __init__(self, host='127.0.0.1', port=0, loop=SharedLoop, coalesce_size=0, coalesce_delay=0.002):
         self.host = host
         self.port = port
+        self.coalesce_size = coalesce_size
+        self.coalesce_delay = coalesce_delay
         self._logger = logging.getLogger(__name__)
         self.loop = loop
         self._manage_connection_cb = None
@@ -61,7 +66,7 @@ class TcpServerImplementation(AbstractSocketServerImplementation):
             writer (asyncio.StreamWriter): The writer returned from the callback
         """
 
-        unix_conn = AsyncioSocketConnection(reader, writer, self._logger)
+        unix_conn = AsyncioSocketConnection(reader, writer, self._logger, self.coalesce_size, self.coalesce_delay)
         await self._manage_connection_cb(unix_conn, None)
 
     async def send(self, con, encoded):
@@ -82,6 +87,14 @@ class TcpServerImplementation(AbstractSocketServerImplementation):
         """
         return await con.recv()
 
+    def flush(self, con):
+        """Immediately write any messages buffered for the given connection
+
+        Args:
+            con (AsyncioSocketConnection): The connection to flush
+        """
+        con.flush()
+
 class TcpClientImplementation(AbstractSocketClientImplementation):
     """Unix flavor of a Socket Connection
 
@@ -90,11 +103,17 @@ class TcpClientImplementation(AbstractSocketClientImplementation):
         port (str): The port name to connect to
         loop (iotile.core.utilities.BackgroundEventLoop): The background event loop we should
             run in.  Defaults to the shared global loop.
+        coalesce_size (int): Buffer outgoing messages until this many bytes are waiting.
+            Defaults to 0, which writes each message immediately.
+        coalesce_delay (float): The longest time in seconds to buffer outgoing messages
+            when coalesce_size is set.
     """
 
-    def __init__(self, host, port, loop=SharedLoop):
+    def __init__(self, host, port, loop=SharedLoop, coalesce_size=0, coalesce_delay=0.002):
         self.host = host
         self.port = port
+        self.coalesce_size = coalesce_size
+        self.coalesce_delay = coalesce_delay
         self._logger = logging.getLogger(__name__)
         self.loop = loop
         self.is_connected = False
@@ -103,12 +122,12 @@ class TcpClientImplementation(AbstractSocketClientImplementation):
     async def connect(self):
         """Open the connection"""
         reader, writer = await asyncio.open_connection(host=self.host, port=self.port, loop=self.loop.get_loop())
-        self.con = AsyncioSocketConnection(reader, writer, self._logger)
+        self.con = AsyncioSocketConnection(reader, writer, self._logger, self.coalesce_size, self.coalesce_delay)
         self._logger.debug("Connected to %s:%s", self.host, self.port)
 
     async def close(self):
         """Close the connection"""
-        await self.con.writer.close()
+        await self.con.close()
         self.con = None
 
     def connected(self):
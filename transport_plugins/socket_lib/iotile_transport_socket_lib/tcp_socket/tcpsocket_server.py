@@ -18,6 +18,10 @@ class TcpSocketDeviceServer(SocketDeviceServer):
     - ``port``: The port name to serve on, defaults to a random port if not specified.
       If a random port is used, its value can be read on the ``port`` property after
       start() has completed.
+    - ``coalesce_size``: Buffer messages sent to each client until this many bytes are waiting
+      and then write them together.  Defaults to 0, which writes each message immediately.
+    - ``coalesce_delay``: The longest time in seconds that a message may be buffered when
+      ``coalesce_size`` is set, defaults to 0.002.
 
     Args:
         adapter (AbstractDeviceAdapter): The device adapter that we should use
@@ -30,6 +34,8 @@ class TcpSocketDeviceServer(SocketDeviceServer):
     def __init__(self, adapter, args=None, *, loop=SharedLoop):
         host = args.get('host', '127.0.0.1')
         port_suggestion = args.get('port', 0)
-        self.implementation = TcpServerImplementation(host, port_suggestion, loop)
+        coalesce_size = args.get('coalesce_size', 0)
+        coalesce_delay = args.get('coalesce_delay', 0.002)
+        self.implementation = TcpServerImplementation(host, port_suggestion, loop, coalesce_size, coalesce_delay)
         SocketDeviceServer.__init__(self, adapter, self.implementation, args, loop=loop)
         self.port = None
@@ -15,10 +15,16 @@ class UnixServerImplementation(AbstractSocketServerImplementation):
             to will be created by the asyncio.start_unix_server() call
         loop (iotile.core.utilities.BackgroundEventLoop): The background event loop we should
             run in.  Defaults to the shared global loop.
+        coalesce_size (int): Buffer outgoing messages until this many bytes are waiting.
+            Defaults to 0, which writes each message immediately.
+        coalesce_delay (float): The longest time in seconds to buffer outgoing messages
+            when coalesce_size is set.
     """
 
-    def __init__(self, path, loop=SharedLoop):
+    def __init__(self, path, loop=SharedLoop, coalesce_size=0, coalesce_delay=0.002):
         self.path = path
+        self.coalesce_size = coalesce_size
+        self.coalesce_delay = coalesce_delay
         self._logger = logging.getLogger(__name__)
         self.loop = loop
         self._manage_connection_cb = None
@@ -56,7 +62,7 @@ class UnixServerImplementation(AbstractSocketServerImplementation):
             writer (asyncio.StreamWriter): The writer returned from the callback
         """
 
-        unix_conn = AsyncioSocketConnection(reader, writer, self._logger)
+        unix_conn = AsyncioSocketConnection(reader, writer, self._logger, self.coalesce_size, self.coalesce_delay)
         await self._manage_connection_cb(unix_conn, None)
 
     async def send(self, con, encoded):
@@ -77,6 +83,14 @@ class UnixServerImplementation(AbstractSocketServerImplementation):
         """
         return await con.recv()
 
+    def flush(self, con):
+        """Immediately write any messages buffered for the given connection
+
+        Args:
+            con (AsyncioSocketConnection): The connection to flush
+        """
+        con.flush()
+
 class UnixClientImplementation(AbstractSocketClientImplementation):
     """Unix flavor of a Socket Connection
 
@@ -84,10 +98,16 @@ class UnixClientImplementation(AbstractSocketClientImplementation):
         path (str): Path to the unix socket opened by the Server
         loop (iotile.core.utilities.BackgroundEventLoop): The background event loop we should
             run in.  Defaults to the shared global loop.
+        coalesce_size (int): Buffer outgoing messages until this many bytes are waiting.
+            Defaults to 0, which writes each message immediately.
+        coalesce_delay (float): The longest time in seconds to buffer outgoing messages
+            when coalesce_size is set.
     """
 
-    def __init__(self, path, loop=SharedLoop):
+    def __init__(self, path, loop=SharedLoop, coalesce_size=0, coalesce_delay=0.002):
         self.path = path
+        self.coalesce_size = coalesce_size
+        self.coalesce_delay = coalesce_delay
         self._logger = logging.getLogger(__name__)
         self.loop = loop
         self.is_connected = False
@@ -96,12 +116,12 @@ class UnixClientImplementation(AbstractSocketClientImplementation):
     async def connect(self):
         """Open the connection"""
         reader, writer = await asyncio.open_unix_connection(self.path, loop=self.loop.get_loop())
-        self.con = AsyncioSocketConnection(reader, writer, self._logger)
+        self.con = AsyncioSocketConnection(reader, writer, self._logger, self.coalesce_size, self.coalesce_delay)
         self._logger.debug("Connected to %s", self.path)
 
     async def close(self):
         """Close the connection"""
-        await self.con.writer.close()
+        await self.con.close()
         self.con = None
 
     def connected(self):
@@ -12,6 +12,10 @@ class UnixSocketDeviceServer(SocketDeviceServer):
 
     - ``path``: The path to the Unix Socket that will be opened. The file descriptor that it points
         to will be created by the UnixServerImplementation's asyncio.start_unix_server() call
+    - ``coalesce_size``: Buffer messages sent to each client until this many bytes are waiting
+      and then write them together.  Defaults to 0, which writes each message immediately.
+    - ``coalesce_delay``: The longest time in seconds that a message may be buffered when
+      ``coalesce_size`` is set, defaults to 0.002.
 
     Args:
         adapter (AbstractDeviceAdapter): The device adapter that we should use
@@ -23,5 +27,7 @@ class UnixSocketDeviceServer(SocketDeviceServer):
 
     def __init__(self, adapter, args=None, *, loop=SharedLoop):
         path = args.get('path', None)
-        self.implementation = UnixServerImplementation(path, loop)
+        coalesce_size = args.get('coalesce_size', 0)
+        coalesce_delay = args.get('coalesce_delay', 0.002)
+        self.implementation = UnixServerImplementation(path, loop, coalesce_size, coalesce_delay)
         SocketDeviceServer.__init__(self, adapter, self.implementation, args, loop=loop)
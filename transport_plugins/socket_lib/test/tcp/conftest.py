@@ -60,10 +60,13 @@ def hw(server):
 
 
 @pytest.fixture(scope="function")
-def device_adapter(server, loop):
+def device_adapter(request, server, loop):
     port, _ = server
 
     adapter = TcpSocketDeviceAdapter(port="127.0.0.1:{}".format(port), loop=loop)
+    for name, value in getattr(request, 'param', {}).items():
+        adapter.set_config(name, value)
+
     wrapper = SynchronousLegacyWrapper(adapter, loop=loop)
     yield wrapper
 
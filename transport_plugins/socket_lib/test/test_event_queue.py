@@ -0,0 +1,160 @@
+"""Tests of the per client outbound event queue."""
+
+import asyncio
+import pytest
+from iotile.core.utilities import BackgroundEventLoop
+from iotile.core.hw.transport import VirtualDeviceAdapter
+from iotile.core.hw.reports import IndividualReadingReport, IOTileReading
+from iotile_transport_socket_lib.generic.event_queue import OutboundEventQueue
+from iotile_transport_socket_lib.generic.device_server import SocketDeviceServer
+
+
+@pytest.fixture(scope="function")
+def loop():
+    event_loop = BackgroundEventLoop()
+    event_loop.start()
+
+    yield event_loop
+
+    event_loop.stop()
+
+
+def test_coalesce_policy(loop):
+    """Make sure lossy events are coalesced by key and dropped when full."""
+
+    async def _run():
+        queue = OutboundEventQueue(3, 'coalesce')
+
+        assert queue.put_lossy(('device_seen', '1'), b'a1')
+        assert queue.put_lossy(('device_seen', '2'), b'b1')
+        assert queue.put_lossy(('device_seen', '1'), b'a2')
+        assert queue.put(b'report')
+        assert not queue.put_lossy(('device_seen', '3'), b'c1')
+
+        # A queued event with the same key is replaced even when the queue is full
+        assert queue.put_lossy(('device_seen', '2'), b'b2')
+
+        assert queue.stats() == dict(depth=3, max_depth=3, sent=0, dropped=1, coalesced=2)
+
+        received = []
+        for _i in range(0, 3):
+            received.append(await queue.get())
+            queue.task_done()
+
+        # Once an event has been sent, a new event with its key is queued again
+        assert queue.put_lossy(('device_seen', '1'), b'a3')
+        received.append(await queue.get())
+        queue.task_done()
+
+        await queue.join()
+        return received, queue.stats()
+
+    received, stats = loop.run_coroutine(_run())
+    assert received == [b'a2', b'b2', b'report', b'a3']
+    assert stats == dict(depth=0, max_depth=3, sent=4, dropped=1, coalesced=2)
+
+
+def test_drop_policy_and_full_queue(loop):
+    """Make sure lossy events are dropped when full and reliable events are always queued."""
+
+    async def _run():
+        queue = OutboundEventQueue(2, 'drop')
+
+        assert queue.put_lossy(('broadcast', '1'), b'a1')
+        assert queue.put_lossy(('broadcast', '1'), b'a2')
+        assert not queue.put_lossy(('broadcast', '1'), b'a3')
+        assert queue.put(b'report1')
+        assert queue.put(b'report2')
+        assert not queue.put_lossy(('broadcast', '2'), b'b1')
+
+        received = []
+        for _i in range(0, 4):
+            received.append(await queue.get())
+            queue.task_done()
+
+        return received, queue.stats()
+
+    received, stats = loop.run_coroutine(_run())
+    assert received == [b'a1', b'a2', b'report1', b'report2']
+    assert stats['max_depth'] == 4
+    assert stats['dropped'] == 2
+    assert stats['coalesced'] == 0
+
+
+def test_close_drops_events(loop):
+    """Make sure closing a queue discards queued events and drops later ones."""
+
+    async def _run():
+        queue = OutboundEventQueue(2, 'drop')
+        assert queue.put(b'report1')
+
+        queue.close()
+        await asyncio.wait_for(queue.join(), 1.0)
+
+        return queue.put(b'report2'), queue.put_lossy(('broadcast', '1'), b'a1'), queue.stats()
+
+    later, lossy, stats = loop.run_coroutine(_run())
+    assert later is False
+    assert lossy is False
+    assert stats['depth'] == 0
+    assert stats['dropped'] == 2
+
+
+def test_slow_client(loop):
+    """Make sure a slow client does not stall other clients and still gets every report."""
+
+    class _Context:
+        def __init__(self, connection, user_data):
+            self.connection = connection
+            self.user_data = user_data
+
+    async def _run():
+        adapter = VirtualDeviceAdapter(devices=[], loop=loop)
+        server = SocketDeviceServer(adapter, None, {'client_queue_size': 2}, loop=loop)
+
+        received = {'slow': [], 'fast': []}
+        all_received = {'slow': asyncio.Event(), 'fast': asyncio.Event()}
+        slow_released = asyncio.Event()
+
+        async def _send_encoded(conn, encoded):
+            if conn == 'slow':
+                await slow_released.wait()
+
+            received[conn].append(encoded)
+            if len(received[conn]) == 10:
+                all_received[conn].set()
+
+        server.server.send_encoded = _send_encoded
+
+        slow_id = await server.prepare_conn('slow')
+        fast_id = await server.prepare_conn('fast')
+        for client_id in (slow_id, fast_id):
+            adapter.adjust_monitor(server._client_info(client_id)['monitor'], 'add', ['1'], ['report'])
+
+        # The slow client cannot send anything until it is released, so its
+        # reports queue up past client_queue_size without delaying the others.
+        for i in range(0, 10):
+            await asyncio.wait_for(adapter.notify_event('1', 'report', _make_report(i)), 1.0)
+            await asyncio.sleep(0)
+
+        await asyncio.wait_for(all_received['fast'].wait(), 1.0)
+        assert received['slow'] == []
+
+        slow_released.set()
+        await asyncio.wait_for(all_received['slow'].wait(), 1.0)
+        stats = server.client_queue_stats()
+
+        await server.teardown_conn(_Context('slow', slow_id))
+        await server.teardown_conn(_Context('fast', fast_id))
+        return received, stats[slow_id], stats[fast_id]
+
+    received, slow_stats, fast_stats = loop.run_coroutine(_run())
+    assert received['slow'] == received['fast']
+    assert len(received['slow']) == 10
+    assert slow_stats['dropped'] == 0
+    assert slow_stats['max_depth'] > 2
+    assert fast_stats['dropped'] == 0
+
+
+def _make_report(value):
+    return IndividualReadingReport.FromReadings(1, [IOTileReading(0, 0x5000, value)])
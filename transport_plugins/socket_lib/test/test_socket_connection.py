@@ -0,0 +1,97 @@
+"""Tests of message framing on asyncio socket connections."""
+
+import socket
+import asyncio
+import logging
+import pytest
+from iotile.core.utilities import BackgroundEventLoop
+from iotile_transport_socket_lib.generic.abstract_socket_implementation import AsyncioSocketConnection
+
+
+@pytest.fixture(scope="function")
+def loop():
+    event_loop = BackgroundEventLoop()
+    event_loop.start()
+
+    yield event_loop
+
+    event_loop.stop()
+
+
+async def _connection_pair(**kwargs):
+    sock1, sock2 = socket.socketpair()
+    logger = logging.getLogger(__name__)
+
+    reader1, writer1 = await asyncio.open_connection(sock=sock1)
+    reader2, writer2 = await asyncio.open_connection(sock=sock2)
+
+    return AsyncioSocketConnection(reader1, writer1, logger, **kwargs), AsyncioSocketConnection(reader2, writer2, logger)
+
+
+def test_large_messages(loop):
+    """Make sure messages much larger than the socket buffers are not truncated."""
+
+    async def _run():
+        sender, receiver = await _connection_pair()
+        messages = [bytes([i]) * (3 * 1024 * 1024 + i) for i in range(0, 3)] + [b'']
+
+        send_task = asyncio.ensure_future(_send_all(sender, messages))
+        received = [await receiver.recv() for _message in messages]
+        await send_task
+
+        await sender.close()
+        await receiver.close()
+        return messages, received
+
+    messages, received = loop.run_coroutine(_run())
+    assert received == messages
+
+
+def test_coalesced_messages(loop):
+    """Make sure coalesced messages are flushed by size and by time."""
+
+    async def _run():
+        sender, receiver = await _connection_pair(coalesce_size=100, coalesce_delay=0.05)
+
+        await sender.send(b'a' * 10)
+        await sender.send(b'b' * 10)
+        buffered = sender._pending_size
+
+        # The delay flushes the buffered messages
+        first = await asyncio.wait_for(receiver.recv(), 1.0)
+        second = await asyncio.wait_for(receiver.recv(), 1.0)
+
+        # Crossing the size threshold flushes immediately
+        await sender.send(b'c' * 200)
+        third = await asyncio.wait_for(receiver.recv(), 0.04)
+
+        await sender.close()
+        await receiver.close()
+        return buffered, [first, second, third]
+
+    buffered, received = loop.run_coroutine(_run())
+    assert buffered > 20
+    assert received == [b'a' * 10, b'b' * 10, b'c' * 200]
+
+
+def test_truncated_message(loop):
+    """Make sure a connection closed in the middle of a message is reported."""
+
+    async def _run():
+        sender, receiver = await _connection_pair()
+
+        header = AsyncioSocketConnection._HEADER.pack(AsyncioSocketConnection._ARCHMAGIC, 100)
+        sender.writer.write(header + b'x' * 10)
+        await sender.close()
+
+        with pytest.raises(ConnectionError):
+            await receiver.recv()
+
+        await receiver.close()
+
+    loop.run_coroutine(_run())
+
+
+async def _send_all(connection, messages):
+    for message in messages:
+        await connection.send(message)
@@ -61,10 +61,13 @@ def hw(server):
 
 
 @pytest.fixture(scope="function")
-def device_adapter(server, loop):
+def device_adapter(request, server, loop):
     path, _ = server
 
     adapter = UnixSocketDeviceAdapter(port=path, loop=loop)
+    for name, value in getattr(request, 'param', {}).items():
+        adapter.set_config(name, value)
+
     wrapper = SynchronousLegacyWrapper(adapter, loop=loop)
     yield wrapper
 
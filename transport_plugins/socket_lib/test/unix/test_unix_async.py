@@ -1,6 +1,7 @@
 """Test ValidateWSCient against ValidatingWSServer."""
 
 import sys
+import datetime
 import pytest
 import threading
 import tempfile
@@ -9,13 +10,15 @@ from iotile.core.utilities.async_tools import BackgroundEventLoop
 from iotile_transport_socket_lib.unix_socket.unixsocket_implementation import UnixServerImplementation
 from iotile_transport_socket_lib.unix_socket.unixsocket_implementation import UnixClientImplementation
 from iotile_transport_socket_lib.generic import AsyncSocketServer, AsyncSocketClient
-from iotile.core.utilities.schema_verify import Verifier, StringVerifier, IntVerifier
+from iotile.core.utilities.schema_verify import Verifier, StringVerifier, IntVerifier, BytesVerifier, DictionaryVerifier
+from iotile_transport_socket_lib.generic.packing import encode_bytes, LEGACY_PROTOCOL, BINARY_PROTOCOL
+from iotile_transport_socket_lib.protocol.operations import NEGOTIATE
 
 if sys.platform.startswith("win"):
     pytest.skip("skipping unix socket tests", allow_module_level=True)
 
 @pytest.fixture(scope="function")
-def client_server():
+def client_server(request):
     """Create a connected async ws client and server pair."""
 
     loop = BackgroundEventLoop()
@@ -28,11 +31,12 @@ def client_server():
     try:
 
         socket_implementation = UnixServerImplementation(path=socketfile, loop=loop)
-        server = AsyncSocketServer(socket_implementation, loop=loop)
+        server_version, client_version = getattr(request, 'param', (2, 2))
+        server = AsyncSocketServer(socket_implementation, loop=loop, protocol_version=server_version)
         loop.run_coroutine(server.start())
 
         client_implementation = UnixClientImplementation(path=socketfile, loop=loop)
-        client = AsyncSocketClient(client_implementation, loop=loop)
+        client = AsyncSocketClient(client_implementation, loop=loop, protocol_version=client_version)
         loop.run_coroutine(client.start())
 
         yield loop, client, server
@@ -111,3 +115,83 @@ def test_event_sending(client_server):
 
     loop.run_coroutine(client.send_command('send_event', 'event2', Verifier()))
     assert shared[0] == 10
+
+
+@pytest.mark.parametrize('client_server', [(1, 2), (2, 1), (2, 2)], indirect=True)
+def test_protocol_negotiation(client_server):
+    """Make sure the client and server agree on the lowest common version."""
+
+    loop, client, server = client_server
+
+    received = []
+
+    async def _send_event(payload, context):
+        data = b'\x00\x01binary\xff'
+        event = dict(data=encode_bytes(data, context.protocol_version), time=payload['time'])
+
+        await context.server.send_event(context.connection, 'event', event)
+        return dict(version=context.protocol_version)
+
+    legacy = DictionaryVerifier()
+    legacy.add_required('data', BytesVerifier(encoding="base64"))
+    legacy.add_required('time', Verifier())
+
+    binary = DictionaryVerifier()
+    binary.add_required('data', BytesVerifier())
+    binary.add_required('time', Verifier())
+
+    server.register_command('send_event', _send_event, Verifier())
+    client.register_event('event', received.append, legacy, binary)
+
+    now = datetime.datetime(2021, 5, 4, 3, 2, 1, 123456)
+    response = loop.run_coroutine(client.send_command('send_event', dict(time=now), Verifier()))
+
+    assert client.protocol_version == min(client.max_protocol_version, server.max_protocol_version)
+    assert response['version'] == client.protocol_version
+    assert received == [dict(data=b'\x00\x01binary\xff', time=now)]
+
+
+def test_negotiation_unsupported(client_server):
+    """Make sure clients fall back to the legacy protocol with older servers."""
+
+    loop, client, server = client_server
+    assert client.protocol_version == 2
+
+    loop.run_coroutine(client.stop())
+    del server._commands[NEGOTIATE]
+    loop.run_coroutine(client.start())
+
+    assert client.protocol_version == 1
+
+
+def test_events_around_negotiation(client_server):
+    """Make sure events encoded with either protocol version are understood.
+
+    Events queued for a client before it negotiated can arrive after the
+    client has switched versions, so they must not be validated with the
+    negotiated version's verifiers.
+    """
+
+    loop, client, server = client_server
+
+    received = []
+    data = b'\x00\x01binary\xff'
+
+    async def _send_events(_payload, context):
+        for version in (LEGACY_PROTOCOL, BINARY_PROTOCOL):
+            encoded = server.encode_event('event', dict(data=encode_bytes(data, version)), version)
+            await context.server.send_encoded(context.connection, encoded)
+
+    legacy = DictionaryVerifier()
+    legacy.add_required('data', BytesVerifier(encoding="base64"))
+
+    binary = DictionaryVerifier()
+    binary.add_required('data', BytesVerifier())
+
+    server.register_command('send_events', _send_events, Verifier())
+    client.register_event('event', received.append, legacy, binary)
+
+    loop.run_coroutine(client.send_command('send_events', None, Verifier()))
+
+    assert client.protocol_version == BINARY_PROTOCOL
+    assert received == [dict(data=data), dict(data=data)]
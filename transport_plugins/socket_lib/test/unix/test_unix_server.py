@@ -7,6 +7,7 @@ import json
 import pytest
 import struct
 import threading
+from iotile.core.hw.exceptions import TileNotFoundError, DeviceAdapterError
 import sys
 from devices_factory import build_report_device, build_tracing_device, get_tracing_device_string
 
@@ -94,6 +95,7 @@ def test_autoprobe(device_adapter):
 
 
 @pytest.mark.parametrize('server', [build_tracing_device()], indirect=True)
+@pytest.mark.parametrize('device_adapter', [{'protocol_version': 1}, {'protocol_version': 2}], indirect=True)
 def test_traces(device_adapter):
     result = {'traces': bytes()}
     traces_complete = threading.Event()
@@ -116,6 +118,7 @@ def test_traces(device_adapter):
 
 
 @pytest.mark.parametrize('server', [build_report_device()], indirect=True)
+@pytest.mark.parametrize('device_adapter', [{'protocol_version': 1}, {'protocol_version': 2}], indirect=True)
 def test_reports(device_adapter):
     reports = []
     reports_complete = threading.Event()
@@ -138,6 +141,7 @@ def test_reports(device_adapter):
 
 
 @pytest.mark.parametrize('server', [build_report_device()], indirect=True)
+@pytest.mark.parametrize('device_adapter', [{'protocol_version': 1}, {'protocol_version': 2}], indirect=True)
 def test_send_rpc(device_adapter):
     device_adapter.connect_sync(0, str(0x10))
     device_adapter.open_interface_sync(0, 'rpc')
@@ -155,6 +159,27 @@ def test_send_rpc(device_adapter):
 
 
 @pytest.mark.parametrize('server', [build_report_device()], indirect=True)
+@pytest.mark.parametrize('device_adapter', [{'protocol_version': 1}, {'protocol_version': 2}], indirect=True)
+def test_send_rpc_batch(device_adapter, loop):
+    """Make sure batched RPCs return one result per RPC in order."""
+
+    device_adapter.connect_sync(0, str(0x10))
+    device_adapter.open_interface_sync(0, 'rpc')
+
+    adapter = device_adapter._adapter
+    rpcs = [(8, 0x0004, bytes(), 1.0), (120, 0xFFFF, bytes(), 1.0), (8, 0x0004, bytes(), 1.0)]
+    results = loop.run_coroutine(adapter.send_rpc_batch(0, rpcs))
+
+    single = loop.run_coroutine(adapter.send_rpc(0, 8, 0x0004, bytes(), 1.0))
+
+    assert len(results) == 3
+    assert results[0] == single
+    assert isinstance(results[1], TileNotFoundError)
+    assert results[2] == single
+
+
+@pytest.mark.parametrize('server', [build_report_device()], indirect=True)
+@pytest.mark.parametrize('device_adapter', [{'protocol_version': 1}, {'protocol_version': 2}], indirect=True)
 def test_send_script(device_adapter):
     progress = {'done': 0, 'total': None}
     script_complete = threading.Event()
@@ -182,3 +207,62 @@ def test_send_script(device_adapter):
     flag = script_complete.wait(5.0)
     assert flag is True
     assert progress['done'] > 0
+
+
+@pytest.mark.parametrize('server', [build_report_device()], indirect=True)
+@pytest.mark.parametrize('device_adapter', [{'script_fragment_size': 256, 'script_max_inflight': 4}], indirect=True)
+def test_send_fragmented_script(device_adapter, server):
+    """Make sure large scripts are sent in fragments and reassembled."""
+
+    _, adapter = server
+    device = adapter.devices[0x10]
+
+    progress = []
+    script = bytes(range(0, 256)) * 40 + b'end'
+
+    device_adapter.connect_sync(0, str(0x10))
+    result = device_adapter.send_script_sync(0, script, lambda done, total: progress.append((done, total)))
+
+    assert result['success'] is True
+    assert device.script == script
+
+    # One progress event per fragment received except the last and then 3 from the device
+    assert len(progress) == 40 + 3
+    assert all(total == len(script) for _done, total in progress)
+    assert sorted(done for done, _total in progress[:40]) == [256 * (i + 1) for i in range(0, 40)]
+
+
+@pytest.mark.parametrize('server', [build_report_device()], indirect=True)
+@pytest.mark.parametrize('device_adapter', [{'script_fragment_size': 256, 'script_max_inflight': 4}], indirect=True)
+def test_retry_fragmented_script(device_adapter, server, monkeypatch):
+    """Make sure a script can be sent again after an earlier upload failed partway."""
+
+    _, adapter = server
+    device = adapter.devices[0x10]
+    client = device_adapter._adapter
+    send_command = client._send_command
+    attempts = []
+
+    async def _failing_send_command(name, args, verifier, timeout=10.0):
+        # The first upload is rejected by the server and the second fails before it is sent
+        if args.get('fragment_index') == 5 and len(attempts) < 2:
+            attempts.append(args.get('upload_id'))
+            if len(attempts) == 1:
+                args = dict(args, total_size=args['total_size'] + 1)
+            else:
+                raise DeviceAdapterError(None, name, 'operation timed out')
+
+        return await send_command(name, args, verifier, timeout)
+
+    monkeypatch.setattr(client, '_send_command', _failing_send_command)
+
+    script = bytes(range(0, 256)) * 40 + b'end'
+    device_adapter.connect_sync(0, str(0x10))
+
+    assert device_adapter.send_script_sync(0, script, lambda done, total: None)['success'] is False
+    assert device_adapter.send_script_sync(0, script, lambda done, total: None)['success'] is False
+
+    result = device_adapter.send_script_sync(0, script, lambda done, total: None)
+    assert result['success'] is True
+    assert len(attempts) == 2
+    assert device.script == script